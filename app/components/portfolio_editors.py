@@ -6,6 +6,9 @@ import json
 import os
 from pathlib import Path
 
+from utils.assets import media_src
+from utils.item_ids import ensure_list_ids, new_item_id
+
 
 # Helper function to handle file uploads
 def handle_file_upload(file_uploader, upload_folder):
@@ -41,6 +44,128 @@ SKILL_ICONS = {
 }
 
 
+# st.fragment (Streamlit >= 1.37, experimental_fragment before) reruns only the decorated
+# function when one of its widgets changes; without it sections fall back to full reruns
+section_fragment = (
+    getattr(st, "fragment", None)
+    or getattr(st, "experimental_fragment", None)
+    or (lambda func: func)
+)
+
+
+# Number of list items whose widgets are instantiated per rerun
+ITEMS_PER_PAGE = 10
+
+# Widget key prefixes per list section; each item's widgets are keyed by prefix + item ID
+EXP_STATE_PREFIXES = ["exp_title_", "exp_company_", "exp_period_", "exp_desc_"]
+SKILLS_STATE_PREFIXES = ["skills_cat_title_", "skills_icon_", "skills_items_"]
+PROJECTS_STATE_PREFIXES = ["proj_title_", "proj_url_", "proj_desc_"]
+EDU_STATE_PREFIXES = ["edu_title_", "edu_period_", "edu_desc_"]
+CERT_STATE_PREFIXES = ["cert_title_", "cert_issuer_", "cert_date_", "cert_image_upload_", "cert_pdf_upload_"]
+SOCIAL_STATE_PREFIXES = ["social_name_", "social_url_"]
+
+# Widget keys of the single-value editor fields
+EDITOR_STATE_KEYS = [
+    "personal_name", "personal_email", "personal_title", "profile_image_upload",
+    "personal_summary", "personal_about",
+    "exp_title", "exp_image_upload", "skills_title", "skills_image_upload", "projects_title",
+    "edu_title", "edu_image_upload", "cert_title",
+    "theme_primary", "theme_secondary", "theme_accent", "theme_template",
+]
+
+
+# Section keys used by the paged list editors
+LIST_SECTION_KEYS = ["exp", "skills", "projects", "edu", "cert", "social"]
+
+
+def preserve_page_state():
+    """Keep list page positions alive while their editors are not rendered.
+
+    Streamlit drops widget state for widgets skipped in a run; re-assigning the
+    value detaches it from the widget so it survives until the section returns.
+    """
+    for section_key in LIST_SECTION_KEYS:
+        page_key = f"{section_key}_page"
+        if page_key in st.session_state:
+            st.session_state[page_key] = st.session_state[page_key]
+
+
+def reset_editor_state():
+    """Drop every editor widget's state so a newly loaded portfolio shows its own values.
+
+    Widgets with a key ignore their value= argument once their key is in
+    session state, so call this whenever portfolio_config is replaced wholesale.
+    """
+    item_prefixes = tuple(
+        EXP_STATE_PREFIXES + SKILLS_STATE_PREFIXES + PROJECTS_STATE_PREFIXES
+        + EDU_STATE_PREFIXES + CERT_STATE_PREFIXES + SOCIAL_STATE_PREFIXES
+    )
+    page_keys = {f"{section_key}_page" for section_key in LIST_SECTION_KEYS}
+    for key in list(st.session_state.keys()):
+        if key in EDITOR_STATE_KEYS or key in page_keys or (isinstance(key, str) and key.startswith(item_prefixes)):
+            del st.session_state[key]
+
+
+def _drop_item_state(state_prefixes, item_id):
+    """Drop the widget state of a removed item"""
+    for prefix in state_prefixes:
+        st.session_state.pop(f"{prefix}{item_id}", None)
+
+
+def _page_range(items, section_key, item_label, new_item, state_prefixes, page_size=ITEMS_PER_PAGE):
+    """Render add/paging controls for a list section and return the visible index range.
+
+    Only items in the returned range get widgets; the rest stay untouched in the config.
+    Items without an ID (saved before IDs existed) get one here.
+    """
+    ensure_list_ids(items)
+    page_key = f"{section_key}_page"
+    num_pages = max(1, -(-len(items) // page_size))
+    if st.session_state.get(page_key, 1) > num_pages:
+        st.session_state[page_key] = num_pages
+
+    col_add, col_page = st.columns(2)
+    with col_add:
+        if st.button(f"➕ Add {item_label}", key=f"{section_key}_add", use_container_width=True):
+            items.append({"id": new_item_id(), **new_item()})
+            st.session_state[page_key] = -(-len(items) // page_size)
+            st.rerun()
+    with col_page:
+        if num_pages > 1:
+            page = st.number_input(f"Page (of {num_pages})", min_value=1, max_value=num_pages, key=page_key)
+        else:
+            page = 1
+
+    start = (int(page) - 1) * page_size
+    end = min(start + page_size, len(items))
+    if items:
+        st.caption(f"Showing {start + 1}–{end} of {len(items)}")
+    return range(start, end)
+
+
+def _item_controls(items, i, section_key, state_prefixes):
+    """Move up / move down / remove buttons for one list item.
+
+    Widgets are keyed by item ID, so moving an item keeps every widget's state;
+    only a removed item's state is dropped.
+    """
+    item_id = items[i]["id"]
+    col_up, col_down, col_remove = st.columns(3)
+    with col_up:
+        if st.button("⬆️ Move up", key=f"{section_key}_up_{item_id}", disabled=i == 0, use_container_width=True):
+            items[i - 1], items[i] = items[i], items[i - 1]
+            st.rerun()
+    with col_down:
+        if st.button("⬇️ Move down", key=f"{section_key}_down_{item_id}", disabled=i == len(items) - 1, use_container_width=True):
+            items[i + 1], items[i] = items[i], items[i + 1]
+            st.rerun()
+    with col_remove:
+        if st.button("🗑️ Remove", key=f"{section_key}_remove_{item_id}", use_container_width=True):
+            del items[i]
+            _drop_item_state(state_prefixes, item_id)
+            st.rerun()
+
+
 def personal_info_editor(portfolio_config):
     """Editor for personal information section"""
     st.subheader("👤 Personal Information")
@@ -91,7 +216,7 @@ def personal_info_editor(portfolio_config):
     with col_img2:
         if profile_image:
             try:
-                st.image(profile_image, width=150, caption="Preview")
+                st.image(media_src(profile_image), width=150, caption="Preview")
             except:
                 st.warning("Could not load image preview")
     
@@ -151,7 +276,7 @@ def experience_editor(portfolio_config):
     with col_sec2:
         if section_image:
             try:
-                st.image(section_image, width=150)
+                st.image(media_src(section_image), width=150)
             except:
                 pass
     
@@ -161,48 +286,53 @@ def experience_editor(portfolio_config):
     # Experience items
     st.write("**Experience Items**")
     
-    items = portfolio_config["experience"].get("items", [])
-    num_items = st.number_input("Number of experience entries", min_value=0, value=len(items), key="exp_count")
+    items = portfolio_config["experience"].setdefault("items", [])
+    visible = _page_range(
+        items, "exp", "Experience",
+        lambda: {"title": "", "company": "", "period": "", "description": []},
+        EXP_STATE_PREFIXES
+    )
     
-    new_items = []
-    for i in range(int(num_items)):
+    for i in visible:
+        item_id = items[i]["id"]
         with st.expander(f"Experience {i+1}", expanded=False):
             col1, col2 = st.columns(2)
             
             with col1:
                 title = st.text_input(
                     "Job Title",
-                    value=items[i].get("title", "") if i < len(items) else "",
-                    key=f"exp_title_{i}"
+                    value=items[i].get("title", ""),
+                    key=f"exp_title_{item_id}"
                 )
                 company = st.text_input(
                     "Company",
-                    value=items[i].get("company", "") if i < len(items) else "",
-                    key=f"exp_company_{i}"
+                    value=items[i].get("company", ""),
+                    key=f"exp_company_{item_id}"
                 )
             
             with col2:
                 period = st.text_input(
                     "Period (e.g., Jan 2020 - Present)",
-                    value=items[i].get("period", "") if i < len(items) else "",
-                    key=f"exp_period_{i}"
+                    value=items[i].get("period", ""),
+                    key=f"exp_period_{item_id}"
                 )
             
             description = st.text_area(
                 "Description (one per line)",
-                value="\n".join(items[i].get("description", [])) if i < len(items) else "",
-                key=f"exp_desc_{i}",
+                value="\n".join(items[i].get("description", [])),
+                key=f"exp_desc_{item_id}",
                 height=100
             )
             
-            new_items.append({
+            items[i] = {
+                "id": item_id,
                 "title": title,
                 "company": company,
                 "period": period,
                 "description": [line.strip() for line in description.split("\n") if line.strip()]
-            })
+            }
+            _item_controls(items, i, "exp", EXP_STATE_PREFIXES)
     
-    portfolio_config["experience"]["items"] = new_items
     return portfolio_config
 
 
@@ -235,7 +365,7 @@ def skills_editor(portfolio_config):
     with col_sec2:
         if section_image:
             try:
-                st.image(section_image, width=150)
+                st.image(media_src(section_image), width=150)
             except:
                 pass
     
@@ -246,35 +376,39 @@ def skills_editor(portfolio_config):
     st.write("**Skill Categories**")
     st.info("💡 Select an icon and add comma-separated skills")
     
-    categories = portfolio_config["skills"].get("categories", [])
-    num_categories = st.number_input("Number of skill categories", min_value=0, value=len(categories), key="skills_count")
+    categories = portfolio_config["skills"].setdefault("categories", [])
+    visible = _page_range(
+        categories, "skills", "Category",
+        lambda: {"title": "", "icon": "🔧", "items": ""},
+        SKILLS_STATE_PREFIXES
+    )
     
     # Create icon options with names for better UX
     icon_list = list(SKILL_ICONS.keys())
     icon_labels = [f"{icon} {SKILL_ICONS[icon]}" for icon in icon_list]
     
-    new_categories = []
-    for i in range(int(num_categories)):
+    for i in visible:
+        item_id = categories[i]["id"]
         with st.expander(f"Category {i+1}", expanded=False):
             col1, col2 = st.columns([2, 3])
             
             with col1:
                 category_title = st.text_input(
                     "Category Name",
-                    value=categories[i].get("title", "") if i < len(categories) else "",
-                    key=f"skills_cat_title_{i}",
+                    value=categories[i].get("title", ""),
+                    key=f"skills_cat_title_{item_id}",
                     placeholder="e.g., Languages"
                 )
             
             with col2:
-                current_icon = categories[i].get("icon", "🔧") if i < len(categories) else "🔧"
+                current_icon = categories[i].get("icon", "🔧")
                 icon_index = icon_list.index(current_icon) if current_icon in icon_list else 0
                 
                 selected_icon_label = st.selectbox(
                     "Select Icon",
                     icon_labels,
                     index=icon_index,
-                    key=f"skills_icon_{i}",
+                    key=f"skills_icon_{item_id}",
                     help="Choose an icon to represent this skill category"
                 )
                 # Extract just the icon emoji
@@ -282,8 +416,8 @@ def skills_editor(portfolio_config):
             
             items = st.text_input(
                 "Skills (comma-separated)",
-                value=categories[i].get("items", "") if i < len(categories) else "",
-                key=f"skills_items_{i}",
+                value=categories[i].get("items", ""),
+                key=f"skills_items_{item_id}",
                 placeholder="e.g., Python, JavaScript, Docker",
                 help="Separate multiple skills with commas"
             )
@@ -292,13 +426,14 @@ def skills_editor(portfolio_config):
             if category_title:
                 st.markdown(f"**Preview:** {selected_icon} {category_title}")
             
-            new_categories.append({
+            categories[i] = {
+                "id": item_id,
                 "title": category_title,
                 "icon": selected_icon,
                 "items": items
-            })
+            }
+            _item_controls(categories, i, "skills", SKILLS_STATE_PREFIXES)
     
-    portfolio_config["skills"]["categories"] = new_categories
     return portfolio_config
 
 
@@ -317,39 +452,44 @@ def projects_editor(portfolio_config):
     # Projects items
     st.write("**Projects**")
     
-    items = portfolio_config["projects"].get("items", [])
-    num_items = st.number_input("Number of projects", min_value=0, value=len(items), key="projects_count")
+    items = portfolio_config["projects"].setdefault("items", [])
+    visible = _page_range(
+        items, "projects", "Project",
+        lambda: {"title": "", "url": None, "description": ""},
+        PROJECTS_STATE_PREFIXES
+    )
     
-    new_items = []
-    for i in range(int(num_items)):
+    for i in visible:
+        item_id = items[i]["id"]
         with st.expander(f"Project {i+1}", expanded=False):
             title = st.text_input(
                 "Project Name",
-                value=items[i].get("title", "") if i < len(items) else "",
-                key=f"proj_title_{i}"
+                value=items[i].get("title", ""),
+                key=f"proj_title_{item_id}"
             )
             
             url = st.text_input(
                 "Project URL (optional)",
-                value=items[i].get("url", "") if i < len(items) else "",
-                key=f"proj_url_{i}",
+                value=items[i].get("url") or "",
+                key=f"proj_url_{item_id}",
                 placeholder="https://..."
             )
             
             description = st.text_area(
                 "Description",
-                value=items[i].get("description", "") if i < len(items) else "",
-                key=f"proj_desc_{i}",
+                value=items[i].get("description", ""),
+                key=f"proj_desc_{item_id}",
                 height=100
             )
             
-            new_items.append({
+            items[i] = {
+                "id": item_id,
                 "title": title,
                 "url": url if url else None,
                 "description": description
-            })
+            }
+            _item_controls(items, i, "projects", PROJECTS_STATE_PREFIXES)
     
-    portfolio_config["projects"]["items"] = new_items
     return portfolio_config
 
 
@@ -382,7 +522,7 @@ def education_editor(portfolio_config):
     with col_sec2:
         if section_image:
             try:
-                st.image(section_image, width=150)
+                st.image(media_src(section_image), width=150)
             except:
                 pass
     
@@ -392,42 +532,47 @@ def education_editor(portfolio_config):
     # Education items
     st.write("**Education Entries**")
     
-    items = portfolio_config["education"].get("items", [])
-    num_items = st.number_input("Number of education entries", min_value=0, value=len(items), key="edu_count")
+    items = portfolio_config["education"].setdefault("items", [])
+    visible = _page_range(
+        items, "edu", "Education",
+        lambda: {"title": "", "period": "", "description": ""},
+        EDU_STATE_PREFIXES
+    )
     
-    new_items = []
-    for i in range(int(num_items)):
+    for i in visible:
+        item_id = items[i]["id"]
         with st.expander(f"Education {i+1}", expanded=False):
             col1, col2 = st.columns(2)
             
             with col1:
                 title = st.text_input(
                     "Degree/Certification",
-                    value=items[i].get("title", "") if i < len(items) else "",
-                    key=f"edu_title_{i}"
+                    value=items[i].get("title", ""),
+                    key=f"edu_title_{item_id}"
                 )
             
             with col2:
                 period = st.text_input(
                     "Period (e.g., 2010-2014)",
-                    value=items[i].get("period", "") if i < len(items) else "",
-                    key=f"edu_period_{i}"
+                    value=items[i].get("period", ""),
+                    key=f"edu_period_{item_id}"
                 )
             
             description = st.text_area(
                 "Description (Institution, Field, etc.)",
-                value=items[i].get("description", "") if i < len(items) else "",
-                key=f"edu_desc_{i}",
+                value=items[i].get("description", ""),
+                key=f"edu_desc_{item_id}",
                 height=80
             )
             
-            new_items.append({
+            items[i] = {
+                "id": item_id,
                 "title": title,
                 "period": period,
                 "description": description
-            })
+            }
+            _item_controls(items, i, "edu", EDU_STATE_PREFIXES)
     
-    portfolio_config["education"]["items"] = new_items
     return portfolio_config
 
 
@@ -446,31 +591,35 @@ def certificates_editor(portfolio_config):
     # Certificates items
     st.write("**Certificates**")
     
-    items = portfolio_config["certificates"].get("items", [])
-    num_items = st.number_input("Number of certificates", min_value=0, value=len(items), key="cert_count")
+    items = portfolio_config["certificates"].setdefault("items", [])
+    visible = _page_range(
+        items, "cert", "Certificate",
+        lambda: {"title": "", "issuer": "", "date": "", "image": None, "pdf": None},
+        CERT_STATE_PREFIXES
+    )
     
-    new_items = []
-    for i in range(int(num_items)):
+    for i in visible:
+        item_id = items[i]["id"]
         with st.expander(f"Certificate {i+1}", expanded=False):
             col1, col2 = st.columns(2)
             
             with col1:
                 title = st.text_input(
                     "Certificate Title",
-                    value=items[i].get("title", "") if i < len(items) else "",
-                    key=f"cert_title_{i}"
+                    value=items[i].get("title", ""),
+                    key=f"cert_title_{item_id}"
                 )
                 issuer = st.text_input(
                     "Issuing Organization",
-                    value=items[i].get("issuer", "") if i < len(items) else "",
-                    key=f"cert_issuer_{i}"
+                    value=items[i].get("issuer", ""),
+                    key=f"cert_issuer_{item_id}"
                 )
             
             with col2:
                 date = st.text_input(
                     "Date",
-                    value=items[i].get("date", "") if i < len(items) else "",
-                    key=f"cert_date_{i}",
+                    value=items[i].get("date", ""),
+                    key=f"cert_date_{item_id}",
                     placeholder="e.g., 2023"
                 )
             
@@ -481,7 +630,7 @@ def certificates_editor(portfolio_config):
                 uploaded_cert_image = st.file_uploader(
                     "Upload Certificate Image",
                     type=["jpg", "jpeg", "png", "gif"],
-                    key=f"cert_image_upload_{i}",
+                    key=f"cert_image_upload_{item_id}",
                     help="Upload a certificate image or badge"
                 )
                 if uploaded_cert_image:
@@ -489,12 +638,12 @@ def certificates_editor(portfolio_config):
                     st.success(f"✅ Image saved: {uploaded_cert_image.name}")
                     image = image_path
                 else:
-                    image = items[i].get("image", "") if i < len(items) else ""
+                    image = items[i].get("image", "")
             
             with col_img2:
                 if image:
                     try:
-                        st.image(image, width=120, caption="Certificate Preview")
+                        st.image(media_src(image), width=120, caption="Certificate Preview")
                     except:
                         pass
             
@@ -505,7 +654,7 @@ def certificates_editor(portfolio_config):
                 uploaded_cert_pdf = st.file_uploader(
                     "Upload Certificate PDF",
                     type=["pdf"],
-                    key=f"cert_pdf_upload_{i}",
+                    key=f"cert_pdf_upload_{item_id}",
                     help="Upload the certificate PDF file"
                 )
                 if uploaded_cert_pdf:
@@ -513,21 +662,22 @@ def certificates_editor(portfolio_config):
                     st.success(f"✅ PDF saved: {uploaded_cert_pdf.name}")
                     pdf = pdf_path
                 else:
-                    pdf = items[i].get("pdf", "") if i < len(items) else ""
+                    pdf = items[i].get("pdf", "")
             
             with col_pdf2:
                 if pdf:
                     st.info(f"📄 PDF: {pdf.split('/')[-1]}")
             
-            new_items.append({
+            items[i] = {
+                "id": item_id,
                 "title": title,
                 "issuer": issuer,
                 "date": date,
                 "image": image if image else None,
                 "pdf": pdf if pdf else None
-            })
+            }
+            _item_controls(items, i, "cert", CERT_STATE_PREFIXES)
     
-    portfolio_config["certificates"]["items"] = new_items
     return portfolio_config
 
 
@@ -535,13 +685,17 @@ def social_links_editor(portfolio_config):
     """Editor for social links"""
     st.subheader("🔗 Social Links")
     
-    links = portfolio_config.get("socialLinks", [])
-    num_links = st.number_input("Number of social links", min_value=0, value=len(links), key="social_count")
+    links = portfolio_config.setdefault("socialLinks", [])
+    visible = _page_range(
+        links, "social", "Link",
+        lambda: {"name": "GitHub", "url": ""},
+        SOCIAL_STATE_PREFIXES
+    )
     
     social_platforms = ["GitHub", "LinkedIn", "Twitter", "Portfolio", "Blog", "Instagram", "Facebook", "YouTube"]
     
-    new_links = []
-    for i in range(int(num_links)):
+    for i in visible:
+        item_id = links[i]["id"]
         with st.expander(f"Link {i+1}", expanded=False):
             col1, col2 = st.columns(2)
             
@@ -549,24 +703,25 @@ def social_links_editor(portfolio_config):
                 name = st.selectbox(
                     "Platform",
                     social_platforms,
-                    index=social_platforms.index(links[i].get("name", "GitHub")) if i < len(links) else 0,
-                    key=f"social_name_{i}"
+                    index=social_platforms.index(links[i].get("name")) if links[i].get("name") in social_platforms else 0,
+                    key=f"social_name_{item_id}"
                 )
             
             with col2:
                 url = st.text_input(
                     "URL",
-                    value=links[i].get("url", "") if i < len(links) else "",
-                    key=f"social_url_{i}",
+                    value=links[i].get("url", ""),
+                    key=f"social_url_{item_id}",
                     placeholder="https://..."
                 )
             
-            new_links.append({
+            links[i] = {
+                "id": item_id,
                 "name": name,
                 "url": url
-            })
+            }
+            _item_controls(links, i, "social", SOCIAL_STATE_PREFIXES)
     
-    portfolio_config["socialLinks"] = new_links
     return portfolio_config
 
 
@@ -0,0 +1,222 @@
+"""
+Admin analytics across all portfolios
+
+PortfolioAnalytics keeps one pandas DataFrame per section (portfolios, skills,
+experience, projects, education, certificates) and computes every report with
+vectorized operations. Frames are cached; refresh() stats each user's data file
+(at most once per REFRESH_INTERVAL) and re-parses only the files whose size or
+mtime changed, replacing just those users' rows.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from utils import serialization
+from utils.skills import skill_categories
+from utils.storage import iter_usernames, resolve_user_data_file
+
+
+# Seconds the cached frames are served before data files are stat'ed again
+REFRESH_INTERVAL = 30.0
+
+# Portfolio section -> (config key, items key)
+COUNTED_SECTIONS = {
+    "experience": ("experience", "items"),
+    "skills": ("skills", "categories"),
+    "projects": ("projects", "items"),
+    "education": ("education", "items"),
+    "certificates": ("certificates", "items"),
+    "social_links": ("socialLinks", None),
+}
+
+FRAME_COLUMNS = {
+    "portfolios": ["username", "template", "primary_color", "module_count"]
+                  + [f"{section}_count" for section in COUNTED_SECTIONS] + ["skill_count"],
+    "modules": ["username", "module"],
+    "skills": ["username", "category", "skill"],
+    "experience": ["username", "title", "company", "description_lines"],
+    "projects": ["username", "title", "has_url"],
+    "education": ["username", "title", "period"],
+    "certificates": ["username", "title", "issuer"],
+}
+
+
+def _items(config, key, items_key):
+    section = config.get(key)
+    if items_key is None:
+        return section if isinstance(section, (list, dict)) else []
+    items = section.get(items_key) if isinstance(section, dict) else None
+    return [item for item in items or [] if isinstance(item, dict)]
+
+
+def portfolio_rows(username, config):
+    """Flatten one portfolio into {frame name: [row dicts]}"""
+    rows = {name: [] for name in FRAME_COLUMNS}
+    theme = config.get("theme") if isinstance(config.get("theme"), dict) else {}
+    modules = [m for m in config.get("modules") or [] if isinstance(m, str)]
+
+    summary = {
+        "username": username,
+        "template": theme.get("template", "modern"),
+        "primary_color": (theme.get("colors") or {}).get("primary"),
+        "module_count": len(modules),
+    }
+    for section, (key, items_key) in COUNTED_SECTIONS.items():
+        summary[f"{section}_count"] = len(_items(config, key, items_key))
+
+    skill_count = 0
+    for category, skills in skill_categories(config):
+        skill_count += len(skills)
+        rows["skills"].extend(
+            {"username": username, "category": category.get("title", ""), "skill": skill} for skill in skills
+        )
+    summary["skill_count"] = skill_count
+    rows["portfolios"].append(summary)
+    rows["modules"].extend({"username": username, "module": module} for module in modules)
+
+    for item in _items(config, "experience", "items"):
+        description = item.get("description")
+        rows["experience"].append({
+            "username": username, "title": item.get("title", ""), "company": item.get("company", ""),
+            "description_lines": len(description) if isinstance(description, list) else int(bool(description)),
+        })
+    for item in _items(config, "projects", "items"):
+        rows["projects"].append({"username": username, "title": item.get("title", ""), "has_url": bool(item.get("url"))})
+    for item in _items(config, "education", "items"):
+        rows["education"].append({"username": username, "title": item.get("title", ""), "period": item.get("period", "")})
+    for item in _items(config, "certificates", "items"):
+        rows["certificates"].append({"username": username, "title": item.get("title", ""), "issuer": item.get("issuer", "")})
+    return rows
+
+
+class PortfolioAnalytics:
+    """Cached per-section DataFrames over every portfolio in a data directory"""
+
+    def __init__(self, data_dir="data", refresh_interval=REFRESH_INTERVAL):
+        self.data_dir = Path(data_dir)
+        self.refresh_interval = refresh_interval
+        self.frames = {name: pd.DataFrame(columns=columns) for name, columns in FRAME_COLUMNS.items()}
+        self._signatures = {}   # username -> (size, mtime_ns) of the parsed file
+        self._account_names = ((), None)   # (users.json keys, its (size, mtime_ns))
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+
+    def _usernames(self):
+        # index.txt only lists users registered since it was introduced until the
+        # layout migration rebuilds it, so always add the accounts in users.json
+        users_file = self.data_dir / "users.json"
+        try:
+            stat_result = os.stat(users_file)
+        except OSError:
+            self._account_names = ((), None)
+        else:
+            signature = (stat_result.st_size, stat_result.st_mtime_ns)
+            if self._account_names[1] != signature:
+                self._account_names = (tuple(serialization.load_file(users_file)), signature)
+        return list(dict.fromkeys([*iter_usernames(self.data_dir), *self._account_names[0]]))
+
+    def refresh(self, force=False):
+        """Re-parse changed user files; returns the number of users updated or removed"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._refreshed_at is not None and now - self._refreshed_at < self.refresh_interval:
+                return 0
+            self._refreshed_at = now
+
+            changed, seen = {}, set()
+            for username in self._usernames():
+                path = resolve_user_data_file(self.data_dir, username)
+                try:
+                    stat_result = os.stat(path)
+                except OSError:
+                    continue
+                seen.add(username)
+                signature = (stat_result.st_size, stat_result.st_mtime_ns)
+                if self._signatures.get(username) != signature:
+                    changed[username] = (signature, path)
+            stale = set(changed) | (set(self._signatures) - seen)
+            if not stale:
+                return 0
+
+            new_rows = {name: [] for name in FRAME_COLUMNS}
+            for username, (signature, path) in changed.items():
+                try:
+                    data = serialization.load_file(path)
+                except Exception:
+                    continue
+                config = data.get("portfolio_config", data) if isinstance(data, dict) else None
+                if not isinstance(config, dict):
+                    continue
+                self._signatures[username] = signature
+                for name, rows in portfolio_rows(username, config).items():
+                    new_rows[name].extend(rows)
+            for username in set(self._signatures) - seen:
+                del self._signatures[username]
+
+            for name, frame in self.frames.items():
+                kept = frame[~frame["username"].isin(stale)]
+                added = pd.DataFrame(new_rows[name], columns=FRAME_COLUMNS[name])
+                parts = [part for part in (kept, added) if not part.empty]
+                self.frames[name] = (pd.concat(parts, ignore_index=True) if parts
+                                     else pd.DataFrame(columns=FRAME_COLUMNS[name]))
+            return len(stale)
+
+    # -- reports -----------------------------------------------------------
+
+    def portfolio_count(self):
+        return len(self.frames["portfolios"])
+
+    def skill_frequencies(self, top=20):
+        """Portfolios listing each canonical skill, with the share of all portfolios"""
+        skills = self.frames["skills"].drop_duplicates(["username", "skill"])
+        counts = skills["skill"].value_counts().head(top)
+        total = max(self.portfolio_count(), 1)
+        return pd.DataFrame({"portfolios": counts, "share": (counts / total).round(3)})
+
+    def section_fill_rates(self):
+        """Share of portfolios with at least one item per section, and with each module enabled"""
+        portfolios = self.frames["portfolios"]
+        total = max(len(portfolios), 1)
+        count_columns = [f"{section}_count" for section in COUNTED_SECTIONS]
+        filled = portfolios[count_columns].astype(float).gt(0).sum()
+        filled.index = list(COUNTED_SECTIONS)
+        enabled = self.frames["modules"].drop_duplicates()["module"].value_counts()
+        return pd.DataFrame({
+            "filled": (filled / total).round(3),
+            "module_enabled": (enabled.reindex(filled.index).fillna(0) / total).round(3),
+        })
+
+    def average_item_counts(self):
+        """Mean and median item count per section (portfolios without items count as 0)"""
+        count_columns = [f"{section}_count" for section in COUNTED_SECTIONS] + ["skill_count"]
+        counts = self.frames["portfolios"][count_columns].astype(float)
+        result = pd.DataFrame({"mean": counts.mean().round(2), "median": counts.median()})
+        result.index = [column[:-len("_count")] for column in count_columns]
+        return result
+
+    def template_usage(self):
+        """Portfolios per resume template"""
+        templates = self.frames["portfolios"]["template"].fillna("modern")
+        counts = templates.value_counts()
+        return pd.DataFrame({"portfolios": counts, "share": (counts / max(len(templates), 1)).round(3)})
+
+    def top_companies(self, top=20):
+        """Most common employers across experience entries"""
+        companies = self.frames["experience"]["company"].astype(str).str.strip()
+        return companies[companies != ""].value_counts().head(top).rename("entries").to_frame()
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_portfolio_analytics(data_dir="data"):
+    """Return the process-wide PortfolioAnalytics for a data directory"""
+    key = str(Path(data_dir).resolve())
+    with _instances_lock:
+        if key not in _instances:
+            _instances[key] = PortfolioAnalytics(data_dir)
+        return _instances[key]
@@ -0,0 +1,238 @@
+"""
+On-demand serving of uploaded files (certificate PDFs, images)
+
+A small stdlib HTTP server streams files from the data directory with ETag,
+If-None-Match and Range support, so the Streamlit script only emits links and
+never reads the bytes itself. URLs from media_url() carry a content hash
+(?v=...) and are served with a year-long immutable Cache-Control, so browsers
+fetch each image once. Enable it by setting PORTFOLIO_ASSET_PORT (and
+PORTFOLIO_ASSET_BASE_URL when the port is exposed under another address).
+
+Run standalone with:  python app/utils/assets.py [data_dir] [port]
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import sys
+import threading
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+
+ASSET_PORT_ENV = "PORTFOLIO_ASSET_PORT"
+ASSET_BASE_URL_ENV = "PORTFOLIO_ASSET_BASE_URL"
+
+# Cache policy for content-hashed URLs; the hash changes whenever the file does
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HASH_LENGTH = 16
+
+# Only uploaded media is exposed; users.json and per-user data files never are
+SERVED_DIRS = ("images", "certificates")
+
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def file_etag(stat_result):
+    """Strong validator derived from size and modification time"""
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+@lru_cache(maxsize=4096)
+def _hash_cached(path, etag):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def file_content_hash(path):
+    """Short content hash of a file, recomputed only when size or mtime change"""
+    return _hash_cached(str(path), file_etag(os.stat(path)))
+
+
+class AssetRequestHandler(BaseHTTPRequestHandler):
+    """Serve files below `root` with conditional and range requests"""
+
+    root = Path("data")
+    cache_control = "no-cache"
+
+    def log_message(self, format, *args):
+        # keep Streamlit's console quiet
+        pass
+
+    def _resolve(self):
+        """Map the request path to a file inside root, or None"""
+        rel = unquote(urlsplit(self.path).path).lstrip("/")
+        root = self.root.resolve()
+        try:
+            target = (root / rel).resolve()
+            parts = target.relative_to(root).parts
+        except (ValueError, OSError):
+            return None
+        if len(parts) < 2 or parts[0] not in SERVED_DIRS:
+            return None
+        return target if target.is_file() else None
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        target = self._resolve()
+        if target is None:
+            self.send_error(404, "Not found")
+            return
+
+        stat_result = target.stat()
+        etag = file_etag(stat_result)
+        size = stat_result.st_size
+        cache_control = self.cache_control
+        version = parse_qs(urlsplit(self.path).query).get("v", [None])[0]
+        if version and version == file_content_hash(target):
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
+            return
+
+        start, end = 0, size - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        # If-Range: only honour the range when the client's copy is current
+        if range_header and self.headers.get("If-Range", etag) == etag:
+            match = _RANGE_RE.match(range_header.strip())
+            if match and (match.group(1) or match.group(2)):
+                if match.group(1):
+                    start = int(match.group(1))
+                    end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+                else:
+                    start = max(size - int(match.group(2)), 0)
+                if start > end or start >= size:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.end_headers()
+                    return
+                status = 206
+
+        length = end - start + 1 if size else 0
+        mime, _ = mimetypes.guess_type(str(target))
+        self.send_response(status)
+        self.send_header("Content-Type", mime or "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+
+        if send_body and length:
+            try:
+                with open(target, "rb") as f:
+                    f.seek(start)
+                    _copy_range(f, self.wfile, length)
+            except (BrokenPipeError, ConnectionResetError):
+                # client went away mid-download (e.g. cancelled or range-probing)
+                pass
+
+
+def _copy_range(src, dst, length, chunk_size=64 * 1024):
+    """Copy exactly `length` bytes from src to dst in chunks"""
+    remaining = length
+    while remaining > 0:
+        chunk = src.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+
+def start_asset_server(root="data", host="0.0.0.0", port=None):
+    """Start the asset server in a daemon thread (once per process). Returns it or None"""
+    global _server
+    if port is None:
+        port = os.environ.get(ASSET_PORT_ENV)
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            handler = type("BoundAssetRequestHandler", (AssetRequestHandler,), {"root": Path(root)})
+            _server = ThreadingHTTPServer((host, int(port)), handler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="asset-server", daemon=True).start()
+        return _server
+
+
+def asset_base_url():
+    """Public base URL of the asset server, or None when it is disabled"""
+    base_url = os.environ.get(ASSET_BASE_URL_ENV)
+    if base_url:
+        return base_url.rstrip("/")
+    port = os.environ.get(ASSET_PORT_ENV)
+    if port:
+        return f"http://localhost:{port}"
+    return None
+
+
+def asset_url(path, root="data"):
+    """URL for a stored file (e.g. "data/certificates/x.pdf"), or None if not servable"""
+    base_url = asset_base_url()
+    if not base_url or not path:
+        return None
+    try:
+        rel = Path(path).resolve().relative_to(Path(root).resolve())
+    except (ValueError, OSError):
+        return None
+    if len(rel.parts) < 2 or rel.parts[0] not in SERVED_DIRS:
+        return None
+    return f"{base_url}/{quote(rel.as_posix())}"
+
+
+def media_url(path, root="data"):
+    """Content-hashed, long-cacheable URL for a stored file, or None if not servable"""
+    url = asset_url(path, root=root)
+    if url is None:
+        return None
+    try:
+        return f"{url}?v={file_content_hash(path)}"
+    except OSError:
+        return None
+
+
+def media_src(path, root="data"):
+    """Image source for st.image / <img>: the hashed URL when served, else the path"""
+    return media_url(path, root=root) or path
+
+
+@lru_cache(maxsize=32)
+def _read_cached(path, etag):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def read_asset_bytes(path):
+    """Read a stored file on demand, reusing the bytes while the file is unchanged"""
+    stat_result = os.stat(path)
+    return _read_cached(str(path), file_etag(stat_result))
+
+
+if __name__ == "__main__":
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "data"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8502
+    server = ThreadingHTTPServer(
+        ("0.0.0.0", port),
+        type("BoundAssetRequestHandler", (AssetRequestHandler,), {"root": Path(data_dir)}),
+    )
+    print(f"Serving {data_dir} on port {port}")
+    server.serve_forever()
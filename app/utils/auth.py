@@ -1,39 +1,139 @@
 """
 Authentication module for user login/signup
 """
-import json
+import logging
 import os
-import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+from utils import passwords, serialization
+from utils.item_ids import ensure_item_ids
+from utils.passwords import PasswordHashBusy, hash_pool, login_throttle
+from utils.revisions import get_revision_store
+from utils.search import get_search_index, portfolio_terms
+from utils.sessions import get_session_store
+from utils.storage import (
+    append_to_index, drop_legacy_user_data_file, file_lock, prepare_user_data_file,
+    resolve_user_data_file, write_index
+)
+
+logger = logging.getLogger(__name__)
+
+
+def default_portfolio_config(username, email):
+    """Return the starter portfolio given to a newly registered user"""
+    return {
+        "personalInfo": {
+            "name": username,
+            "title": f"Hello! I'm {username}",
+            "email": email,
+            "summary": "Welcome to my portfolio",
+            "about": ""
+        },
+        "modules": ["personal_info"],
+        "experience": {"items": []},
+        "skills": {"categories": []},
+        "projects": {"items": []},
+        "education": {"items": []},
+        "certificates": {"items": []},
+        "theme": {
+            "colors": {
+                "primary": "#6366f1",
+                "secondary": "#8b5cf6",
+                "accent": "#06b6d4"
+            }
+        }
+    }
+
 
 class AuthManager:
     """Manages user authentication and session"""
     
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", throttle=login_throttle):
         self.data_dir = Path(data_dir)
+        self.throttle = throttle
         self.data_dir.mkdir(exist_ok=True)
         self.users_file = self.data_dir / "users.json"
+        self.users_lock_file = self.data_dir / "users.lock"
+        self.revisions = get_revision_store(self.data_dir)
+        self.sessions = get_session_store(self.data_dir)
+        self.search_index = get_search_index(self.data_dir)
         self._load_users()
     
     def _load_users(self):
         """Load users from JSON file"""
-        if self.users_file.exists():
-            with open(self.users_file, 'r') as f:
-                self.users = json.load(f)
-        else:
-            self.users = {}
-    
-    def _save_users(self):
-        """Save users to JSON file"""
-        with open(self.users_file, 'w') as f:
-            json.dump(self.users, f, indent=2)
+        self.users = {}
+        # Accounts stored without an embedded portfolio keep it only in their per-user file
+        self._file_backed = set()
+        self._merge_users(*self._read_users_file())
+
+    def _read_users_file(self):
+        """Return (users on disk, (size, mtime_ns) of users.json); ({}, None) without a file"""
+        try:
+            stat_result = os.stat(self.users_file)
+        except FileNotFoundError:
+            return {}, None
+        return serialization.load_file(self.users_file), (stat_result.st_size, stat_result.st_mtime_ns)
+
+    def _merge_users(self, on_disk, signature):
+        """Adopt the accounts in users.json, keeping portfolios already loaded from per-user files"""
+        for username, user in on_disk.items():
+            if "portfolio_config" not in user:
+                self._file_backed.add(username)
+                loaded = self.users.get(username, {}).get("portfolio_config")
+                if loaded is not None:
+                    user = dict(user, portfolio_config=loaded)
+            self.users[username] = user
+        self._users_signature = signature
+
+    def _sync_users(self):
+        """Pick up accounts other sessions or processes wrote since users.json was read"""
+        try:
+            stat_result = os.stat(self.users_file)
+            if (stat_result.st_size, stat_result.st_mtime_ns) != self._users_signature:
+                self._merge_users(*self._read_users_file())
+        except (OSError, ValueError):
+            pass
+
+    def _save_users(self, usernames, new=False):
+        """Write the given accounts into users.json.
+
+        The file is re-read under a lock and replaced atomically, so accounts
+        written meanwhile by other sessions or processes are kept. With new=True
+        nothing is written if any username already exists on disk: the unsaved
+        accounts are dropped and False is returned.
+        """
+        with file_lock(self.users_lock_file):
+            return self._store_users(usernames, new)
+
+    def _store_users(self, usernames, new=False):
+        """_save_users() for callers already holding the users.json lock"""
+        on_disk, signature = self._read_users_file()
+        if new and any(username in on_disk for username in usernames):
+            for username in usernames:
+                if username not in on_disk:
+                    self.users.pop(username, None)
+            self._merge_users(on_disk, signature)
+            return False
+        for username in usernames:
+            user = self.users[username]
+            if username in self._file_backed:
+                user = {key: value for key, value in user.items() if key != "portfolio_config"}
+            on_disk[username] = user
+        serialization.dump_file(self.users_file, on_disk)
+        stat_result = os.stat(self.users_file)
+        self._merge_users(on_disk, (stat_result.st_size, stat_result.st_mtime_ns))
+        return True
 
     def _user_file(self, username):
-        """Return Path for the per-user JSON file: {username}_data.json"""
-        safe_name = str(username)
-        return self.data_dir / f"{safe_name}_data.json"
+        """Return Path of the existing per-user JSON file (sharded or legacy flat layout)"""
+        return resolve_user_data_file(self.data_dir, str(username))
+
+    def _write_user_file(self, username, portfolio_config):
+        """Write the per-user JSON file into its shard, replacing any flat-layout copy"""
+        serialization.dump_file(prepare_user_data_file(self.data_dir, str(username)), portfolio_config)
+        drop_legacy_user_data_file(self.data_dir, str(username))
 
     def _load_user_file_into_users(self, username):
         """If per-user file exists, load its portfolio_config into self.users entry.
@@ -46,8 +146,7 @@ class AuthManager:
         user_file = self._user_file(username)
         if user_file.exists():
             try:
-                with open(user_file, 'r') as f:
-                    data = json.load(f)
+                data = serialization.load_file(user_file)
                 # Per-user file may contain the full user record or just portfolio_config
                 if isinstance(data, dict):
                     if 'portfolio_config' in data:
@@ -61,66 +160,149 @@ class AuthManager:
     
     @staticmethod
     def hash_password(password):
-        """Hash password using SHA256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password with a salted scrypt/PBKDF2 hash on the bounded hashing pool"""
+        return hash_pool.run(passwords.hash_password, password)
     
     def user_exists(self, username):
         """Check if user exists"""
+        self._sync_users()
         return username in self.users
     
-    def register_user(self, username, password, email):
+    def register_user(self, username, password, email, client_ip=None):
         """Register a new user"""
         if self.user_exists(username):
             return False, "Username already exists"
         
         if len(password) < 6:
             return False, "Password must be at least 6 characters"
+
+        wait = self.throttle.check(client_ip=client_ip)
+        if wait:
+            return False, f"Too many attempts. Try again in {wait} seconds"
+        self.throttle.record_signup(client_ip)
+        try:
+            password_hash = self.hash_password(password)
+        except PasswordHashBusy:
+            return False, "Server is busy, please try again in a moment"
         
         self.users[username] = {
-            "password": self.hash_password(password),
+            "password": password_hash,
             "email": email,
             "created_at": datetime.now().isoformat(),
-            "portfolio_config": {
-                "personalInfo": {
-                    "name": username,
-                    "title": f"Hello! I'm {username}",
-                    "email": email,
-                    "summary": "Welcome to my portfolio",
-                    "about": ""
-                },
-                "modules": ["personal_info"],
-                "experience": {"items": []},
-                "skills": {"categories": []},
-                "projects": {"items": []},
-                "education": {"items": []},
-                "certificates": {"items": []},
-                "theme": {
-                    "colors": {
-                        "primary": "#6366f1",
-                        "secondary": "#8b5cf6",
-                        "accent": "#06b6d4"
-                    }
-                }
-            }
+            "portfolio_config": default_portfolio_config(username, email)
         }
-        self._save_users()
+        if not self._save_users([username], new=True):
+            return False, "Username already exists"
         # Also write per-user data file for easier export/import and separate storage
         try:
-            user_file = self._user_file(username)
-            with open(user_file, 'w') as f:
-                json.dump(self.users[username].get('portfolio_config', {}), f, indent=2)
+            self._write_user_file(username, self.users[username].get('portfolio_config', {}))
+            append_to_index(self.data_dir, username)
+            self.search_index.update(username, self.users[username].get('portfolio_config', {}))
         except Exception:
             # non-fatal
             pass
         return True, "User registered successfully"
     
-    def authenticate(self, username, password):
-        """Authenticate user"""
+    def bulk_register_users(self, records, skip_existing=False, workers=None):
+        """Register many users at once: one users.json write and one index write.
+
+        records are dicts with username, email, password or password_hash, and an
+        optional portfolio. Every record is validated before anything is written;
+        any error aborts the whole batch unless it is an existing username and
+        skip_existing is set. Returns (success, message).
+        """
+        errors, batch, skipped = [], {}, 0
+        for line_no, record in enumerate(records, 1):
+            username = str(record.get("username") or "").strip()
+            password = record.get("password") or ""
+            password_hash = record.get("password_hash") or ""
+            if not username:
+                errors.append(f"record {line_no}: missing username")
+            elif username in batch:
+                errors.append(f"record {line_no}: duplicate username {username!r}")
+            elif self.user_exists(username):
+                if skip_existing:
+                    skipped += 1
+                    continue
+                errors.append(f"record {line_no}: username {username!r} already exists")
+            elif password_hash and not passwords.is_password_hash(password_hash):
+                errors.append(f"record {line_no}: unrecognized password_hash")
+            elif not password_hash and len(password) < 6:
+                errors.append(f"record {line_no}: password must be at least 6 characters")
+            else:
+                batch[username] = record
+        if errors:
+            more = f" (+{len(errors) - 10} more)" if len(errors) > 10 else ""
+            return False, "; ".join(errors[:10]) + more
+
+        # Slow hashes dominate; bulk imports are an admin job, so use every core
+        to_hash = [u for u, r in batch.items() if not r.get("password_hash")]
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+            hashed = dict(zip(to_hash, executor.map(
+                passwords.hash_password, (batch[u]["password"] for u in to_hash)
+            )))
+
+        # Portfolios go to their shard files only, and are indexed as they are written,
+        # so neither users.json nor memory holds the whole batch's portfolios. users.json
+        # stays locked until the batch is in, so no signup can take one of its names
+        created_at = datetime.now().isoformat()
+        indexed = []
+        with file_lock(self.users_lock_file):
+            self._sync_users()
+            taken = [username for username in batch if username in self.users]
+            if taken:
+                return False, f"username {taken[0]!r} was created during the import; nothing was imported"
+            for username, record in batch.items():
+                email = record.get("email") or ""
+                portfolio = record.pop("portfolio", None) or default_portfolio_config(username, email)
+                ensure_item_ids(portfolio)
+                self._write_user_file(username, portfolio)
+                self.users[username] = {
+                    "password": record.get("password_hash") or hashed[username],
+                    "email": email,
+                    "created_at": record.get("created_at") or created_at,
+                }
+                self._file_backed.add(username)
+                indexed.append((username, portfolio_terms(portfolio)))
+            if batch:
+                self._store_users(list(batch))
+        if batch:
+            write_index(self.data_dir, self.users)
+            try:
+                self.search_index.update_terms(indexed)
+            except Exception:
+                pass
+        return True, f"Imported {len(batch)} user(s), skipped {skipped} existing"
+
+    def authenticate(self, username, password, client_ip=None):
+        """Authenticate user; legacy or outdated hashes are upgraded on success"""
+        wait = self.throttle.check(username, client_ip)
+        if wait:
+            return False, f"Too many login attempts. Try again in {wait} seconds"
+
         if not self.user_exists(username):
+            # unknown names are limited per IP only; counting them would let a
+            # spray of made-up names evict the counters of real accounts
+            self.throttle.record_failure(client_ip=client_ip)
             return False, "Username not found"
-        
-        if self.users[username]["password"] != self.hash_password(password):
+
+        try:
+            matches, needs_rehash = hash_pool.run(
+                passwords.verify_password, password, self.users[username]["password"]
+            )
+        except PasswordHashBusy:
+            return False, "Server is busy, please try again in a moment"
+        if not matches:
+            self.throttle.record_failure(username, client_ip)
             return False, "Incorrect password"
+        self.throttle.record_success(username, client_ip)
+
+        if needs_rehash:
+            try:
+                self.users[username]["password"] = self.hash_password(password)
+                self._save_users([username])
+            except Exception:
+                pass
         
         # After authentication, attempt to refresh portfolio_config from per-user file
         try:
@@ -136,28 +318,79 @@ class AuthManager:
             return None
         # Prefer per-user file as source of truth if present
         self._load_user_file_into_users(username)
-        return self.users[username].get("portfolio_config", {})
+        portfolio_config = self.users[username].get("portfolio_config", {})
+        # Items saved before item IDs existed get them now; they are persisted on the next save
+        ensure_item_ids(portfolio_config)
+        return portfolio_config
     
     def update_user_portfolio(self, username, portfolio_config):
         """Update user's portfolio configuration"""
         if self.user_exists(username):
+            ensure_item_ids(portfolio_config)
             self.users[username]["portfolio_config"] = portfolio_config
             # Save into central users.json and also into per-user file
             try:
-                self._save_users()
+                self._save_users([username])
+            except Exception:
+                pass
+
+            try:
+                self._write_user_file(username, portfolio_config)
             except Exception:
                 pass
 
+            self.sessions.update_portfolio(username, portfolio_config)
+
             try:
-                user_file = self._user_file(username)
-                with open(user_file, 'w') as f:
-                    json.dump(portfolio_config, f, indent=2)
+                self.search_index.update(username, portfolio_config)
             except Exception:
                 pass
 
+            # Append to the revision log; history is best-effort and never blocks a save
+            try:
+                self.revisions.record(username, portfolio_config)
+            except Exception:
+                logger.exception("Could not record a revision for %r", username)
+
             return True
         return False
-        return False
+
+    def search_portfolios(self, query, limit=20):
+        """Ranked (username, score) matches for a skill/company/title/issuer query"""
+        return self.search_index.search(query, limit=limit)
+
+    def create_session(self, username):
+        """Start a login session and return its signed token"""
+        return self.sessions.create(username, self.users[username].get("portfolio_config", {}))
+
+    def resume_session(self, token):
+        """Return (username, portfolio_config, new_token) for a valid session token.
+
+        The token is single-use; new_token replaces it. Returns (None, None, None)
+        for an invalid or expired token.
+        """
+        username, portfolio, new_token = self.sessions.resume(token)
+        if username is None or not self.user_exists(username):
+            return None, None, None
+        if portfolio is None:
+            portfolio = self.get_user_portfolio(username)
+        return username, portfolio, new_token
+
+    def end_session(self, token):
+        """Log a session token out"""
+        self.sessions.end(token)
+
+    def list_portfolio_revisions(self, username):
+        """List saved revisions of a user's portfolio, oldest first"""
+        if not self.user_exists(username):
+            return []
+        return self.revisions.list_revisions(username)
+
+    def get_portfolio_revision(self, username, rev):
+        """Get a user's portfolio as it was at a given revision"""
+        if not self.user_exists(username):
+            return None
+        return self.revisions.get_revision(username, rev)
     
     def get_user_info(self, username):
         """Get user information (without password)"""
@@ -0,0 +1,84 @@
+"""
+Bulk user import and export
+
+Import records come from CSV or JSONL with the fields username, email,
+password or password_hash, and optionally portfolio (a JSON object, or JSON
+text in CSV) or portfolio_file (a path relative to the input file). Imported
+portfolios are stored only in their per-user files. Exports stream one JSON
+object per user and line, reading users.json incrementally and one portfolio
+file at a time.
+"""
+import csv
+from pathlib import Path
+
+from utils import serialization
+from utils.storage import resolve_user_data_file
+
+
+def _load_portfolio(record, base_dir):
+    """Resolve the optional portfolio / portfolio_file fields of one record"""
+    portfolio = record.get("portfolio")
+    if isinstance(portfolio, str):
+        portfolio = serialization.loads(portfolio) if portfolio.strip() else None
+    portfolio_file = record.get("portfolio_file")
+    if portfolio is None and portfolio_file:
+        portfolio = serialization.load_file(Path(base_dir) / portfolio_file)
+    if portfolio is not None and not isinstance(portfolio, dict):
+        raise ValueError(f"portfolio for {record.get('username')!r} is not a JSON object")
+    record["portfolio"] = portfolio
+    return record
+
+
+def read_user_records(path):
+    """Yield import records from a .csv or .jsonl file"""
+    path = Path(path)
+    base_dir = path.parent
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield _load_portfolio(dict(row), base_dir)
+        return
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield _load_portfolio(serialization.loads(line), base_dir)
+
+
+def iter_user_exports(data_dir, include_credentials=False):
+    """Yield one export record per user.
+
+    users.json is read one account at a time and each portfolio comes from its
+    own file, so memory stays flat however many users there are. Accounts from
+    before per-user files fall back to the portfolio embedded in users.json.
+    """
+    users_file = Path(data_dir) / "users.json"
+    if not users_file.exists():
+        return
+    for username, user in serialization.iter_object_items(users_file):
+        portfolio = user.pop("portfolio_config", None)
+        user_file = resolve_user_data_file(data_dir, username)
+        if user_file.exists():
+            try:
+                data = serialization.load_file(user_file)
+                if isinstance(data, dict):
+                    portfolio = data.get("portfolio_config", data)
+            except Exception:
+                pass
+        record = {
+            "username": username,
+            "email": user.get("email", ""),
+            "created_at": user.get("created_at"),
+        }
+        if include_credentials:
+            record["password_hash"] = user.get("password")
+        record["portfolio"] = portfolio if portfolio is not None else {}
+        yield record
+
+
+def write_jsonl(records, fileobj):
+    """Write records as JSON lines to a binary file object; returns the count"""
+    count = 0
+    for record in records:
+        fileobj.write(serialization.dumps_compact(record) + b"\n")
+        count += 1
+    return count
@@ -0,0 +1,224 @@
+"""
+Asynchronous multi-format portfolio export
+
+    payloads, manifest = export_portfolio_sync(config, ["html", "pdf_weasyprint", "json"])
+
+Formats render concurrently in an executor. Shared steps run once: a single
+HTML build feeds both the "html" output and the WeasyPrint PDF. Payloads go
+through the shared export cache, so an unchanged portfolio is not re-rendered.
+
+With out_dir, every format is written to <out_dir>/resume_<format>.<ext> and
+payloads hold Paths; PDFs are rendered straight into their files, so parallel
+exports never hold whole PDFs in memory.
+
+pdf_options are keyword arguments for the ReportLab renderer, e.g.
+{"max_pages": 1} to fit the resume on one page. pdf_optimize (True or a dict,
+see utils.pdf_optimize) shrinks both PDFs and adds each one's before/after
+sizes to the manifest when it was rendered by this call. Both are part of the
+cache key.
+"""
+import asyncio
+import functools
+import time
+from pathlib import Path
+
+from utils import serialization
+from utils.export_cache import export_cache, export_hash
+from utils.pdf_optimize import inline_image_resolver, optimize_options, options_key
+from utils.rendering import (
+    generate_portfolio_html, generate_portfolio_markdown,
+    generate_portfolio_pdf, html_to_pdf_weasyprint
+)
+
+
+# Export format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "html": ("html", "text/html"),
+    "pdf_weasyprint": ("pdf", "application/pdf"),
+    "pdf_reportlab": ("pdf", "application/pdf"),
+    "json": ("json", "application/json"),
+    "markdown": ("md", "text/markdown"),
+}
+
+
+class _ExportJob:
+    """Runs the render steps for one export request, sharing intermediate results"""
+
+    def __init__(self, portfolio_config, executor, use_cache, out_dir=None, pdf_options=None,
+                 pdf_optimize=None):
+        self.portfolio_config = portfolio_config
+        self.executor = executor
+        self.use_cache = use_cache
+        self.out_dir = Path(out_dir) if out_dir is not None else None
+        self.pdf_options = dict(pdf_options or {})
+        self.pdf_optimize = optimize_options(pdf_optimize)
+        self.reports = {}   # PDF format -> optimizer report, for PDFs rendered by this job
+        self.content_hash = export_hash(portfolio_config)
+        self._html_task = None
+        self._pdf_html_task = None
+
+    async def _run(self, fmt, func, *args):
+        """Run a blocking renderer in the executor, through the export cache"""
+        loop = asyncio.get_running_loop()
+
+        def build():
+            return func(*args)
+
+        if self.use_cache:
+            return await loop.run_in_executor(
+                self.executor,
+                lambda: export_cache.get_or_build(self.portfolio_config, fmt, build, self.content_hash)
+            )
+        return await loop.run_in_executor(self.executor, build)
+
+    def html(self):
+        """Shared HTML build; every consumer awaits the same task"""
+        if self._html_task is None:
+            self._html_task = asyncio.ensure_future(
+                self._run("html", generate_portfolio_html, self.portfolio_config)
+            )
+        return self._html_task
+
+    def pdf_html(self):
+        """HTML for the WeasyPrint PDF: the shared build, or one with downsampled inline images"""
+        if not self.pdf_optimize:
+            return self.html()
+        if self._pdf_html_task is None:
+            build = functools.partial(
+                generate_portfolio_html, self.portfolio_config,
+                image_resolver=inline_image_resolver(self.pdf_optimize)
+            )
+            self._pdf_html_task = asyncio.ensure_future(
+                self._run(f"html_inline:{options_key(self.pdf_optimize)}", build)
+            )
+        return self._pdf_html_task
+
+    def _optimize_kwargs(self, fmt):
+        if not self.pdf_optimize:
+            return {}
+        return {"optimize": self.pdf_optimize, "report": self.reports.setdefault(fmt, {})}
+
+    def weasyprint_pdf(self, html, target=None):
+        """The WeasyPrint renderer bound to this job's HTML and pdf_optimize"""
+        return functools.partial(html_to_pdf_weasyprint, html, target, **self._optimize_kwargs("pdf_weasyprint"))
+
+    def reportlab_pdf(self, target=None):
+        """The ReportLab renderer bound to this job's portfolio, pdf_options and pdf_optimize"""
+        return functools.partial(
+            generate_portfolio_pdf, self.portfolio_config, target,
+            **self.pdf_options, **self._optimize_kwargs("pdf_reportlab")
+        )
+
+    def pdf_cache_key(self, base, options=None):
+        suffix = ";".join(part for part in (options_key(options), options_key(self.pdf_optimize)) if part)
+        return f"{base}:{suffix}" if suffix else base
+
+    def output_path(self, fmt):
+        return self.out_dir / f"resume_{fmt}.{EXPORT_FORMATS[fmt][0]}"
+
+    async def render(self, fmt):
+        """Render fmt; returns bytes, or the written Path when out_dir is set"""
+        if self.out_dir is not None and fmt in ("pdf_weasyprint", "pdf_reportlab"):
+            return await self._render_pdf_to_file(fmt)
+        data = await self._render_bytes(fmt)
+        if self.out_dir is None or data is None:
+            return data
+        path = self.output_path(fmt)
+        path.write_bytes(data)
+        return path
+
+    async def _render_pdf_to_file(self, fmt):
+        """Stream a PDF straight into its output file"""
+        loop = asyncio.get_running_loop()
+        path = self.output_path(fmt)
+        if fmt == "pdf_weasyprint":
+            html = await self.pdf_html()
+            if html is None:
+                return None
+            written = await loop.run_in_executor(self.executor, self.weasyprint_pdf(html, path))
+        else:
+            written = await loop.run_in_executor(self.executor, self.reportlab_pdf(path))
+        return path if written is not None else None
+
+    async def _render_bytes(self, fmt):
+        if fmt == "html":
+            html = await self.html()
+            return html.encode("utf-8") if html is not None else None
+        if fmt == "pdf_weasyprint":
+            html = await self.pdf_html()
+            if html is None:
+                return None
+            return await self._run(self.pdf_cache_key("pdf"), self.weasyprint_pdf(html))
+        if fmt == "pdf_reportlab":
+            return await self._run(self.pdf_cache_key("pdf_reportlab", self.pdf_options), self.reportlab_pdf())
+        if fmt == "json":
+            return await self._run("json", serialization.dumps_pretty, self.portfolio_config)
+        if fmt == "markdown":
+            markdown = await self._run("markdown", generate_portfolio_markdown, self.portfolio_config)
+            return markdown.encode("utf-8") if markdown is not None else None
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+async def export_portfolio(portfolio_config, formats, executor=None, use_cache=True, out_dir=None,
+                           pdf_options=None, pdf_optimize=None):
+    """Render the requested formats concurrently.
+
+    Returns (payloads, manifest): payloads maps format -> bytes, or Path with out_dir
+    (None on failure); manifest is JSON-serializable with per-format size, seconds,
+    error and, with out_dir, the written path.
+    """
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(unknown)}")
+
+    if out_dir is not None:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+    job = _ExportJob(portfolio_config, executor, use_cache, out_dir, pdf_options, pdf_optimize)
+    started = time.perf_counter()
+
+    async def timed(fmt):
+        fmt_started = time.perf_counter()
+        try:
+            data, error = await job.render(fmt), None
+        except Exception as e:
+            data, error = None, str(e)
+        if data is None and error is None:
+            error = "render failed"
+        return fmt, data, error, time.perf_counter() - fmt_started
+
+    results = await asyncio.gather(*(timed(fmt) for fmt in dict.fromkeys(formats)))
+
+    payloads = {}
+    manifest = {
+        "content_hash": job.content_hash,
+        "total_seconds": round(time.perf_counter() - started, 4),
+        "formats": {},
+    }
+    for fmt, data, error, seconds in results:
+        payloads[fmt] = data
+        extension, mime = EXPORT_FORMATS[fmt]
+        if isinstance(data, Path):
+            size = data.stat().st_size
+        else:
+            size = len(data) if data is not None else 0
+        manifest["formats"][fmt] = {
+            "extension": extension,
+            "mime": mime,
+            "size": size,
+            "seconds": round(seconds, 4),
+            "error": error,
+        }
+        if isinstance(data, Path):
+            manifest["formats"][fmt]["path"] = str(data)
+        if job.reports.get(fmt):
+            manifest["formats"][fmt]["optimization"] = job.reports[fmt]
+    return payloads, manifest
+
+
+def export_portfolio_sync(portfolio_config, formats, executor=None, use_cache=True, out_dir=None,
+                          pdf_options=None, pdf_optimize=None):
+    """Blocking wrapper around export_portfolio for scripts and Streamlit callbacks"""
+    return asyncio.run(export_portfolio(
+        portfolio_config, formats, executor=executor, use_cache=use_cache, out_dir=out_dir,
+        pdf_options=pdf_options, pdf_optimize=pdf_optimize
+    ))
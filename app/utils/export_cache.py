@@ -0,0 +1,164 @@
+"""
+Versioned cache for portfolio export payloads (JSON, HTML, PDF)
+"""
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from utils import serialization
+
+
+# Bump when a renderer changes so payloads built by older code are not served
+EXPORT_CACHE_VERSION = 4
+
+# Large payloads (PDFs) are spooled to a private per-process temp directory
+# (created on first use) instead of being held in memory
+MAX_SPOOL_FILES = 256
+
+
+def portfolio_hash(portfolio_config):
+    """Return a stable content hash for a portfolio configuration"""
+    return hashlib.sha256(serialization.dumps_canonical(portfolio_config or {})).hexdigest()
+
+
+def referenced_files(portfolio_config):
+    """Yield the stored file paths a portfolio references (profile image, certificate files)"""
+    config = portfolio_config or {}
+    yield (config.get("personalInfo") or {}).get("profileImage")
+    for cert in (config.get("certificates") or {}).get("items", []) or []:
+        if isinstance(cert, dict):
+            yield cert.get("image")
+            yield cert.get("pdf")
+
+
+def export_hash(portfolio_config):
+    """Cache key for rendered exports: the portfolio content plus the size and mtime
+    of every file it references, so re-uploading an image under the same name
+    invalidates exports that embed it"""
+    digest = hashlib.sha256(serialization.dumps_canonical(portfolio_config or {}))
+    for path in referenced_files(portfolio_config):
+        if path and isinstance(path, str):
+            try:
+                stat_result = os.stat(path)
+                digest.update(f"\0{path}\0{stat_result.st_size}\0{stat_result.st_mtime_ns}".encode())
+            except OSError:
+                digest.update(f"\0{path}\0missing".encode())
+    return digest.hexdigest()
+
+
+class ExportCache:
+    """LRU cache of export payloads keyed by (version, export hash, format).
+
+    Identical portfolios share entries, so a payload is built at most once per
+    portfolio revision and format no matter how many reruns ask for it.
+    """
+
+    def __init__(self, max_entries=256, spool_dir=None, max_spool_files=MAX_SPOOL_FILES):
+        self.max_entries = max_entries
+        self._spool_dir = Path(spool_dir) if spool_dir is not None else None
+        self.max_spool_files = max_spool_files
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, portfolio_config, fmt, builder, content_hash=None):
+        """Return the cached payload for fmt, calling builder() on a miss.
+
+        Builders that return None (render failures) are not cached.
+        """
+        key = (EXPORT_CACHE_VERSION, content_hash or export_hash(portfolio_config), fmt)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        payload = builder()
+        if payload is None:
+            return None
+
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return payload
+
+    def get_or_build_file(self, portfolio_config, fmt, writer, suffix, content_hash=None):
+        """Return the path of a spooled payload for fmt, calling writer(path) on a miss.
+
+        The writer streams the payload straight to disk (e.g. a PDF renderer with a
+        target), so callers can hand out a file handle instead of in-memory bytes.
+        Returns None when the writer fails. The file may be pruned later, so use
+        open_or_build_file() when it is about to be read.
+        """
+        content_hash = content_hash or export_hash(portfolio_config)
+        path = self.spool_dir / f"v{EXPORT_CACHE_VERSION}-{content_hash}-{fmt}{suffix}"
+        if path.exists():
+            return path
+        if writer(path) is None or not path.exists():
+            return None
+        self._prune_spool()
+        return path
+
+    def open_or_build_file(self, portfolio_config, fmt, writer, suffix, content_hash=None):
+        """Like get_or_build_file(), but return an open binary file (or None).
+
+        A spooled file pruned between the lookup and the open is rebuilt once;
+        the open handle stays readable even if the file is pruned afterwards.
+        """
+        for _ in range(2):
+            path = self.get_or_build_file(portfolio_config, fmt, writer, suffix, content_hash)
+            if path is None:
+                return None
+            try:
+                return open(path, "rb")
+            except FileNotFoundError:
+                continue
+        return None
+
+    @property
+    def spool_dir(self):
+        """Spool directory; by default a private (mode 0700) temp directory per
+        process, created on first use and removed at exit"""
+        with self._lock:
+            if self._spool_dir is None:
+                self._spool_dir = Path(tempfile.mkdtemp(prefix="portfolio_exports-"))
+                atexit.register(shutil.rmtree, self._spool_dir, ignore_errors=True)
+            else:
+                self._spool_dir.mkdir(parents=True, exist_ok=True)
+            return self._spool_dir
+
+    def _prune_spool(self):
+        """Delete the oldest spooled files beyond max_spool_files"""
+        try:
+            files = sorted(self.spool_dir.iterdir(), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            return
+        for stale in files[:-self.max_spool_files]:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+    def invalidate(self, content_hash=None):
+        """Drop entries for one content hash, or everything when no hash is given"""
+        with self._lock:
+            if content_hash is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[1] == content_hash]:
+                del self._entries[key]
+        if content_hash is not None and self._spool_dir is not None and self._spool_dir.exists():
+            for spooled in self._spool_dir.glob(f"v*-{content_hash}-*"):
+                try:
+                    os.remove(spooled)
+                except OSError:
+                    pass
+
+
+# Process-wide cache shared by all sessions
+export_cache = ExportCache()
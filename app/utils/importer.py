@@ -0,0 +1,126 @@
+"""
+Size-bounded JSON import for uploaded portfolio files
+"""
+import codecs
+import json
+
+
+# Upload limits; anything larger than a real portfolio is rejected early
+MAX_IMPORT_BYTES = 2 * 1024 * 1024
+MAX_IMPORT_DEPTH = 32
+READ_CHUNK_SIZE = 64 * 1024
+
+# Sections counted in the import preview, mapped to where their items live
+SUMMARY_SECTIONS = {
+    "experience": ("experience", "items"),
+    "skills": ("skills", "categories"),
+    "projects": ("projects", "items"),
+    "education": ("education", "items"),
+    "certificates": ("certificates", "items"),
+    "socialLinks": ("socialLinks", None),
+}
+
+
+class ImportLimitError(ValueError):
+    """Raised when an upload exceeds the configured size or depth limits"""
+
+
+class _DepthScanner:
+    """Incrementally tracks JSON nesting depth across chunks without building objects"""
+
+    def __init__(self, max_depth):
+        self.max_depth = max_depth
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk):
+        """Scan a text chunk, raising ImportLimitError once max_depth is exceeded"""
+        for ch in chunk:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "[{":
+                self.depth += 1
+                if self.depth > self.max_depth:
+                    raise ImportLimitError(
+                        f"Uploaded JSON is nested deeper than {self.max_depth} levels"
+                    )
+            elif ch in "]}":
+                self.depth -= 1
+
+
+def read_limited(fileobj, max_bytes=MAX_IMPORT_BYTES, max_depth=MAX_IMPORT_DEPTH):
+    """Read an upload chunk by chunk, enforcing byte and depth limits as data arrives.
+
+    Returns the decoded text. Reading stops at the first chunk that breaks a limit,
+    so oversized or pathologically nested uploads never reach the JSON parser.
+    """
+    size = getattr(fileobj, "size", None)
+    if size is not None and size > max_bytes:
+        raise ImportLimitError(
+            f"Uploaded file is {size:,} bytes; the limit is {max_bytes:,} bytes"
+        )
+
+    if hasattr(fileobj, "seek"):
+        fileobj.seek(0)
+
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    scanner = _DepthScanner(max_depth)
+    parts = []
+    total = 0
+    while True:
+        chunk = fileobj.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise ImportLimitError(f"Uploaded file exceeds the {max_bytes:,} byte limit")
+        text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        scanner.feed(text)
+        parts.append(text)
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def parse_portfolio_upload(fileobj, max_bytes=MAX_IMPORT_BYTES, max_depth=MAX_IMPORT_DEPTH):
+    """Parse an uploaded portfolio JSON file within the configured limits.
+
+    Returns (portfolio, error). On failure portfolio is None and error describes why.
+    """
+    try:
+        text = read_limited(fileobj, max_bytes=max_bytes, max_depth=max_depth)
+    except ImportLimitError as e:
+        return None, str(e)
+    except UnicodeDecodeError:
+        return None, "Uploaded file is not valid UTF-8 text"
+
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        return None, f"Failed to parse uploaded JSON: {e}"
+
+    if not isinstance(data, dict):
+        return None, "Uploaded JSON must be an object at the top level"
+    return data, None
+
+
+def summarize_portfolio(portfolio):
+    """Return a lightweight summary (item counts per section) for previewing an import"""
+    personal_info = portfolio.get("personalInfo") or {}
+    summary = {
+        "name": personal_info.get("name", "") if isinstance(personal_info, dict) else "",
+        "modules": len(portfolio.get("modules") or []),
+    }
+    for label, (section, field) in SUMMARY_SECTIONS.items():
+        value = portfolio.get(section)
+        if field is not None:
+            value = value.get(field) if isinstance(value, dict) else None
+        summary[label] = len(value) if isinstance(value, list) else 0
+    return summary
@@ -0,0 +1,72 @@
+"""
+Persistent IDs for portfolio list items
+
+Every item in a list section (experience, skill categories, projects, ...)
+carries a short random "id" assigned when it is created. Editors use it for
+widget keys and merges use it to match items, so moving or removing one item
+does not disturb the state of the others.
+"""
+import secrets
+
+
+# List paths whose items carry an "id"
+ITEM_LIST_PATHS = (
+    ("experience", "items"),
+    ("skills", "categories"),
+    ("projects", "items"),
+    ("education", "items"),
+    ("certificates", "items"),
+    ("socialLinks",),
+    ("resume", "files"),
+)
+
+# Hex characters per generated ID (48 random bits)
+ITEM_ID_LENGTH = 12
+
+
+def new_item_id():
+    """Return a fresh random item ID"""
+    return secrets.token_hex(ITEM_ID_LENGTH // 2)
+
+
+def _item_list(portfolio_config, path):
+    node = portfolio_config
+    for key in path:
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+    return node if isinstance(node, list) else None
+
+
+def ensure_list_ids(items):
+    """Give every dict item in a list a unique "id"; returns the number assigned.
+
+    Items keep an existing ID unless an earlier item in the list already uses it
+    (e.g. an item duplicated by hand in an uploaded JSON).
+    """
+    assigned = 0
+    seen = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        item_id = item.get("id")
+        if not isinstance(item_id, str) or not item_id or item_id in seen:
+            item_id = new_item_id()
+            while item_id in seen:
+                item_id = new_item_id()
+            item["id"] = item_id
+            assigned += 1
+        seen.add(item_id)
+    return assigned
+
+
+def ensure_item_ids(portfolio_config):
+    """Backfill missing item IDs in every list section (in place); returns the number assigned"""
+    if not isinstance(portfolio_config, dict):
+        return 0
+    assigned = 0
+    for path in ITEM_LIST_PATHS:
+        items = _item_list(portfolio_config, path)
+        if items:
+            assigned += ensure_list_ids(items)
+    return assigned
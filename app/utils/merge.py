@@ -0,0 +1,166 @@
+"""
+Structural diff and merge of an uploaded portfolio into an existing one
+
+List sections are merged item by item: items are matched by their "id" when
+both sides have one, otherwise by a natural key (e.g. experience title +
+company). Matched items take only the fields that differ; fields missing from
+the upload are kept. Dict sections merge key by key, and sections absent from
+the upload are left alone. Unchanged parts of the existing portfolio are reused
+as-is, not copied.
+"""
+
+
+# List path -> item fields that identify an item when it has no "id"
+ITEM_KEYS = {
+    ("experience", "items"): ("title", "company"),
+    ("skills", "categories"): ("title",),
+    ("projects", "items"): ("title",),
+    ("education", "items"): ("title",),
+    ("certificates", "items"): ("title", "issuer"),
+    ("socialLinks",): ("name",),
+    ("resume", "files"): ("name",),
+}
+
+CHANGE_ADDED = "added"
+CHANGE_MODIFIED = "modified"
+CHANGE_REMOVED = "removed"
+CHANGE_KEPT = "kept"
+CHANGE_UNCHANGED = "unchanged"
+
+_MISSING = object()
+
+
+def item_key(item, fields):
+    """Natural key of a list item: normalized values of its identifying fields"""
+    if not isinstance(item, dict):
+        return ("value", repr(item))
+    return tuple(" ".join(str(item.get(field) or "").lower().split()) for field in fields)
+
+
+def _item_label(item, fields, position):
+    if isinstance(item, dict):
+        parts = [str(item.get(field)).strip() for field in fields if item.get(field)]
+        if parts:
+            return " @ ".join(parts)
+    return f"#{position + 1}"
+
+
+class PortfolioMerger:
+    """Merges one upload into one existing portfolio and records every change"""
+
+    def __init__(self, remove_missing=False):
+        self.remove_missing = remove_missing
+        self.changes = []
+
+    def _record(self, path, item, change, fields=()):
+        self.changes.append({
+            "section": path[0] if path else "",
+            "item": item,
+            "change": change,
+            "fields": ", ".join(fields),
+        })
+
+    def merge(self, old, new, path=()):
+        """Return the merged value; old itself when nothing changed"""
+        keyed = ITEM_KEYS.get(path)
+        if keyed and isinstance(old, list) and isinstance(new, list):
+            return self._merge_items(old, new, path, keyed)
+        if isinstance(old, dict) and isinstance(new, dict):
+            merged = None
+            for key, value in new.items():
+                current = old.get(key, _MISSING)
+                if current is _MISSING:
+                    self._record(path + (key,), ".".join(map(str, path[1:] + (key,))) or key, CHANGE_ADDED)
+                    result = value
+                else:
+                    result = self.merge(current, value, path + (key,))
+                    if result is current:
+                        continue
+                if merged is None:
+                    merged = dict(old)
+                merged[key] = result
+            return old if merged is None else merged
+        if old == new:
+            return old
+        self._record(path, ".".join(map(str, path[1:])) or str(path[0]), CHANGE_MODIFIED)
+        return new
+
+    def _merge_items(self, old_items, new_items, path, fields):
+        by_id, by_key = {}, {}
+        for i, item in enumerate(old_items):
+            if isinstance(item, dict) and item.get("id"):
+                by_id[item["id"]] = i
+            by_key.setdefault(item_key(item, fields), []).append(i)
+
+        used, matched, added, upload_order = set(), {}, [], []
+        for new_item in new_items:
+            match = by_id.get(new_item.get("id")) if isinstance(new_item, dict) and new_item.get("id") else None
+            if match is None or match in used:
+                candidates = [i for i in by_key.get(item_key(new_item, fields), []) if i not in used]
+                match = candidates[0] if candidates else None
+            if match is None:
+                added.append(new_item)
+                upload_order.append(new_item)
+                self._record(path, _item_label(new_item, fields, len(old_items) + len(added) - 1), CHANGE_ADDED)
+                continue
+            used.add(match)
+            matched[match] = self._merge_item(old_items[match], new_item, path, fields, match)
+            upload_order.append(matched[match])
+
+        changed = bool(added) or any(matched[i] is not old_items[i] for i in matched)
+        for i, old_item in enumerate(old_items):
+            if i not in used:
+                label = _item_label(old_item, fields, i)
+                if self.remove_missing:
+                    self._record(path, label, CHANGE_REMOVED)
+                    changed = True
+                else:
+                    self._record(path, label, CHANGE_KEPT)
+        if self.remove_missing:
+            # the upload is the whole list: follow its order
+            if not changed and all(a is b for a, b in zip(upload_order, old_items)):
+                return old_items
+            return upload_order
+        if not changed:
+            return old_items
+        # minimal change: keep the existing order, append new items
+        return [matched.get(i, item) for i, item in enumerate(old_items)] + added
+
+    def _merge_item(self, old_item, new_item, path, fields, position):
+        label = _item_label(old_item, fields, position)
+        if not (isinstance(old_item, dict) and isinstance(new_item, dict)):
+            if old_item == new_item:
+                self._record(path, label, CHANGE_UNCHANGED)
+                return old_item
+            self._record(path, label, CHANGE_MODIFIED)
+            return new_item
+        changed_fields = [key for key, value in new_item.items() if old_item.get(key, _MISSING) != value]
+        if not changed_fields:
+            self._record(path, label, CHANGE_UNCHANGED)
+            return old_item
+        self._record(path, label, CHANGE_MODIFIED, changed_fields)
+        merged = dict(old_item)
+        for key in changed_fields:
+            merged[key] = new_item[key]
+        return merged
+
+
+def merge_portfolios(existing, uploaded, remove_missing=False):
+    """Merge uploaded into existing without mutating either.
+
+    Returns (merged, changes): changes is a list of {"section", "item", "change",
+    "fields"} records, one per list item and per changed field elsewhere.
+    With remove_missing, list items absent from the upload are dropped instead
+    of kept.
+    """
+    merger = PortfolioMerger(remove_missing=remove_missing)
+    merged = merger.merge(existing or {}, uploaded or {})
+    return merged, merger.changes
+
+
+def summarize_changes(changes):
+    """Count change records by kind, e.g. {"added": 2, "modified": 1}"""
+    counts = {}
+    for change in changes:
+        counts[change["change"]] = counts.get(change["change"], 0) + 1
+    return counts
@@ -0,0 +1,252 @@
+"""
+Password hashing and login rate control
+
+Hashes are self-describing strings that carry their own salt and cost
+parameters, so each user keeps the parameters they were hashed with:
+
+    scrypt$<n>$<r>$<p>$<salt>$<hash>
+    pbkdf2_sha256$<iterations>$<salt>$<hash>
+
+Legacy unsalted SHA-256 hex digests still verify and are flagged for rehash,
+as are hashes made with parameters weaker than the current defaults.
+
+Slow hashes run on a bounded worker pool (HASH_WORKERS threads, at most
+HASH_MAX_PENDING queued), and LoginThrottle rejects clients with too many failures
+before any hashing happens, so a login burst cannot take over every core.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600_000
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+# scrypt needs OpenSSL 1.1+; fall back to PBKDF2 where it is missing
+DEFAULT_SCHEME = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+
+HASH_WORKERS = int(os.environ.get("PORTFOLIO_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+HASH_MAX_PENDING = int(os.environ.get("PORTFOLIO_HASH_MAX_PENDING", HASH_WORKERS * 4))
+# Seconds a request waits for a pool slot before being turned away
+HASH_QUEUE_TIMEOUT = 2.0
+# Shared failure limit for requests without a client IP; 0 (default) disables it
+ANONYMOUS_LOGIN_FAILURES = int(os.environ.get("PORTFOLIO_ANONYMOUS_LOGIN_FAILURES", "0") or 0)
+
+_LEGACY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class PasswordHashBusy(RuntimeError):
+    """Raised when the hashing pool is saturated"""
+
+
+def _b64(raw):
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p, dklen=HASH_BYTES)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=HASH_BYTES)
+
+
+def hash_password(password, scheme=DEFAULT_SCHEME):
+    """Return a salted, self-describing hash string for password"""
+    salt = os.urandom(SALT_BYTES)
+    if scheme == "scrypt":
+        digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+    if scheme == "pbkdf2_sha256":
+        digest = _pbkdf2(password, salt, PBKDF2_ITERATIONS)
+        return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(digest)}"
+    raise ValueError(f"Unknown password hash scheme: {scheme}")
+
+
+def is_password_hash(stored):
+    """True if stored looks like a hash this module can verify (used for bulk imports)"""
+    stored = str(stored or "")
+    if _LEGACY_RE.match(stored):
+        return True
+    parts = stored.split("$")
+    return (parts[0] == "scrypt" and len(parts) == 6) or (parts[0] == "pbkdf2_sha256" and len(parts) == 4)
+
+
+def verify_password(password, stored):
+    """Check password against a stored hash.
+
+    Returns (matches, needs_rehash); needs_rehash is True for legacy SHA-256
+    hashes and for hashes weaker than the current defaults.
+    """
+    stored = stored or ""
+    if _LEGACY_RE.match(stored):
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(candidate, stored), True
+
+    parts = stored.split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            candidate = _scrypt(password, _unb64(parts[4]), n, r, p)
+            weaker = (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        elif parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            iterations = int(parts[1])
+            candidate = _pbkdf2(password, _unb64(parts[2]), iterations)
+            weaker = iterations < PBKDF2_ITERATIONS
+        else:
+            return False, False
+        matches = hmac.compare_digest(candidate, _unb64(parts[-1]))
+    except (ValueError, TypeError):
+        return False, False
+    return matches, matches and (weaker or parts[0] != DEFAULT_SCHEME)
+
+
+class HashWorkerPool:
+    """Runs slow hashes on a fixed number of threads with a bounded queue"""
+
+    def __init__(self, workers=HASH_WORKERS, max_pending=HASH_MAX_PENDING,
+                 queue_timeout=HASH_QUEUE_TIMEOUT):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self.queue_timeout = queue_timeout
+
+    def run(self, func, *args):
+        """Run func(*args) on the pool and wait for it; raises PasswordHashBusy when full"""
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHashBusy("Too many concurrent password checks")
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+
+class _SlidingWindow:
+    """Counts events per key over the last `window` seconds"""
+
+    def __init__(self, limit, window, max_keys):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._events = {}
+
+    def _prune(self, key, now):
+        events = self._events.get(key)
+        if events is None:
+            return None
+        while events and events[0] <= now - self.window:
+            events.popleft()
+        if not events:
+            del self._events[key]
+            return None
+        return events
+
+    def retry_after(self, key, now):
+        """Seconds until key may act again (0 when under the limit)"""
+        events = self._prune(key, now)
+        if events is None or len(events) < self.limit:
+            return 0
+        return max(1, int(events[0] + self.window - now + 0.999))
+
+    def add(self, key, now):
+        events = self._prune(key, now)
+        if events is None:
+            if len(self._events) >= self.max_keys:
+                self._evict(now)
+            events = self._events[key] = deque()
+        events.append(now)
+
+    def clear(self, key):
+        self._events.pop(key, None)
+
+    def discard_oldest(self, key):
+        events = self._events.get(key)
+        if events:
+            events.popleft()
+            if not events:
+                del self._events[key]
+
+    def _evict(self, now):
+        for key in list(self._events):
+            self._prune(key, now)
+        # Still full: drop the keys that were created first
+        while len(self._events) >= self.max_keys:
+            del self._events[next(iter(self._events))]
+
+
+class LoginThrottle:
+    """Per-IP and per-username failure limits for login/signup.
+
+    Only failed logins (and signups, which cost a hash and an account) count
+    against the client IP; a successful login credits one failure back, so
+    users sharing a NAT or proxy address do not lock each other out by logging
+    in. Requests without a client IP are only limited per username unless
+    anonymous_failures is set: that shared bucket lets a single client block
+    every IP-less login, so it is opt-in. Checks happen before any hashing, so
+    throttled requests cost almost nothing.
+    """
+
+    def __init__(self, ip_failures=30, user_failures=5, window=300, max_keys=10000,
+                 anonymous_failures=ANONYMOUS_LOGIN_FAILURES):
+        self._ip = _SlidingWindow(ip_failures, window, max_keys)
+        self._anonymous = _SlidingWindow(anonymous_failures, window, 1) if anonymous_failures else None
+        self._user = _SlidingWindow(user_failures, window, max_keys)
+        self._lock = threading.Lock()
+
+    def _client_bucket(self, client_ip):
+        if client_ip:
+            return self._ip, client_ip
+        return self._anonymous, "*"
+
+    def check(self, username=None, client_ip=None):
+        """Return seconds to wait, or 0 if the attempt may proceed (nothing is counted)"""
+        now = time.monotonic()
+        bucket, key = self._client_bucket(client_ip)
+        with self._lock:
+            return max(
+                bucket.retry_after(key, now) if bucket is not None else 0,
+                self._user.retry_after(username, now) if username else 0,
+            )
+
+    def record_failure(self, username=None, client_ip=None):
+        """Count a failed login against the client IP and, for existing usernames, the
+        username (so made-up names cannot evict real ones)"""
+        now = time.monotonic()
+        bucket, key = self._client_bucket(client_ip)
+        with self._lock:
+            if bucket is not None:
+                bucket.add(key, now)
+            if username:
+                self._user.add(username, now)
+
+    def record_signup(self, client_ip=None):
+        """Count a signup against the client IP like a failed login"""
+        self.record_failure(client_ip=client_ip)
+
+    def record_success(self, username=None, client_ip=None):
+        """Reset the username's failures and credit one failure back to the client IP"""
+        bucket, key = self._client_bucket(client_ip)
+        with self._lock:
+            if username:
+                self._user.clear(username)
+            if bucket is not None:
+                bucket.discard_oldest(key)
+
+
+# Process-wide pool and throttle shared by all sessions
+hash_pool = HashWorkerPool()
+login_throttle = LoginThrottle()
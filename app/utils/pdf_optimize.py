@@ -0,0 +1,344 @@
+"""
+PDF size optimization for resume exports
+
+Both PDF renderers take an `optimize` argument: None/False (off), True (the
+PDF_OPTIMIZE_DEFAULTS) or a dict overriding some of them.
+
+- Images: inlined images are downsampled to image_dpi at their printed size and
+  re-encoded before they are embedded (inline_image_resolver). Identical images
+  become identical data URIs, which WeasyPrint embeds once. WeasyPrint also
+  re-encodes anything else it embeds (optimize_images, dpi, jpeg_quality).
+- Fonts: WeasyPrint embeds only the glyphs used. ReportLab uses the standard
+  PDF fonts, which are not embedded at all.
+- Streams: optimize_pdf() re-encodes Flate, ASCII85 and unfiltered streams as
+  single Flate streams at maximum level, then reports the sizes before and after.
+"""
+import base64
+import io
+import logging
+import math
+import re
+import zlib
+from functools import lru_cache
+from pathlib import Path
+
+from utils.assets import file_etag
+
+
+logger = logging.getLogger(__name__)
+
+PDF_OPTIMIZE_DEFAULTS = {
+    "image_dpi": 150,         # resolution of embedded images at their printed size
+    "jpeg_quality": 85,
+    "subset_fonts": True,
+    "compress_streams": True,
+}
+
+# Largest CSS size (px, 96 per inch) an inlined image is printed at: .profile-photo
+INLINE_IMAGE_CSS_PX = 100
+
+
+def optimize_options(optimize):
+    """Normalize an `optimize` argument to a full options dict, or None when off"""
+    if not optimize:
+        return None
+    options = dict(PDF_OPTIMIZE_DEFAULTS)
+    if isinstance(optimize, dict):
+        unknown = set(optimize) - set(options)
+        if unknown:
+            raise ValueError(f"Unknown PDF optimize option(s): {', '.join(sorted(unknown))}")
+        options.update(optimize)
+    return options
+
+
+def options_key(options):
+    """Stable text form of resolved options, for cache keys"""
+    return ",".join(f"{key}={value}" for key, value in sorted(options.items())) if options else ""
+
+
+def weasyprint_write_options(options):
+    """Keyword arguments for WeasyPrint's write_pdf (WeasyPrint >= 59)"""
+    return {
+        "optimize_images": True,
+        "jpeg_quality": options["jpeg_quality"],
+        "dpi": options["image_dpi"],
+        "full_fonts": not options["subset_fonts"],
+        "uncompressed_pdf": not options["compress_streams"],
+    }
+
+
+# -- images ------------------------------------------------------------------
+
+def downsample_image(raw, min_edge, jpeg_quality):
+    """Return (bytes, mime) with the shorter edge scaled down to min_edge and re-encoded.
+
+    The shorter edge is kept because images are cropped to fill their box
+    (object-fit: cover). Returns (raw, None) when re-encoding does not shrink it.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(raw)) as img:
+        if getattr(img, "is_animated", False):
+            return raw, None
+        scale = min_edge / min(img.size)
+        if scale < 1:
+            img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                             Image.LANCZOS)
+        out = io.BytesIO()
+        if img.mode in ("RGBA", "LA", "P"):
+            img.save(out, format="PNG", optimize=True)
+            mime = "image/png"
+        else:
+            img.convert("RGB").save(out, format="JPEG", quality=jpeg_quality, optimize=True)
+            mime = "image/jpeg"
+    optimized = out.getvalue()
+    return (optimized, mime) if len(optimized) < len(raw) else (raw, None)
+
+
+@lru_cache(maxsize=128)
+def _inline_data_uri(path, etag, min_edge, jpeg_quality):
+    raw = Path(path).read_bytes()
+    try:
+        data, mime = downsample_image(raw, min_edge, jpeg_quality)
+    except Exception:
+        data, mime = raw, None
+    if mime is None:
+        import mimetypes
+        mime = mimetypes.guess_type(path)[0] or "image/png"
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def inline_image_resolver(options):
+    """image_resolver for generate_portfolio_html that inlines downsampled images.
+
+    Data URIs are cached per file version, so the same image is encoded once
+    per process however many documents embed it.
+    """
+    min_edge = math.ceil(INLINE_IMAGE_CSS_PX / 96 * options["image_dpi"])
+
+    def resolve(path):
+        try:
+            stat_result = Path(path).stat()
+        except (OSError, TypeError):
+            return None
+        return _inline_data_uri(str(path), file_etag(stat_result), min_edge, options["jpeg_quality"])
+
+    return resolve
+
+
+# -- streams -----------------------------------------------------------------
+
+_OBJ_RE = re.compile(rb"(\d+)\s+(\d+)\s+obj\b")
+_STREAM_RE = re.compile(rb"stream(\r\n|\n)")
+_ENDSTREAM_RE = re.compile(rb"\s*endstream\s*endobj")
+_XREF_RE = re.compile(rb"(?<!start)xref\s")
+_LENGTH_RE = re.compile(rb"/Length\s+(\d+)\b(?!\s+\d+\s+R)")
+_FILTER_RE = re.compile(rb"/Filter\s*(/\w+|\[[^\]]*\])")
+_XREF_ENTRY_RE = re.compile(rb"(\d{10}) (\d{5}) ([nf])")
+
+# Filter chains optimize_pdf can decode and re-encode as a single FlateDecode
+_DECODERS = {
+    (): lambda content: content,
+    (b"FlateDecode",): zlib.decompress,
+    (b"ASCII85Decode", b"FlateDecode"): lambda content: zlib.decompress(_a85decode(content)),
+    (b"ASCII85Decode",): lambda content: _a85decode(content),
+}
+
+
+class _Unsupported(Exception):
+    """PDF structure the stream optimizer does not rewrite (left untouched)"""
+
+
+def _a85decode(content):
+    content = content.strip()
+    if content.endswith(b"~>"):
+        content = content[:-2]
+    return base64.a85decode(content)
+
+
+def _parse_objects(data):
+    """Split a PDF body into [(number, start, head_start, end, head, content)].
+
+    head and content are None for objects without a stream. Returns the
+    objects and the offset just past the last one.
+    """
+    objects, pos = [], 0
+    while True:
+        match = _OBJ_RE.search(data, pos)
+        if match is None:
+            return objects, pos
+        end_obj = data.find(b"endobj", match.end())
+        stream = _STREAM_RE.search(data, match.end(), end_obj if end_obj != -1 else len(data))
+        if stream is None:
+            if end_obj == -1:
+                raise _Unsupported("unterminated object")
+            objects.append((int(match.group(1)), match.start(), match.end(), end_obj + 6, None, None))
+            pos = end_obj + 6
+            continue
+        head = data[match.end():stream.start()]
+        if not head.rstrip().endswith(b">>"):
+            raise _Unsupported("unexpected stream dictionary")
+        length = _LENGTH_RE.search(head)
+        if length is None:
+            raise _Unsupported("indirect stream length")
+        content_start = stream.end()
+        content_end = content_start + int(length.group(1))
+        tail = _ENDSTREAM_RE.match(data, content_end)
+        if tail is None:
+            raise _Unsupported("stream length mismatch")
+        objects.append((int(match.group(1)), match.start(), match.end(), tail.end(),
+                        head, data[content_start:content_end]))
+        pos = tail.end()
+
+
+def _with_flate(head, length):
+    """Stream dictionary with a single FlateDecode filter and the given length"""
+    flate = b"/Filter /FlateDecode"
+    if _FILTER_RE.search(head):
+        head = _FILTER_RE.sub(flate, head, count=1)
+    else:
+        body = head.rstrip()
+        head = body[:-2] + b" " + flate + b">>" + head[len(body):]
+    return _LENGTH_RE.sub(b"/Length %d" % length, head, count=1)
+
+
+def _recompress(head, content, compress_unfiltered):
+    """Return (head, content) re-encoded as one Flate stream at maximum level, or None to keep it"""
+    if b"/XRef" in head or b"/Metadata" in head:
+        return None
+    match = _FILTER_RE.search(head)
+    chain = tuple(re.findall(rb"/(\w+)", match.group(1))) if match else ()
+    decoder = _DECODERS.get(chain)
+    if decoder is None or (not chain and not compress_unfiltered):
+        return None
+    if b"/DecodeParms" in head and chain != (b"FlateDecode",):
+        return None
+    try:
+        decoded = decoder(content)
+    except (ValueError, zlib.error):
+        return None
+    compressed = zlib.compress(decoded, 9)
+    if len(compressed) >= len(content):
+        return None
+    return _with_flate(head, len(compressed)), compressed
+
+
+def _rebuild_xref_table(data, xref_at, offsets):
+    """Rewrite a classic xref table (and keep its trailer) with new object offsets"""
+    trailer_at = data.find(b"trailer", xref_at)
+    if trailer_at == -1 or b"/Prev" in data[trailer_at:]:
+        raise _Unsupported("incremental update")
+    out, number = [], 0
+    for line in data[xref_at:trailer_at].splitlines():
+        line = line.strip()
+        entry = _XREF_ENTRY_RE.fullmatch(line)
+        if entry:
+            if entry.group(3) == b"n":
+                if number not in offsets:
+                    raise _Unsupported("xref entry without object")
+                line = b"%010d %s n" % (offsets[number], entry.group(2))
+            out.append(line + b" ")
+            number += 1
+        elif line:
+            if line != b"xref":
+                number = int(line.split()[0])
+            out.append(line)
+    return b"\n".join(out) + b"\n" + data[trailer_at:data.rfind(b"startxref")]
+
+
+def _rebuild_xref_stream(head, content, offsets):
+    """Rewrite a cross-reference stream's in-file entries with new object offsets"""
+    if b"/DecodeParms" in head or b"/Prev" in head:
+        raise _Unsupported("xref stream predictor or incremental update")
+    widths = [int(w) for w in re.search(rb"/W\s*\[\s*(\d+)\s+(\d+)\s+(\d+)\s*\]", head).groups()]
+    index = re.search(rb"/Index\s*\[([\d\s]+)\]", head)
+    ranges = [int(v) for v in index.group(1).split()] if index else [0, int(re.search(rb"/Size\s+(\d+)", head).group(1))]
+    raw = zlib.decompress(content) if _FILTER_RE.search(head) else content
+    numbers = [n for first, count in zip(ranges[::2], ranges[1::2]) for n in range(first, first + count)]
+    row_size = sum(widths)
+    if len(raw) != row_size * len(numbers):
+        raise _Unsupported("xref stream size mismatch")
+
+    new_widths = [widths[0] or 1, max(widths[1], math.ceil(math.log(max(offsets.values()) + 1, 256))), widths[2]]
+    encoded = bytearray()
+    for row, number in zip(range(0, len(raw), row_size), numbers):
+        fields, at = [], row
+        for width in widths:
+            fields.append(int.from_bytes(raw[at:at + width], "big") if width else 1)
+            at += width
+        if fields[0] == 1:
+            if number not in offsets:
+                raise _Unsupported("xref entry without object")
+            fields[1] = offsets[number]
+        for value, width in zip(fields, new_widths):
+            encoded += value.to_bytes(width, "big")
+    compressed = zlib.compress(bytes(encoded), 9)
+    head = re.sub(rb"/W\s*\[[^\]]*\]", b"/W [%d %d %d]" % tuple(new_widths), head, count=1)
+    return _with_flate(head, len(compressed)), compressed
+
+
+def _optimize_streams(data, options):
+    """Return (optimized PDF, streams rewritten); raises _Unsupported for files left as-is"""
+    if data.count(b"startxref") != 1:
+        raise _Unsupported("incremental update")
+    objects, body_end = _parse_objects(data)
+    if not objects:
+        raise _Unsupported("no objects")
+
+    out = bytearray()
+    offsets, streams, xref_object = {}, 0, None
+    previous_end = 0
+    for number, start, head_start, end, head, content in objects:
+        out += data[previous_end:start]
+        previous_end = end
+        offsets[number] = len(out)
+        if head is not None and b"/XRef" in head:
+            # written last, once every offset is known
+            if xref_object is not None or number != objects[-1][0]:
+                raise _Unsupported("unexpected xref stream position")
+            xref_object = (data[start:head_start], head, content)
+            continue
+        replaced = _recompress(head, content, options["compress_streams"]) if head is not None else None
+        if replaced is None:
+            out += data[start:end]
+            continue
+        new_head, new_content = replaced
+        out += data[start:head_start] + new_head + b"stream\n" + new_content + b"\nendstream\nendobj"
+        streams += 1
+
+    if xref_object is not None:
+        obj_start, head, content = xref_object
+        startxref = len(out)
+        new_head, new_content = _rebuild_xref_stream(head, content, offsets)
+        out += obj_start + new_head + b"stream\n" + new_content + b"\nendstream\nendobj\n"
+    else:
+        xref = _XREF_RE.search(data, body_end)
+        if xref is None:
+            raise _Unsupported("missing xref table")
+        out += data[previous_end:xref.start()]
+        startxref = len(out)
+        out += _rebuild_xref_table(data, xref.start(), offsets)
+    out += b"startxref\n%d\n%%%%EOF\n" % startxref
+    return bytes(out), streams
+
+
+def optimize_pdf(data, optimize=True):
+    """Recompress a finished PDF's streams; returns (data, report).
+
+    report holds "before" and "after" sizes in bytes, the number of streams
+    rewritten and, when the file was left as-is, the reason ("skipped").
+    Files with incremental updates or structures this pass does not parse are
+    returned unchanged.
+    """
+    options = optimize_options(optimize) or dict(PDF_OPTIMIZE_DEFAULTS)
+    report = {"before": len(data), "after": len(data), "streams": 0, "skipped": None}
+    try:
+        optimized, streams = _optimize_streams(data, options)
+    except (_Unsupported, AttributeError, ValueError, zlib.error) as e:
+        report["skipped"] = str(e) or type(e).__name__
+        return data, report
+    if len(optimized) < len(data):
+        data = optimized
+        report.update(after=len(data), streams=streams)
+    logger.info("PDF optimized: %d -> %d bytes (%d stream(s))", report["before"], report["after"], report["streams"])
+    return data, report
@@ -0,0 +1,183 @@
+"""
+Read-only public portfolio endpoint
+
+Serves rendered portfolio HTML at GET /<username> straight from the AuthManager
+data directory, without a Streamlit session. Rendered pages are cached in memory
+(plain and gzip) and only re-rendered when the user's data file changes; each
+file is re-checked at most once per STAT_INTERVAL seconds. Clients revalidate
+with ETag / If-None-Match.
+"""
+import gzip
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from utils import serialization
+from utils.assets import media_url
+from utils.rendering import generate_portfolio_html
+from utils.storage import resolve_user_data_file
+
+
+# Seconds a cached page is trusted before its data file is stat'ed again
+STAT_INTERVAL = 1.0
+# Rendered pages kept in memory; the least recently served are evicted first
+MAX_PAGES = 1024
+
+_USERNAME_RE = re.compile(r"^[\w.@+-]{1,150}$")
+
+
+class RenderedPage:
+    """A rendered portfolio page and its validators"""
+
+    __slots__ = ("body", "gzip_body", "etag", "source_key", "checked_at")
+
+    def __init__(self, body, source_key):
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6)
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+        self.source_key = source_key
+        self.checked_at = time.monotonic()
+
+
+class PortfolioPageCache:
+    """LRU cache of rendered pages per username, invalidated by data file size/mtime"""
+
+    def __init__(self, data_dir="data", stat_interval=STAT_INTERVAL, max_pages=MAX_PAGES):
+        self.data_dir = data_dir
+        self.stat_interval = stat_interval
+        self.max_pages = max_pages
+        self._pages = OrderedDict()
+        self._rendering = {}   # username -> Future of an in-progress render
+        self._lock = threading.Lock()
+
+    def get(self, username):
+        """Return the RenderedPage for username, or None if there is no portfolio"""
+        with self._lock:
+            page = self._pages.get(username)
+            if page is not None:
+                self._pages.move_to_end(username)
+        now = time.monotonic()
+        if page is not None and now - page.checked_at < self.stat_interval:
+            return page
+
+        path = resolve_user_data_file(self.data_dir, username)
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._pages.pop(username, None)
+            return None
+        source_key = (stat_result.st_size, stat_result.st_mtime_ns)
+        if page is not None and page.source_key == source_key:
+            page.checked_at = now
+            return page
+
+        # Render outside the cache lock so one large portfolio does not stall other
+        # requests; concurrent requests for the same user wait for the one render
+        with self._lock:
+            page = self._pages.get(username)
+            if page is not None and page.source_key == source_key:
+                return page
+            pending = self._rendering.get(username)
+            owner = pending is None
+            if owner:
+                pending = self._rendering[username] = Future()
+        if not owner:
+            return pending.result()
+
+        page = None
+        try:
+            page = self._render(path, source_key)
+        finally:
+            with self._lock:
+                del self._rendering[username]
+                if page is not None:
+                    self._pages[username] = page
+                    self._pages.move_to_end(username)
+                    while len(self._pages) > self.max_pages:
+                        self._pages.popitem(last=False)
+            pending.set_result(page)
+        return page
+
+    def _render(self, path, source_key):
+        try:
+            data = serialization.load_file(path)
+        except Exception:
+            return None
+        portfolio = data.get("portfolio_config", data) if isinstance(data, dict) else None
+        if not isinstance(portfolio, dict):
+            return None
+        html = generate_portfolio_html(portfolio, image_resolver=media_url)
+        if html is None:
+            return None
+        return RenderedPage(html.encode("utf-8"), source_key)
+
+
+class PublicPortfolioHandler(BaseHTTPRequestHandler):
+    """GET/HEAD /<username> -> rendered portfolio HTML"""
+
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls on keep-alive
+    disable_nagle_algorithm = True
+    server_version = "PortfolioPublic/1.0"
+    cache = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _send_empty(self, status, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "public, no-cache")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _serve(self, send_body):
+        username = unquote(urlsplit(self.path).path).strip("/")
+        if not _USERNAME_RE.match(username) or username.startswith("."):
+            self._send_empty(404)
+            return
+        page = self.cache.get(username)
+        if page is None:
+            self._send_empty(404)
+            return
+
+        if page.etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self._send_empty(304, page.etag)
+            return
+
+        use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        body = page.gzip_body if use_gzip else page.body
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", page.etag)
+        self.send_header("Cache-Control", "public, no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+def make_public_server(data_dir="data", host="0.0.0.0", port=8503):
+    """Build (but do not start) the public portfolio HTTP server"""
+    handler = type("BoundPublicPortfolioHandler", (PublicPortfolioHandler,),
+                   {"cache": PortfolioPageCache(data_dir)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,146 @@
+"""
+Publish a portfolio as a pre-rendered static site
+
+Output layout (servable by any static file server):
+    <out_dir>/index.html
+    <out_dir>/assets/style.<hash>.css
+    <out_dir>/assets/<hash>.<ext>        optimized images
+    <out_dir>/manifest.json              bookkeeping for incremental republish
+
+Republishing rewrites only files whose content changed and removes assets that
+are no longer referenced.
+"""
+import hashlib
+import io
+import os
+import re
+from pathlib import Path
+
+from utils import serialization
+from utils.rendering import generate_portfolio_html
+
+
+MANIFEST_NAME = "manifest.json"
+ASSETS_DIR = "assets"
+# Longest edge of published images, in pixels
+MAX_IMAGE_SIZE = 600
+
+_STYLE_RE = re.compile(r"<style>(.*?)</style>", re.S)
+
+
+def _short_hash(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def optimize_image(path, max_size=MAX_IMAGE_SIZE):
+    """Return (bytes, extension) of a downscaled, re-encoded image; falls back to the original"""
+    source = Path(path)
+    raw = source.read_bytes()
+    ext = source.suffix.lower() or ".png"
+    try:
+        from PIL import Image
+        with Image.open(io.BytesIO(raw)) as img:
+            if getattr(img, "is_animated", False):
+                return raw, ext
+            img.thumbnail((max_size, max_size))
+            out = io.BytesIO()
+            if img.mode in ("RGBA", "LA", "P"):
+                img.save(out, format="PNG", optimize=True)
+                ext = ".png"
+            else:
+                img.convert("RGB").save(out, format="JPEG", quality=85, optimize=True, progressive=True)
+                ext = ".jpg"
+        optimized = out.getvalue()
+        # keep the original when re-encoding does not help
+        if len(optimized) < len(raw):
+            return optimized, ext
+    except Exception:
+        pass
+    return raw, ext
+
+
+class SitePublisher:
+    """Renders a portfolio into a static directory, writing only what changed"""
+
+    def __init__(self, out_dir):
+        self.out_dir = Path(out_dir)
+        self.manifest_file = self.out_dir / MANIFEST_NAME
+        self.manifest = self._load_manifest()
+        self.written = []
+        self.unchanged = []
+        self.files = {}
+        self.images = {}
+
+    def _load_manifest(self):
+        try:
+            return serialization.load_file(self.manifest_file)
+        except Exception:
+            return {"files": {}, "images": {}}
+
+    def _write(self, rel_path, data):
+        """Write data to rel_path unless the published copy is already identical"""
+        digest = _short_hash(data)
+        target = self.out_dir / rel_path
+        if self.manifest["files"].get(rel_path) == digest and target.exists():
+            self.unchanged.append(rel_path)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(target.name + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, target)
+            self.written.append(rel_path)
+        self.files[rel_path] = digest
+
+    def _publish_image(self, path):
+        """Publish an optimized copy of a stored image; returns its relative URL or None"""
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+        source_key = f"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"
+        cached = self.manifest.get("images", {}).get(str(path))
+        if cached and cached["source"] == source_key and (self.out_dir / cached["asset"]).exists():
+            rel_path = cached["asset"]
+            self.unchanged.append(rel_path)
+            self.files[rel_path] = self.manifest["files"].get(rel_path, "")
+        else:
+            data, ext = optimize_image(path)
+            rel_path = f"{ASSETS_DIR}/{_short_hash(data)}{ext}"
+            self._write(rel_path, data)
+        self.images[str(path)] = {"source": source_key, "asset": rel_path}
+        return rel_path
+
+    def publish(self, portfolio_config):
+        """Render and write the site. Returns {"written", "unchanged", "removed"} lists"""
+        html = generate_portfolio_html(portfolio_config, image_resolver=self._publish_image)
+        if html is None:
+            raise RuntimeError("Failed to render portfolio HTML")
+
+        # Move the inline stylesheet into a content-hashed CSS file
+        match = _STYLE_RE.search(html)
+        if match:
+            css = match.group(1).encode("utf-8")
+            css_path = f"{ASSETS_DIR}/style.{_short_hash(css)}.css"
+            self._write(css_path, css)
+            html = html[:match.start()] + f'<link rel="stylesheet" href="{css_path}">' + html[match.end():]
+
+        self._write("index.html", html.encode("utf-8"))
+
+        removed = []
+        for rel_path in self.manifest.get("files", {}):
+            if rel_path not in self.files:
+                try:
+                    (self.out_dir / rel_path).unlink()
+                    removed.append(rel_path)
+                except FileNotFoundError:
+                    pass
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = {"files": self.files, "images": self.images}
+        serialization.dump_file(self.manifest_file, self.manifest)
+        return {"written": self.written, "unchanged": self.unchanged, "removed": removed}
+
+
+def publish_portfolio(portfolio_config, out_dir):
+    """Publish a portfolio to out_dir; see SitePublisher.publish for the result"""
+    return SitePublisher(out_dir).publish(portfolio_config)
@@ -0,0 +1,631 @@
+"""
+Resume rendering: HTML (WeasyPrint-ready), ReportLab PDF and Markdown
+"""
+import logging
+import os
+import re
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from utils.pdf_optimize import optimize_options, optimize_pdf, weasyprint_write_options
+from utils.skills import skill_categories
+from utils.themes import compile_theme
+
+
+logger = logging.getLogger(__name__)
+
+# Link schemes allowed in user-supplied hrefs (anything else could run script)
+LINK_SCHEMES = ("http", "https", "mailto")
+_BARE_HOST_RE = re.compile(r"[\w-]+(\.[\w-]+)+(/|$)")
+_CONTROL_RE = re.compile(r"[\x00-\x20]")
+
+
+def safe_link_url(url):
+    """Return url if it is an http(s)/mailto link, https:// + url for a bare host, else "#" """
+    url = str(url or "").strip()
+    try:
+        # browsers ignore control characters and spaces inside a scheme ("java\tscript:")
+        scheme = urlsplit(_CONTROL_RE.sub("", url)).scheme.lower()
+    except ValueError:
+        return "#"
+    if scheme in LINK_SCHEMES:
+        return url
+    if not scheme and _BARE_HOST_RE.match(url):
+        return "https://" + url
+    return "#"
+
+
+def _report_error(message):
+    """Show an error in the Streamlit page when running inside one, else log it"""
+    try:
+        import streamlit as st
+        from streamlit import runtime
+        if runtime.exists():
+            st.error(message)
+            return
+    except ImportError:
+        pass
+    logger.error(message)
+
+
+def _write_pdf(write, target):
+    """Call write(sink) for a path (written atomically via a temp file) or a file-like target"""
+    if isinstance(target, (str, os.PathLike)):
+        path = Path(target)
+        tmp = path.with_name(path.name + ".tmp")
+        try:
+            write(str(tmp))
+            os.replace(tmp, path)
+        finally:
+            # a failed render must not leave a partial file behind
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+    else:
+        write(target)
+    return target
+
+
+def _optimized_pdf(data, options, target, report):
+    """Run the size optimizer over rendered PDF bytes, then return them or write them to target"""
+    data, stats = optimize_pdf(data, options)
+    if report is not None:
+        report.update(stats)
+    if target is None:
+        return data
+
+    def write(sink):
+        if isinstance(sink, str):
+            Path(sink).write_bytes(data)
+        else:
+            sink.write(data)
+    return _write_pdf(write, target)
+
+
+def html_to_pdf_weasyprint(html_string, target=None, optimize=None, report=None):
+    """Convert HTML string to PDF using WeasyPrint
+
+    With a target (path or binary file-like object) the PDF is streamed straight into it
+    and the target is returned, so no in-memory copy is kept; otherwise returns bytes.
+
+    optimize (True or a dict, see utils.pdf_optimize) subsets fonts, re-encodes images and
+    recompresses streams; the PDF is then built in memory and report, if given, receives
+    its before/after sizes.
+    """
+    try:
+        from weasyprint import HTML
+        
+        options = optimize_options(optimize)
+        if options:
+            data = HTML(string=html_string).write_pdf(**weasyprint_write_options(options))
+            return _optimized_pdf(data, options, target, report)
+        if target is None:
+            return HTML(string=html_string).write_pdf()
+        return _write_pdf(lambda sink: HTML(string=html_string).write_pdf(sink), target)
+    except Exception as e:
+        _report_error(f"Error converting HTML to PDF: {str(e)}")
+        return None
+
+
+def generate_portfolio_html(portfolio_config, image_resolver=None):
+    """Generate full HTML resume from portfolio configuration
+
+    image_resolver(path) may return a URL for a stored image (e.g. assets.media_url);
+    images it resolves are referenced instead of being inlined as base64.
+    """
+    try:
+        import html as html_lib
+        
+        def escape_html(text):
+            """Escape special HTML characters and newlines"""
+            if not text:
+                return ""
+            text = str(text)
+            text = html_lib.escape(text)
+            text = text.replace('\n', '<br>')
+            text = text.replace('\r', '')
+            return text
+        
+        personal_info = portfolio_config.get("personalInfo", {})
+        modules = portfolio_config.get("modules", [])
+
+        # Prepare profile image (embed as data URI so the HTML preview displays correctly)
+        profile_img_tag = ""
+        try:
+            profile_path = personal_info.get('profileImage')
+            profile_url = image_resolver(profile_path) if profile_path and image_resolver else None
+            if profile_url:
+                profile_img_tag = f'<img src="{html_lib.escape(profile_url)}" class="profile-photo" alt="Profile photo"/>'
+            elif profile_path:
+                import base64, mimetypes, pathlib
+                p = pathlib.Path(profile_path)
+                if p.is_file():
+                    mime, _ = mimetypes.guess_type(str(p))
+                    if not mime:
+                        mime = 'image/png'
+                    with open(p, 'rb') as imgf:
+                        b = base64.b64encode(imgf.read()).decode('utf-8')
+                    profile_img_tag = f'<img src="data:{mime};base64,{b}" class="profile-photo" alt="Profile photo"/>'
+        except Exception:
+            # non-fatal: if embedding fails, leave empty and continue
+            profile_img_tag = ""
+        
+        # Platform icon mapping
+        platform_icons = {
+            "linkedin": "💼",
+            "github": "🐙",
+            "instagram": "📸",
+            "twitter": "𝕏",
+            "x": "𝕏",
+            "facebook": "👍",
+            "youtube": "▶️",
+            "portfolio": "🌐",
+            "email": "✉️",
+            "website": "🌍",
+            "telegram": "✈️",
+            "discord": "🎮",
+            "reddit": "👽",
+        }
+        
+        # Choose template; the compiled theme carries the validated template and stylesheet
+        theme = compile_theme(portfolio_config.get('theme'))
+        template_key = theme.template
+
+        # Build header HTML depending on template
+        if template_key == 'classic':
+            # Two-column header: image left, name/title right
+            header_html = (
+                '<div class="header" style="display:flex;align-items:center;gap:20px;">'
+                f'<div style="flex:0 0 120px;">{profile_img_tag}</div>'
+                '<div style="flex:1;text-align:left;">'
+                f'<div class="name">{escape_html(personal_info.get("name", "Your Name"))}</div>'
+                f'<div class="title">{escape_html(personal_info.get("title", "Professional"))}</div>'
+                f'<div class="contact-info">{escape_html(" | ".join([personal_info.get("email", ""), personal_info.get("phone", "")]).strip(" |"))}</div>'
+                '</div></div>'
+            )
+        elif template_key == 'compact':
+            # Compact: small photo inline, smaller fonts
+            header_html = (
+                '<div class="header" style="text-align:left;padding-bottom:8px;">'
+                f'<div style="float:left;margin-right:12px;width:72px;">{profile_img_tag}</div>'
+                f'<div class="name" style="font-size:22px;">{escape_html(personal_info.get("name", "Your Name"))}</div>'
+                f'<div class="title" style="font-size:12px;">{escape_html(personal_info.get("title", "Professional"))}</div>'
+                '<div style="clear:both;"></div></div>'
+            )
+        else:
+            # Modern (default): centered image, name, title
+            header_html = (
+                '<div class="header">'
+                f'{profile_img_tag}'
+                f'<div class="name">{escape_html(personal_info.get("name", "Your Name"))}</div>'
+                f'<div class="title">{escape_html(personal_info.get("title", "Professional"))}</div>'
+                f'<div class="contact-info">{escape_html(" | ".join([personal_info.get("email", ""), personal_info.get("phone", "")]).strip(" |"))}</div>'
+                '</div>'
+            )
+
+        html = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Portfolio Resume</title>
+            <style>
+{theme_css}
+            </style>
+        </head>
+        <body>
+                <div class="resume-container">
+                    <!-- Header -->
+                    {header_html}
+        """.format(
+            theme_css=theme.css,
+            header_html=header_html
+        )
+        
+        # Summary Section
+        if personal_info.get('summary') or personal_info.get('about'):
+            summary = personal_info.get('summary') or personal_info.get('about')
+            html += '<div class="section"><div class="summary">' + escape_html(summary) + '</div></div>'
+        
+        # Experience
+        if "experience" in modules:
+            experience = portfolio_config.get("experience", {})
+            if experience.get("items"):
+                html += '<div class="section">'
+                html += '<div class="section-title">EXPERIENCE</div>'
+                for exp in experience.get("items", []):
+                    html += '<div class="item"><div class="item-title">' + escape_html(exp.get('title', 'N/A')) + ' @ ' + escape_html(exp.get('company', 'N/A')) + '</div>'
+                    html += '<div class="item-subtitle">' + escape_html(exp.get('period', 'N/A')) + '</div>'
+                    html += '<div class="item-description"><ul>'
+                    for desc in exp.get("description", []):
+                        html += '<li>' + escape_html(desc) + '</li>'
+                    html += '</ul></div></div>'
+                html += '</div>'
+        
+        # Skills
+        if "skills" in modules:
+            skills = portfolio_config.get("skills", {})
+            if skills.get("categories"):
+                html += '<div class="section">'
+                html += '<div class="section-title">SKILLS</div>'
+                for category, skill_list in skill_categories(portfolio_config):
+                    cat_title = category.get('title', 'Skills')
+                    html += '<div class="skill-category"><div class="skill-category-title">' + escape_html(cat_title) + '</div><div class="skills-container">'
+                    for skill in skill_list:
+                        html += '<span class="skill-badge">' + escape_html(skill) + '</span>'
+                    html += '</div></div>'
+                html += '</div>'
+        
+        # Projects
+        if "projects" in modules:
+            projects = portfolio_config.get("projects", {})
+            if projects.get("items"):
+                html += '<div class="section"><div class="section-title">PROJECTS</div>'
+                for project in projects.get("items", []):
+                    html += '<div class="item"><div class="item-title">' + escape_html(project.get('title', 'N/A')) + '</div>'
+                    if project.get('url'):
+                        html += '<div class="item-subtitle">' + escape_html(project.get("url")) + '</div>'
+                    if project.get('description'):
+                        html += '<div class="item-description">' + escape_html(project.get("description")) + '</div>'
+                    html += '</div>'
+                html += '</div>'
+        
+        # Education
+        if "education" in modules:
+            education = portfolio_config.get("education", {})
+            if education.get("items"):
+                html += '<div class="section"><div class="section-title">EDUCATION</div>'
+                for edu in education.get("items", []):
+                    html += '<div class="item"><div class="item-title">' + escape_html(edu.get('title', 'N/A')) + '</div>'
+                    html += '<div class="item-subtitle">' + escape_html(edu.get('period', 'N/A')) + '</div>'
+                    if edu.get('description'):
+                        html += '<div class="item-description">' + escape_html(edu.get("description")) + '</div>'
+                    html += '</div>'
+                html += '</div>'
+        
+        # Certificates
+        if "certificates" in modules:
+            certificates = portfolio_config.get("certificates", {})
+            if certificates.get("items"):
+                html += '<div class="section"><div class="section-title">CERTIFICATES</div>'
+                for cert in certificates.get("items", []):
+                    html += '<div class="item"><div class="item-title">' + escape_html(cert.get('title', 'N/A')) + '</div>'
+                    html += '<div class="item-subtitle">Issuer: ' + escape_html(cert.get('issuer', 'N/A')) + '</div>'
+                    if cert.get('date'):
+                        html += '<div class="item-subtitle">Date: ' + escape_html(cert.get("date")) + '</div>'
+                    html += '</div>'
+                html += '</div>'
+        
+        # Social Links
+        if portfolio_config.get("socialLinks"):
+            html += '<div class="section">'
+            html += '<div class="section-title">CONNECT</div>'
+            html += '<div class="social-links">'
+            for link in portfolio_config.get("socialLinks", []):
+                name = link.get('name', '').lower()
+                url = safe_link_url(link.get('url'))
+                icon = platform_icons.get(name, '🔗')
+                html += '<a href="' + escape_html(url) + '" target="_blank" rel="noopener noreferrer" class="social-link"><span class="social-icon">' + icon + '</span> ' + escape_html(link.get("name")) + '</a>'
+            html += '</div></div>'
+        
+        # Footer
+        html += '<div class="footer">Generated with Streamlit Portfolio Builder</div>'
+        html += '</div></body></html>'
+        
+        return html
+    except Exception as e:
+        import traceback
+        error_msg = f"Error generating HTML: {str(e)}\n\n{traceback.format_exc()}"
+        _report_error(error_msg)
+        return None
+
+
+# Page budget fitting (generate_portfolio_pdf(max_pages=...)): spacing shrinks first,
+# then font size; each bound is searched in PDF_FIT_STEPS bisection steps
+MIN_PDF_SPACING_SCALE = 0.25
+MIN_PDF_FONT_SCALE = 0.7
+PDF_FIT_STEPS = 7
+
+
+def _pdf_groups(portfolio_config, styles, spacing_scale=1.0):
+    """Build the resume story as keep-together groups of flowables.
+
+    The header, every list item and the footer are one group each; a section
+    heading is grouped with the section's first item so it never ends a page.
+    """
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Spacer
+
+    def gap(inches):
+        return Spacer(1, inches * inch * spacing_scale)
+
+    groups = []
+
+    def add_section(heading, items, render_item):
+        for position, item in enumerate(items):
+            group = [Paragraph(heading, styles["section_heading"]), gap(0.08)] if position == 0 else []
+            group.extend(render_item(item))
+            groups.append(group)
+
+    # Personal Info Section
+    personal_info = portfolio_config.get("personalInfo", {})
+    name = personal_info.get('name', 'Your Name')
+    title = personal_info.get('title', 'Professional')
+    header = [Paragraph(name, styles["title"]), Paragraph(title, styles["subtitle"])]
+
+    # Contact Information
+    contact_parts = []
+    if personal_info.get('email'):
+        contact_parts.append(f"✉ {personal_info.get('email')}")
+    if personal_info.get('phone'):
+        contact_parts.append(f"☎ {personal_info.get('phone')}")
+    if contact_parts:
+        header.append(Paragraph(" | ".join(contact_parts), styles["contact"]))
+    header.append(gap(0.15))
+
+    # Summary section
+    summary_text = personal_info.get('summary') or personal_info.get('about')
+    if summary_text:
+        header.append(Paragraph(summary_text, styles["normal"]))
+        header.append(gap(0.15))
+    groups.append(header)
+
+    # Experience Section
+    modules = portfolio_config.get("modules", [])
+    if "experience" in modules:
+        def experience_item(exp):
+            # Job title and company
+            job_text = f"{exp.get('title', 'N/A')} @ {exp.get('company', 'N/A')}"
+            flowables = [Paragraph(job_text, styles["item_heading"]),
+                         Paragraph(exp.get('period', 'N/A'), styles["item_sub"])]
+            # Description
+            for desc in exp.get("description", []):
+                flowables.append(Paragraph(f"• {desc}", styles["normal"]))
+            flowables.append(gap(0.08))
+            return flowables
+        add_section("EXPERIENCE", portfolio_config.get("experience", {}).get("items") or [], experience_item)
+
+    # Skills Section
+    if "skills" in modules:
+        def skills_item(entry):
+            category, skill_list = entry
+            flowables = [Paragraph(f"<b>{category.get('title', 'Skills')}</b>", styles["item_heading"])]
+            if skill_list:
+                flowables.append(Paragraph(", ".join(skill_list), styles["skills"]))
+            flowables.append(gap(0.06))
+            return flowables
+        add_section("SKILLS", list(skill_categories(portfolio_config)), skills_item)
+
+    # Projects Section
+    if "projects" in modules:
+        def project_item(project):
+            flowables = [Paragraph(f"<b>{project.get('title', 'N/A')}</b>", styles["item_heading"])]
+            if project.get('url'):
+                flowables.append(Paragraph(f"<i>{project.get('url')}</i>", styles["item_sub"]))
+            if project.get('description'):
+                flowables.append(Paragraph(project.get('description'), styles["normal"]))
+            flowables.append(gap(0.08))
+            return flowables
+        add_section("PROJECTS", portfolio_config.get("projects", {}).get("items") or [], project_item)
+
+    # Education Section
+    if "education" in modules:
+        def education_item(edu):
+            flowables = [Paragraph(edu.get('title', 'N/A'), styles["item_heading"]),
+                         Paragraph(edu.get('period', 'N/A'), styles["item_sub"])]
+            if edu.get('description'):
+                flowables.append(Paragraph(edu.get('description'), styles["normal"]))
+            flowables.append(gap(0.08))
+            return flowables
+        add_section("EDUCATION", portfolio_config.get("education", {}).get("items") or [], education_item)
+
+    # Certificates Section
+    if "certificates" in modules:
+        def certificate_item(cert):
+            flowables = [Paragraph(cert.get('title', 'N/A'), styles["item_heading"]),
+                         Paragraph(f"<b>Issuer:</b> {cert.get('issuer', 'N/A')}", styles["normal"])]
+            if cert.get('date'):
+                flowables.append(Paragraph(f"<b>Date:</b> {cert.get('date')}", styles["normal"]))
+            flowables.append(gap(0.08))
+            return flowables
+        add_section("CERTIFICATES", portfolio_config.get("certificates", {}).get("items") or [], certificate_item)
+
+    # Social Links Section
+    links = portfolio_config.get("socialLinks") or []
+    add_section(
+        "CONNECT", links,
+        lambda link: [Paragraph(f"<b>{link.get('name', '')}</b>: {link.get('url', '')}", styles["normal"])]
+    )
+    if links:
+        groups[-1].append(gap(0.15))
+
+    # Footer
+    groups.append([gap(0.1), Paragraph("Generated with Streamlit Portfolio Builder", styles["footer"])])
+    return groups
+
+
+def _pdf_frame_size():
+    """Usable (width, height) of the resume's page frame"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+
+    # SimpleDocTemplate: 1 inch side margins, our 0.4 inch top/bottom, 6pt frame padding
+    return A4[0] - 2 * inch - 12, A4[1] - 0.8 * inch - 12
+
+
+def _build_pdf_doc(sink, story):
+    """Lay out story on A4 into sink; returns the number of pages"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate
+
+    doc = SimpleDocTemplate(sink, pagesize=A4, topMargin=0.4*inch, bottomMargin=0.4*inch)
+    doc.build(story)
+    return doc.page
+
+
+def count_pdf_pages(groups, width, height):
+    """Page count for keep-together groups, from flowable heights alone (nothing is drawn).
+
+    Mirrors the frame rules: a group that does not fit the rest of a page moves to
+    the next one unless it is taller than a page, in which case it flows; space
+    before a flowable is dropped at the top of a page.
+    """
+    pages, used = 1, 0.0
+    for group in groups:
+        sizes = []
+        for flowable in group:
+            _, flowable_height = flowable.wrap(width, height)
+            sizes.append((flowable_height, flowable.getSpaceBefore(), flowable.getSpaceAfter()))
+        total = sum(h + before + after for h, before, after in sizes)
+        if used and used + total > height and total <= height:
+            pages, used = pages + 1, 0.0
+        for flowable_height, before, after in sizes:
+            needed = flowable_height + (before if used else 0)
+            if used and used + needed > height:
+                pages, used, needed = pages + 1, 0.0, flowable_height
+            used += needed + after
+    return pages
+
+
+def fit_pdf_scales(portfolio_config, max_pages):
+    """Largest (font_scale, spacing_scale) whose layout fits in max_pages.
+
+    Spacing is bisected first at full font size; fonts shrink only when minimum
+    spacing is not enough. Each probe measures paragraph heights instead of
+    rendering, so fitting costs a few layout passes, not a PDF per step. Returns
+    the minimum scales when even they do not fit.
+    """
+    width, height = _pdf_frame_size()
+    theme = compile_theme(portfolio_config.get("theme"))
+
+    def fits(font_scale, spacing_scale):
+        styles = theme.reportlab_styles(font_scale, spacing_scale)
+        groups = _pdf_groups(portfolio_config, styles, spacing_scale)
+        return count_pdf_pages(groups, width, height) <= max_pages
+
+    def bisect(low, probe):
+        # probe(low) fits, probe(1.0) does not: find the largest fitting value
+        high = 1.0
+        for _ in range(PDF_FIT_STEPS):
+            middle = (low + high) / 2
+            if probe(middle):
+                low = middle
+            else:
+                high = middle
+        return low
+
+    if fits(1.0, 1.0):
+        return 1.0, 1.0
+    if fits(1.0, MIN_PDF_SPACING_SCALE):
+        return 1.0, bisect(MIN_PDF_SPACING_SCALE, lambda spacing: fits(1.0, spacing))
+    if not fits(MIN_PDF_FONT_SCALE, MIN_PDF_SPACING_SCALE):
+        return MIN_PDF_FONT_SCALE, MIN_PDF_SPACING_SCALE
+    return bisect(MIN_PDF_FONT_SCALE, lambda font: fits(font, MIN_PDF_SPACING_SCALE)), MIN_PDF_SPACING_SCALE
+
+
+def generate_portfolio_pdf(portfolio_config, target=None, paginate=False, max_pages=None,
+                           optimize=None, report=None):
+    """Generate visually rich PDF from portfolio configuration with colors, icons, and styling
+
+    With a target (path or binary file-like object) the PDF is written straight into it
+    and the target is returned; otherwise returns bytes.
+
+    paginate keeps each item (and each section heading with its first item) on one
+    page. max_pages implies paginate and scales spacing, then fonts, down until the
+    resume fits that many pages (see fit_pdf_scales). optimize and report work as
+    in html_to_pdf_weasyprint.
+    """
+    try:
+        from io import BytesIO
+        from reportlab.platypus import KeepTogether
+
+        font_scale = spacing_scale = 1.0
+        if max_pages:
+            paginate = True
+            font_scale, spacing_scale = fit_pdf_scales(portfolio_config, max_pages)
+
+        styles = compile_theme(portfolio_config.get("theme")).reportlab_styles(font_scale, spacing_scale)
+
+        def make_story():
+            groups = _pdf_groups(portfolio_config, styles, spacing_scale)
+            if paginate:
+                return [KeepTogether(group) for group in groups]
+            return [flowable for group in groups for flowable in group]
+
+        # Build PDF
+        def build(sink):
+            pages = _build_pdf_doc(sink, make_story())
+            if max_pages and pages > max_pages:
+                logger.info("Resume needs %d page(s) at minimum scale (budget %d)", pages, max_pages)
+
+        options = optimize_options(optimize)
+        if target is not None and not options:
+            return _write_pdf(build, target)
+        pdf_buffer = BytesIO()
+        build(pdf_buffer)
+        if options:
+            return _optimized_pdf(pdf_buffer.getvalue(), options, target, report)
+        return pdf_buffer.getvalue()
+    except Exception as e:
+        _report_error(f"Error generating PDF: {str(e)}")
+        return None
+
+
+def generate_portfolio_markdown(portfolio_config):
+    """Generate a Markdown resume from portfolio configuration"""
+    try:
+        personal_info = portfolio_config.get("personalInfo", {})
+        modules = portfolio_config.get("modules", [])
+        lines = [f"# {personal_info.get('name', 'Your Name')}"]
+        if personal_info.get('title'):
+            lines.append(f"**{personal_info.get('title')}**")
+        contact = [c for c in (personal_info.get('email'), personal_info.get('phone')) if c]
+        if contact:
+            lines.append(" | ".join(contact))
+        summary = personal_info.get('summary') or personal_info.get('about')
+        if summary:
+            lines += ["", summary]
+
+        if "experience" in modules and portfolio_config.get("experience", {}).get("items"):
+            lines += ["", "## Experience"]
+            for exp in portfolio_config["experience"]["items"]:
+                lines += ["", f"### {exp.get('title', 'N/A')} @ {exp.get('company', 'N/A')}",
+                          f"*{exp.get('period', 'N/A')}*"]
+                lines += [f"- {desc}" for desc in exp.get("description", [])]
+
+        if "skills" in modules and portfolio_config.get("skills", {}).get("categories"):
+            lines += ["", "## Skills", ""]
+            for category, skill_list in skill_categories(portfolio_config):
+                lines.append(f"- **{category.get('title', 'Skills')}:** {', '.join(skill_list)}")
+
+        if "projects" in modules and portfolio_config.get("projects", {}).get("items"):
+            lines += ["", "## Projects"]
+            for project in portfolio_config["projects"]["items"]:
+                title = project.get('title', 'N/A')
+                lines += ["", f"### [{title}]({project['url']})" if project.get('url') else f"### {title}"]
+                if project.get('description'):
+                    lines.append(project.get('description'))
+
+        if "education" in modules and portfolio_config.get("education", {}).get("items"):
+            lines += ["", "## Education"]
+            for edu in portfolio_config["education"]["items"]:
+                lines += ["", f"### {edu.get('title', 'N/A')}", f"*{edu.get('period', 'N/A')}*"]
+                if edu.get('description'):
+                    lines.append(edu.get('description'))
+
+        if "certificates" in modules and portfolio_config.get("certificates", {}).get("items"):
+            lines += ["", "## Certificates", ""]
+            for cert in portfolio_config["certificates"]["items"]:
+                date = f" ({cert.get('date')})" if cert.get('date') else ""
+                lines.append(f"- **{cert.get('title', 'N/A')}** — {cert.get('issuer', 'N/A')}{date}")
+
+        if portfolio_config.get("socialLinks"):
+            lines += ["", "## Connect", ""]
+            for link in portfolio_config["socialLinks"]:
+                lines.append(f"- [{link.get('name', '')}]({link.get('url', '')})")
+
+        return "\n".join(lines) + "\n"
+    except Exception as e:
+        _report_error(f"Error generating Markdown: {str(e)}")
+        return None
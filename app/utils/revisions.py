@@ -0,0 +1,296 @@
+"""
+Portfolio revision history stored as compact JSON deltas with periodic snapshots
+"""
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from utils import serialization
+from utils.export_cache import portfolio_hash
+from utils.storage import bucket_dir, file_lock
+
+
+# Write a full snapshot at least every SNAPSHOT_INTERVAL revisions
+SNAPSHOT_INTERVAL = 10
+# Revisions kept per user once the log is compacted
+MAX_REVISIONS = 50
+
+
+def compute_delta(old, new, path=None):
+    """Return a list of ops that turns `old` into `new`.
+
+    Ops are compact lists:
+      ["=", path, value]  set the value at path (an empty path replaces the document)
+      ["-", path]         delete a dict key
+      ["+", path, items]  extend the list at path
+      ["T", path, n]      truncate the list at path to n items
+    """
+    path = path or []
+    if type(old) is not type(new):
+        return [["=", path, new]]
+    if isinstance(new, dict):
+        ops = [["-", path + [key]] for key in old if key not in new]
+        for key, value in new.items():
+            if key in old:
+                ops.extend(compute_delta(old[key], value, path + [key]))
+            else:
+                ops.append(["=", path + [key], value])
+        return ops
+    if isinstance(new, list):
+        ops = []
+        common = min(len(old), len(new))
+        for i in range(common):
+            ops.extend(compute_delta(old[i], new[i], path + [i]))
+        if len(new) < len(old):
+            ops.append(["T", path, len(new)])
+        elif len(new) > len(old):
+            ops.append(["+", path, new[common:]])
+        return ops
+    if old != new:
+        return [["=", path, new]]
+    return []
+
+
+def apply_delta(doc, ops):
+    """Apply ops from compute_delta to doc (mutated in place) and return the result"""
+    for op in ops:
+        kind, path = op[0], op[1]
+        if kind == "=" and not path:
+            doc = op[2]
+            continue
+        target = doc
+        for key in (path if kind in ("+", "T") else path[:-1]):
+            target = target[key]
+        if kind == "=":
+            target[path[-1]] = op[2]
+        elif kind == "-":
+            del target[path[-1]]
+        elif kind == "+":
+            target.extend(op[2])
+        elif kind == "T":
+            del target[op[2]:]
+    return doc
+
+
+class RevisionUnavailable(Exception):
+    """A revision's log entries cannot be replayed (e.g. its base snapshot is missing)"""
+
+
+def _copy(doc):
+    """Deep-copy a JSON document via the serializer (faster than copy.deepcopy)"""
+    return serialization.loads(serialization.dumps_compact(doc))
+
+
+class RevisionStore:
+    """Append-only per-user revision logs under `<data_dir>/revisions/<h0h1>/<h2h3>/`.
+
+    Each log is JSONL; a line holds either a full snapshot or a delta against the
+    previous revision. Retrieval replays at most SNAPSHOT_INTERVAL - 1 deltas on
+    top of the nearest snapshot. Use get_revision_store() so every session in a
+    process shares one store; appends and compactions also take a per-user file
+    lock, and cached indexes are checked against the log before each use.
+    """
+
+    def __init__(self, revisions_dir, snapshot_interval=SNAPSHOT_INTERVAL, max_revisions=MAX_REVISIONS):
+        self.revisions_dir = Path(revisions_dir)
+        self.revisions_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_interval = snapshot_interval
+        self.max_revisions = max_revisions
+        self._index = {}   # username -> list of (rev, offset, is_snapshot, ts, hash)
+        self._read = {}    # username -> (inode, bytes indexed) of the log
+        self._latest = {}  # username -> (hash, document) of the newest revision
+        self._lock = threading.Lock()
+
+    def _log_file(self, username):
+        """Return Path for a user's revision log, in the same hashed buckets as portfolio files"""
+        return bucket_dir(self.revisions_dir, username) / f"{username}.jsonl"
+
+    def _lock_file(self, username):
+        return bucket_dir(self.revisions_dir, username) / f"{username}.lock"
+
+    def _adopt_flat_log(self, username):
+        """Move a log from the old flat revisions/ layout into its bucket; True if one was moved"""
+        legacy = self.revisions_dir / f"{username}.jsonl"
+        if not legacy.exists():
+            return False
+        target = self._log_file(username)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(legacy, target)
+        except FileNotFoundError:
+            pass  # another process moved it first
+        try:
+            os.remove(self.revisions_dir / f"{username}.lock")
+        except OSError:
+            pass
+        return True
+
+    def _load_index(self, username):
+        """Return the line index for a user's log, catching up with writes by other processes"""
+        log_file = self._log_file(username)
+        try:
+            stat_result = os.stat(log_file)
+        except FileNotFoundError:
+            if self._adopt_flat_log(username):
+                return self._load_index(username)
+            # cleared in place: record() may hold this list while it appends the first line
+            index = self._index.setdefault(username, [])
+            del index[:]
+            self._read[username] = (None, 0)
+            self._latest.pop(username, None)
+            return index
+        inode, offset = self._read.get(username, (None, 0))
+        if username in self._index and inode == stat_result.st_ino and offset == stat_result.st_size:
+            return self._index[username]
+        index = self._index.setdefault(username, [])
+        if inode != stat_result.st_ino or offset > stat_result.st_size:
+            # first read, or the log was rewritten by a compaction
+            del index[:]
+            offset = 0
+        self._latest.pop(username, None)
+        with open(log_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partially written line; read it next time
+                try:
+                    record = serialization.loads(line)
+                    index.append((record["rev"], offset, "snapshot" in record,
+                                  record.get("ts"), record.get("hash")))
+                except Exception:
+                    # skip a torn write
+                    pass
+                offset += len(line)
+        self._read[username] = (stat_result.st_ino, offset)
+        return index
+
+    def _materialize(self, username, position):
+        """Rebuild the document at index position from the nearest preceding snapshot"""
+        index = self._load_index(username)
+        start = position
+        while start >= 0 and not index[start][2]:
+            start -= 1
+        if start < 0:
+            raise RevisionUnavailable(f"no snapshot precedes revision {index[position][0]} of {username!r}")
+        doc = None
+        with open(self._log_file(username), 'rb') as f:
+            for _, offset, is_snapshot, _, _ in index[start:position + 1]:
+                f.seek(offset)
+                record = serialization.loads(f.readline())
+                doc = record["snapshot"] if is_snapshot else apply_delta(doc, record["delta"])
+        return doc
+
+    def _latest_document(self, username):
+        """Return (hash, document) of the newest revision, or (None, None)"""
+        # catching up with the log first drops a cached document other writers superseded
+        index = self._load_index(username)
+        if username not in self._latest:
+            if not index:
+                return None, None
+            self._latest[username] = (index[-1][4], self._materialize(username, len(index) - 1))
+        return self._latest[username]
+
+    def record(self, username, portfolio_config):
+        """Append a revision if the portfolio changed. Returns the new revision number or None"""
+        content_hash = portfolio_hash(portfolio_config)
+        doc = _copy(portfolio_config)
+        with self._lock, file_lock(self._lock_file(username)):
+            # re-validated under the file lock, so the delta base and rev are the log's newest
+            prev_hash, prev_doc = self._latest_document(username)
+            if prev_hash == content_hash:
+                return None
+            index = self._load_index(username)
+
+            rev = index[-1][0] + 1 if index else 1
+            record = {"rev": rev, "ts": datetime.now().isoformat(), "hash": content_hash}
+
+            since_snapshot = 0
+            for entry in reversed(index):
+                if entry[2]:
+                    break
+                since_snapshot += 1
+            if prev_doc is not None and since_snapshot + 1 < self.snapshot_interval:
+                record["delta"] = compute_delta(prev_doc, doc)
+                # A delta larger than half a snapshot is not worth replaying
+                if len(serialization.dumps_compact(record["delta"])) * 2 > len(serialization.dumps_compact(doc)):
+                    del record["delta"]
+            if "delta" not in record:
+                record["snapshot"] = doc
+
+            line = serialization.dumps_compact(record) + b"\n"
+            with open(self._log_file(username), 'ab') as f:
+                offset = f.tell()
+                f.write(line)
+                inode = os.fstat(f.fileno()).st_ino
+            index.append((rev, offset, "snapshot" in record, record["ts"], content_hash))
+            self._read[username] = (inode, offset + len(line))
+            self._latest[username] = (content_hash, doc)
+
+            if len(index) > self.max_revisions + self.snapshot_interval:
+                self._compact(username)
+            return rev
+
+    def list_revisions(self, username):
+        """Return [{"rev", "ts", "snapshot"}] for a user, oldest first"""
+        with self._lock:
+            return [{"rev": rev, "ts": ts, "snapshot": is_snapshot}
+                    for rev, _, is_snapshot, ts, _ in self._load_index(username)]
+
+    def get_revision(self, username, rev):
+        """Return the portfolio at revision `rev`, or None if it is not retained"""
+        with self._lock:
+            index = self._load_index(username)
+            for position, entry in enumerate(index):
+                if entry[0] == rev:
+                    return self._materialize(username, position)
+            return None
+
+    def compact(self, username):
+        """Apply the retention policy to a user's log now"""
+        with self._lock, file_lock(self._lock_file(username)):
+            self._load_index(username)
+            self._compact(username)
+
+    def _compact(self, username):
+        """Keep the newest max_revisions, re-basing the oldest kept one as a snapshot.
+
+        Callers hold the user's file lock and have just refreshed the index.
+        """
+        index = self._index[username]
+        if len(index) <= self.max_revisions:
+            return
+        first = len(index) - self.max_revisions
+        log_file = self._log_file(username)
+        tmp_file = log_file.with_suffix(".jsonl.tmp")
+        base = self._materialize(username, first)
+        new_index = []
+        with open(log_file, 'rb') as src, open(tmp_file, 'wb') as dst:
+            for position in range(first, len(index)):
+                rev, offset, is_snapshot, ts, content_hash = index[position]
+                if position == first and not is_snapshot:
+                    record = {"rev": rev, "ts": ts, "hash": content_hash, "snapshot": base}
+                    line = serialization.dumps_compact(record) + b"\n"
+                    is_snapshot = True
+                else:
+                    src.seek(offset)
+                    line = src.readline()
+                new_index.append((rev, dst.tell(), is_snapshot, ts, content_hash))
+                dst.write(line)
+            size = dst.tell()
+        os.replace(tmp_file, log_file)
+        self._index[username] = new_index
+        self._read[username] = (os.stat(log_file).st_ino, size)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_revision_store(data_dir="data"):
+    """Return the process-wide RevisionStore for a data directory"""
+    key = str(Path(data_dir).resolve())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = RevisionStore(Path(data_dir) / "revisions")
+        return _stores[key]
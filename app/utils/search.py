@@ -0,0 +1,378 @@
+"""
+Full-text search over portfolios (skills, experience, projects, certificates)
+
+Terms are indexed per field ("skill:python", "company:acme", ...) in an
+inverted index. Postings are compact arrays of (doc id, weight); updating a
+portfolio retires its old doc id instead of rewriting postings, and dead
+entries are dropped when the index is compacted. Queries are ranked with BM25.
+
+The index is persisted as an append-only JSONL log ({data_dir}/search/index.jsonl),
+one line per portfolio update. It is only loaded into memory on the first
+query, so processes that just save portfolios only append. Loaded indexes pick
+up lines appended by other processes on their next query, and the log is
+rewritten when most of it is superseded: on a query, or on a write once the
+log has grown past COMPACT_MIN_BYTES and twice its last compacted size.
+Appends and rewrites hold a lock file, so processes cannot lose each other's
+lines.
+"""
+import heapq
+import math
+import os
+import re
+import tempfile
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+
+from utils import serialization
+from utils.skills import canonical_skill, skill_categories
+from utils.storage import file_lock
+
+
+# Field -> weight of one occurrence
+FIELD_WEIGHTS = {
+    "skill": 3.0,
+    "title": 2.0,
+    "company": 2.0,
+    "cert": 2.0,
+    "issuer": 2.0,
+    "text": 1.0,
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Rewrite the log / id space once this many superseded entries pile up
+COMPACT_MIN_DEAD = 1000
+# Writers rewrite the log once it is this large and twice its last compacted size
+COMPACT_MIN_BYTES = 8 << 20
+
+_TOKEN_RE = re.compile(r"[a-z0-9](?:[a-z0-9+#]|\.(?=[a-z0-9]))*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or our the to was were with".split()
+)
+
+
+def tokenize(text):
+    """Lowercase word tokens; keeps tech spellings like c++, c#, node.js"""
+    return [token for token in _TOKEN_RE.findall(str(text or "").lower()) if token not in _STOPWORDS]
+
+
+def portfolio_terms(portfolio_config):
+    """Return {"field:term": weight} for the searchable parts of a portfolio"""
+    texts = {field: [] for field in FIELD_WEIGHTS}
+
+    def add(field, text):
+        if text:
+            texts[field].append(str(text))
+
+    config = portfolio_config or {}
+    for _, skills in skill_categories(config):
+        for skill in skills:
+            add("skill", skill)
+    for item in (config.get("experience") or {}).get("items", []) or []:
+        if isinstance(item, dict):
+            add("title", item.get("title"))
+            add("company", item.get("company"))
+            description = item.get("description")
+            add("text", " ".join(description) if isinstance(description, list) else description)
+    for item in (config.get("projects") or {}).get("items", []) or []:
+        if isinstance(item, dict):
+            add("title", item.get("title"))
+            add("text", item.get("description"))
+    for item in (config.get("certificates") or {}).get("items", []) or []:
+        if isinstance(item, dict):
+            add("cert", item.get("title"))
+            add("issuer", item.get("issuer"))
+
+    # one tokenizer pass per field; Counter does the tallying in C
+    terms = {}
+    for field, parts in texts.items():
+        if parts:
+            weight = FIELD_WEIGHTS[field]
+            for token, count in Counter(tokenize(" \n ".join(parts))).items():
+                terms[f"{field}:{token}"] = count * weight
+    return terms
+
+
+def parse_query(query):
+    """Split a query into [(terms, required)]; "company:acme" limits a term to one field.
+
+    terms are alternative "field:token" keys. Skills are indexed under canonical
+    names, so skill terms are looked up by canonical name ("k8s" finds Kubernetes);
+    other fields hold text as written and match the raw token or the canonical one.
+    Field-qualified terms are required, bare terms are not.
+    """
+    parsed = []
+    for part in str(query or "").split():
+        field, sep, text = part.partition(":")
+        if sep and field.lower() in FIELD_WEIGHTS:
+            field = field.lower()
+            tokens = tokenize(canonical_skill(text) or text) if field == "skill" else tokenize(text)
+            parsed.extend(((f"{field}:{token}",), True) for token in tokens)
+            continue
+        raw = tokenize(part)
+        canonical = tokenize(canonical_skill(part) or part)
+        terms = [f"skill:{token}" for token in canonical]
+        terms.extend(f"{field}:{token}" for field in FIELD_WEIGHTS if field != "skill"
+                     for token in dict.fromkeys(raw + canonical))
+        if terms:
+            parsed.append((tuple(terms), False))
+    return parsed
+
+
+class SearchIndex:
+    """Inverted index over portfolios with an append-only on-disk log"""
+
+    def __init__(self, index_dir):
+        self.index_dir = Path(index_dir)
+        self.log_path = self.index_dir / "index.jsonl"
+        self.lock_path = self.index_dir / "index.lock"
+        self._lock = threading.RLock()
+        self._compacted_size = 0
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._postings = {}      # term -> (array of doc ids, array of weights)
+        self._usernames = []     # doc id -> username, None once superseded
+        self._doc_len = array("f")
+        self._doc_ids = {}       # username -> live doc id
+        self._total_len = 0.0
+        self._dead = 0
+        self._log_offset = 0
+        self._log_inode = None
+
+    # -- in-memory updates -------------------------------------------------
+
+    def _retire(self, username):
+        doc_id = self._doc_ids.pop(username, None)
+        if doc_id is not None:
+            self._usernames[doc_id] = None
+            self._total_len -= self._doc_len[doc_id]
+            self._dead += 1
+
+    def _apply(self, username, terms):
+        self._retire(username)
+        if not terms:
+            return
+        doc_id = len(self._usernames)
+        self._usernames.append(username)
+        self._doc_ids[username] = doc_id
+        length = sum(terms.values())
+        self._doc_len.append(length)
+        self._total_len += length
+        postings = self._postings
+        for term, weight in terms.items():
+            posting = postings.get(term)
+            if posting is None:
+                posting = postings[term] = (array("I"), array("f"))
+            posting[0].append(doc_id)
+            posting[1].append(weight)
+
+    # -- persistence -------------------------------------------------------
+
+    def _refresh(self):
+        """Apply log lines appended since the last read (by any process)"""
+        try:
+            stat_result = os.stat(self.log_path)
+        except FileNotFoundError:
+            if self._log_inode is not None:
+                self._reset()
+            return
+        if stat_result.st_ino != self._log_inode or stat_result.st_size < self._log_offset:
+            # rewritten by a compaction
+            self._reset()
+            self._log_inode = stat_result.st_ino
+        if stat_result.st_size == self._log_offset:
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partially written line; read it next time
+                self._log_offset += len(line)
+                try:
+                    entry = serialization.loads(line)
+                except ValueError:
+                    continue
+                self._apply(entry["u"], entry.get("t"))
+
+    def _append(self, entries):
+        """Append entries to the log (file lock held); returns the log size"""
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        data = b"".join(serialization.dumps_compact({"u": u, "t": t}) + b"\n" for u, t in entries)
+        with open(self.log_path, "ab") as f:
+            f.write(data)
+            return f.tell()
+
+    def _rewrite_log(self):
+        """Rewrite the log keeping each user's newest entry (file lock held).
+
+        Used on the write path, where the index is not loaded: it reads the log
+        line by line and holds only the live lines.
+        """
+        latest = {}
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = serialization.loads(line)
+                except ValueError:
+                    continue
+                latest.pop(entry["u"], None)
+                if entry.get("t"):
+                    latest[entry["u"]] = line
+        self._compacted_size = self._replace_log(latest.values())
+
+    def _replace_log(self, lines):
+        """Atomically replace the log with lines; returns its new size"""
+        fd, tmp = tempfile.mkstemp(dir=self.index_dir, prefix=".index-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for line in lines:
+                    f.write(line)
+                size = f.tell()
+            os.replace(tmp, self.log_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return size
+
+    def update(self, username, portfolio_config):
+        """Re-index one portfolio (None removes it)"""
+        self.update_many([(username, portfolio_config)])
+
+    def update_many(self, items):
+        """Re-index many (username, portfolio_config) pairs with a single log append"""
+        self.update_terms([(username, portfolio_terms(config) if config is not None else None)
+                           for username, config in items])
+
+    def update_terms(self, entries):
+        """Apply precomputed (username, portfolio_terms) pairs with a single log append"""
+        with self._lock:
+            with file_lock(self.lock_path):
+                size = self._append(entries)
+                if size > max(COMPACT_MIN_BYTES, 2 * self._compacted_size):
+                    self._rewrite_log()
+            if self._loaded:
+                # read back through the log so lines appended by other processes apply in order
+                self._sync()
+
+    def _sync(self):
+        """Load or catch up with the log, compacting it when mostly superseded"""
+        self._refresh()
+        self._loaded = True
+        if self._dead > max(COMPACT_MIN_DEAD, len(self._doc_ids)):
+            self._compact()
+
+    def _compact(self):
+        """Drop superseded docs: renumber ids, filter postings, rewrite the log"""
+        with file_lock(self.lock_path):
+            # lines appended by other processes since the last read must survive the rewrite
+            self._refresh()
+            self._compact_loaded()
+
+    def _compact_loaded(self):
+        remap = array("I", [0]) * len(self._usernames)
+        usernames, doc_len = [], array("f")
+        for doc_id, username in enumerate(self._usernames):
+            if username is not None:
+                remap[doc_id] = len(usernames)
+                usernames.append(username)
+                doc_len.append(self._doc_len[doc_id])
+        alive = self._usernames
+        doc_terms = [{} for _ in usernames]
+        postings = {}
+        for term, (ids, weights) in self._postings.items():
+            new_ids, new_weights = array("I"), array("f")
+            for doc_id, weight in zip(ids, weights):
+                if alive[doc_id] is not None:
+                    new_ids.append(remap[doc_id])
+                    new_weights.append(weight)
+                    doc_terms[remap[doc_id]][term] = weight
+            if new_ids:
+                postings[term] = (new_ids, new_weights)
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._compacted_size = self._replace_log(
+            serialization.dumps_compact({"u": username, "t": terms}) + b"\n"
+            for username, terms in zip(usernames, doc_terms)
+        )
+
+        stat_result = self.log_path.stat()
+        self._postings, self._usernames, self._doc_len = postings, usernames, doc_len
+        self._doc_ids = {username: i for i, username in enumerate(usernames)}
+        self._dead = 0
+        self._log_offset, self._log_inode = stat_result.st_size, stat_result.st_ino
+
+    def rebuild(self, items):
+        """Replace the whole index with the given (username, portfolio_config) pairs"""
+        with self._lock:
+            self._reset()
+            with file_lock(self.lock_path):
+                try:
+                    os.remove(self.log_path)
+                except FileNotFoundError:
+                    pass
+            self.update_many(items)
+            self._sync()
+
+    # -- queries -----------------------------------------------------------
+
+    def __len__(self):
+        with self._lock:
+            self._sync()
+            return len(self._doc_ids)
+
+    def search(self, query, limit=20):
+        """Return up to limit (username, score) pairs, best first.
+
+        Bare terms match any field; field-qualified terms (skill:, title:,
+        company:, cert:, issuer:, text:) must match for a portfolio to be listed.
+        """
+        parsed = parse_query(query)
+        if not parsed:
+            return []
+        with self._lock:
+            self._sync()
+            doc_count = len(self._doc_ids)
+            if not doc_count:
+                return []
+            avg_len = self._total_len / doc_count
+            usernames, doc_len = self._usernames, self._doc_len
+            scores = {}
+            required = []
+            for terms, is_required in parsed:
+                matched = set()
+                for term in terms:
+                    posting = self._postings.get(term)
+                    if posting is None:
+                        continue
+                    ids, weights = posting
+                    live = [(d, w) for d, w in zip(ids, weights) if usernames[d] is not None]
+                    if not live:
+                        continue
+                    idf = math.log(1 + (doc_count - len(live) + 0.5) / (len(live) + 0.5))
+                    for doc_id, tf in live:
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[doc_id] / avg_len)
+                        scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                        matched.add(doc_id)
+                if is_required:
+                    required.append(matched)
+            candidates = scores.keys()
+            for matched in required:
+                candidates = [d for d in candidates if d in matched]
+            best = heapq.nlargest(limit, ((scores[d], d) for d in candidates))
+            return [(usernames[d], round(score, 4)) for score, d in best]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(data_dir="data"):
+    """Return the process-wide SearchIndex for a data directory"""
+    key = str(Path(data_dir).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = SearchIndex(Path(data_dir) / "search")
+        return _indexes[key]
@@ -0,0 +1,183 @@
+"""
+Pluggable JSON serialization backend
+
+Uses orjson when it is installed and falls back to the standard library otherwise.
+Storage writes compact JSON; pretty JSON is reserved for user-facing downloads.
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class JSONBackend:
+    """Standard library JSON backend"""
+
+    name = "json"
+
+    def dumps_compact(self, obj):
+        """Serialize to compact UTF-8 bytes"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def dumps_pretty(self, obj):
+        """Serialize to indented UTF-8 bytes"""
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+    def dumps_canonical(self, obj):
+        """Serialize to compact, key-sorted UTF-8 bytes suitable for hashing"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+    def loads(self, data):
+        """Deserialize from bytes or str"""
+        return json.loads(data)
+
+
+class OrjsonBackend(JSONBackend):
+    """orjson backend; falls back to the stdlib for values orjson rejects"""
+
+    name = "orjson"
+
+    def dumps_compact(self, obj):
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            return super().dumps_compact(obj)
+
+    def dumps_pretty(self, obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            return super().dumps_pretty(obj)
+
+    def dumps_canonical(self, obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            return super().dumps_canonical(obj)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+BACKENDS = {"json": JSONBackend}
+if orjson is not None:
+    BACKENDS["orjson"] = OrjsonBackend
+
+_backend = (OrjsonBackend if orjson is not None else JSONBackend)()
+
+
+def get_backend():
+    """Return the active serializer backend"""
+    return _backend
+
+
+def set_backend(name):
+    """Select a serializer backend by name ("json" or "orjson")"""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown or unavailable JSON backend: {name}")
+    _backend = BACKENDS[name]()
+    return _backend
+
+
+def dumps_compact(obj):
+    """Compact JSON bytes for storage"""
+    return _backend.dumps_compact(obj)
+
+
+def dumps_pretty(obj):
+    """Indented JSON bytes for downloads"""
+    return _backend.dumps_pretty(obj)
+
+
+def dumps_canonical(obj):
+    """Key-sorted compact JSON bytes for content hashing"""
+    return _backend.dumps_canonical(obj)
+
+
+def loads(data):
+    """Parse JSON from bytes or str"""
+    return _backend.loads(data)
+
+
+def load_file(path):
+    """Read and parse a JSON file"""
+    return _backend.loads(Path(path).read_bytes())
+
+
+def dump_file(path, obj):
+    """Write obj to path as compact JSON, atomically: readers see the old or the new file"""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_backend.dumps_compact(obj))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+def iter_object_items(path, chunk_size=1 << 16):
+    """Yield (key, value) pairs of a top-level JSON object file without loading it whole.
+
+    Only one value at a time is held in memory, plus a read buffer.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buffer, pos, eof = "", 0, False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            return not eof
+
+        def skip(chars):
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in chars:
+                    pos += 1
+                if pos < len(buffer) or not fill():
+                    return buffer[pos] if pos < len(buffer) else ""
+
+        def decode():
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    if eof or not fill():
+                        raise
+                    continue
+                # a number read up to a partial exponent or the buffer edge may continue
+                if eof or (end < len(buffer) and buffer[end] not in _NUMBER_CHARS):
+                    pos = end
+                    return value
+                fill()
+
+        if skip(_WHITESPACE) != "{":
+            raise ValueError(f"{path} does not hold a JSON object")
+        pos += 1
+        while True:
+            char = skip(_WHITESPACE + ",")
+            if char == "}":
+                return
+            if char != '"':
+                raise ValueError(f"malformed JSON object in {path}")
+            key = decode()
+            if skip(_WHITESPACE) != ":":
+                raise ValueError(f"malformed JSON object in {path}")
+            pos += 1
+            skip(_WHITESPACE)
+            yield key, decode()
@@ -0,0 +1,166 @@
+"""
+Signed login session tokens with a server-side session cache
+
+A token is "<session id>.<expiry>.<signature>", HMAC-SHA256 signed with a
+per-install secret. Signatures and expiry are checked before any lookup, so
+forged or stale tokens cost one HMAC. Live sessions and a copy of each user's
+last saved portfolio are kept in memory, so a reconnecting client resumes
+without password hashing or a data file read. The cache is authoritative:
+logging out or restarting the server ends sessions.
+
+Tokens travel in the page URL, so they are short-lived and single-use: each
+resume replaces the token with a fresh one, and a copied or leaked URL stops
+working once its owner's browser has resumed from it.
+"""
+import copy
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+SESSION_TTL = int(os.environ.get("PORTFOLIO_SESSION_TTL", 12 * 3600))
+MAX_SESSIONS = 10000
+SECRET_FILE = "session_secret.key"
+
+
+def load_session_secret(data_dir="data"):
+    """Return the signing secret from PORTFOLIO_SESSION_SECRET or {data_dir}/session_secret.key.
+
+    The key file is created on first use.
+    """
+    env_secret = os.environ.get("PORTFOLIO_SESSION_SECRET")
+    if env_secret:
+        return env_secret.encode()
+    path = Path(data_dir) / SECRET_FILE
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    secret = secrets.token_bytes(32)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # another process created it first
+        return path.read_bytes()
+    with os.fdopen(fd, "wb") as f:
+        f.write(secret)
+    return secret
+
+
+class SessionStore:
+    """In-memory session cache keyed by signed tokens"""
+
+    def __init__(self, secret, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS):
+        self.secret = secret
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # session id -> (username, expires), least recently used first
+        self._user_sessions = {}        # username -> number of live sessions
+        self._portfolios = {}           # username -> last saved portfolio_config, while it has sessions
+        self._lock = threading.Lock()
+
+    def _sign(self, payload):
+        return hmac.new(self.secret, payload.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def _new_session(self, username):
+        """Register a session (lock held) and return its token"""
+        session_id = secrets.token_urlsafe(18)
+        expires = int(time.time()) + self.ttl
+        payload = f"{session_id}.{expires}"
+        self._sessions[session_id] = (username, expires)
+        self._user_sessions[username] = self._user_sessions.get(username, 0) + 1
+        now = time.time()
+        while self._sessions:
+            oldest_id, (_, oldest_expires) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and oldest_expires >= now:
+                break
+            self._drop(oldest_id)
+        return f"{payload}.{self._sign(payload)}"
+
+    def _drop(self, session_id):
+        """Forget a session (lock held), and its user's cached portfolio with the last one"""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        username = session[0]
+        remaining = self._user_sessions.get(username, 1) - 1
+        if remaining > 0:
+            self._user_sessions[username] = remaining
+        else:
+            self._user_sessions.pop(username, None)
+            self._portfolios.pop(username, None)
+
+    def create(self, username, portfolio_config=None):
+        """Start a session for username and return its token"""
+        with self._lock:
+            token = self._new_session(username)
+            if portfolio_config is not None:
+                self._portfolios[username] = copy.deepcopy(portfolio_config)
+        return token
+
+    def _session_id(self, token):
+        """Return the session id of a well-signed, unexpired token, else None"""
+        try:
+            session_id, expires, signature = str(token).split(".")
+            expired = int(expires) < time.time()
+        except ValueError:
+            return None
+        if expired or not hmac.compare_digest(signature, self._sign(f"{session_id}.{expires}")):
+            return None
+        return session_id
+
+    def resume(self, token):
+        """Return (username, portfolio_config, new_token) for a live session, or (None, None, None).
+
+        The token is rotated: the old one stops working and new_token replaces it.
+        portfolio_config is a private copy, or None when it is not cached.
+        """
+        session_id = self._session_id(token)
+        if session_id is None:
+            return None, None, None
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None, None, None
+            username, expires = session
+            if expires < time.time():
+                self._drop(session_id)
+                return None, None, None
+            # register the replacement first so the user's cached portfolio survives the drop
+            new_token = self._new_session(username)
+            self._drop(session_id)
+            portfolio = self._portfolios.get(username)
+        return username, copy.deepcopy(portfolio) if portfolio is not None else None, new_token
+
+    def update_portfolio(self, username, portfolio_config):
+        """Refresh the cached portfolio after a save (only for users with a session)"""
+        with self._lock:
+            if username in self._portfolios:
+                self._portfolios[username] = copy.deepcopy(portfolio_config)
+
+    def end(self, token):
+        """End the session for token (logout)"""
+        session_id = self._session_id(token)
+        if session_id is None:
+            return
+        with self._lock:
+            self._drop(session_id)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_session_store(data_dir="data"):
+    """Return the process-wide SessionStore for a data directory"""
+    key = str(Path(data_dir).resolve())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = SessionStore(load_session_secret(data_dir))
+        return _stores[key]
@@ -0,0 +1,134 @@
+"""
+Skill taxonomy: canonical skill names and alias lookup
+
+Skills are stored as comma-separated text per category. parse_skills turns that
+text into a de-duplicated tuple of canonical names ("js" -> "JavaScript") once
+per distinct string; every renderer and the search index consume that tuple.
+"""
+import re
+from collections import Counter
+from functools import lru_cache
+
+
+# Canonical name -> aliases (matched case-insensitively, ignoring spaces, dots and dashes)
+SKILL_ALIASES = {
+    "JavaScript": ["js", "javascript", "ecmascript", "es6"],
+    "TypeScript": ["ts", "typescript"],
+    "Python": ["py", "python3", "python 3"],
+    "Node.js": ["node", "nodejs", "node js"],
+    "React": ["reactjs", "react.js"],
+    "Vue.js": ["vue", "vuejs"],
+    "Angular": ["angularjs", "angular.js"],
+    "Next.js": ["next", "nextjs"],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    "Tailwind CSS": ["tailwind", "tailwindcss"],
+    "C++": ["cpp", "cplusplus"],
+    "C#": ["csharp", "c sharp"],
+    ".NET": ["dotnet"],
+    "Go": ["golang"],
+    "Rust": ["rustlang"],
+    "Java": ["java"],
+    "Kotlin": ["kotlin"],
+    "Ruby on Rails": ["rails", "ror"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fast api"],
+    "Spring Boot": ["springboot"],
+    "PostgreSQL": ["postgres", "postgresql", "psql"],
+    "MySQL": ["mysql"],
+    "MongoDB": ["mongo", "mongodb"],
+    "Redis": ["redis"],
+    "SQL": ["sql"],
+    "GraphQL": ["gql"],
+    "Docker": ["docker"],
+    "Kubernetes": ["k8s", "kube"],
+    "Terraform": ["terraform"],
+    "AWS": ["amazon web services"],
+    "Google Cloud": ["gcp", "google cloud platform"],
+    "Azure": ["microsoft azure"],
+    "Git": ["git"],
+    "CI/CD": ["cicd", "ci cd", "continuous integration"],
+    "Machine Learning": ["ml"],
+    "Artificial Intelligence": ["ai"],
+    "Natural Language Processing": ["nlp"],
+    "TensorFlow": ["tensorflow", "tf2"],
+    "PyTorch": ["torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Linux": ["gnu/linux"],
+    "UI/UX": ["ux", "ui", "ux/ui", "ui ux"],
+}
+
+_KEY_STRIP_RE = re.compile(r"[\s.\-_]+")
+
+
+def _lookup_key(name):
+    return _KEY_STRIP_RE.sub("", name.lower())
+
+
+def _build_lookup():
+    lookup = {}
+    for canonical, aliases in SKILL_ALIASES.items():
+        for name in [canonical, *aliases]:
+            lookup.setdefault(_lookup_key(name), canonical)
+    return lookup
+
+
+# Precomputed alias key -> canonical name
+SKILL_LOOKUP = _build_lookup()
+
+
+def normalize_skill(name):
+    """Return the canonical name for a skill, or the tidied input if it is unknown"""
+    name = " ".join(str(name).split())
+    return SKILL_LOOKUP.get(_lookup_key(name), name)
+
+
+def canonical_skill(name):
+    """Return the canonical name if name is a known skill or alias, else None"""
+    return SKILL_LOOKUP.get(_lookup_key(str(name)))
+
+
+@lru_cache(maxsize=4096)
+def _parse_skill_text(text):
+    skills, seen = [], set()
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        skill = normalize_skill(part)
+        key = skill.lower()
+        if key not in seen:
+            seen.add(key)
+            skills.append(skill)
+    return tuple(skills)
+
+
+def parse_skills(items):
+    """Parse a category's items (comma-separated text or a list) into canonical skills"""
+    if not items:
+        return ()
+    if isinstance(items, str):
+        return _parse_skill_text(items)
+    return _parse_skill_text(",".join(str(item) for item in items))
+
+
+def skill_categories(portfolio_config):
+    """Yield (category, skills) for each skills category of a portfolio"""
+    for category in ((portfolio_config or {}).get("skills") or {}).get("categories", []) or []:
+        if isinstance(category, dict):
+            yield category, parse_skills(category.get("items"))
+
+
+def portfolio_skills(portfolio_config):
+    """Set of canonical skills across all categories of a portfolio"""
+    return {skill for _, skills in skill_categories(portfolio_config) for skill in skills}
+
+
+def skill_counts(portfolio_configs):
+    """Count how many portfolios list each canonical skill"""
+    counts = Counter()
+    for portfolio_config in portfolio_configs:
+        counts.update(portfolio_skills(portfolio_config))
+    return counts
@@ -0,0 +1,176 @@
+"""
+On-disk layout of per-user portfolio files
+
+Portfolio files are sharded by a hash of the username into two levels of
+256 buckets:
+
+    {data_dir}/portfolios/<h0h1>/<h2h3>/{username}_data.json
+
+so no directory grows past a few entries per bucket. The older flat layout
+({data_dir}/{username}_data.json) is still read until
+scripts/migrate_data_layout.py moves each file across. Writes always go to the
+sharded path and drop the flat copy, so migration can run while the app serves.
+
+{data_dir}/portfolios/index.txt lists one username per line for enumeration
+without loading users.json. Other per-user files (revision logs) use the same
+buckets through bucket_dir().
+"""
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: callers still hold their in-process locks
+    fcntl = None
+
+
+SHARD_DIR = "portfolios"
+INDEX_FILE = "index.txt"
+DATA_FILE_SUFFIX = "_data.json"
+
+
+def bucket_dir(root, username):
+    """Return the two-level hashed bucket for username under root"""
+    digest = hashlib.sha256(str(username).encode("utf-8")).hexdigest()
+    return Path(root) / digest[:2] / digest[2:4]
+
+
+def shard_dir(data_dir, username):
+    """Return the bucket directory for username"""
+    return bucket_dir(Path(data_dir) / SHARD_DIR, username)
+
+
+def user_data_file(data_dir, username):
+    """Return Path for a user's portfolio file in the sharded layout"""
+    return shard_dir(data_dir, username) / f"{username}{DATA_FILE_SUFFIX}"
+
+
+def legacy_user_data_file(data_dir, username):
+    """Return Path for a user's portfolio file in the old flat layout"""
+    return Path(data_dir) / f"{username}{DATA_FILE_SUFFIX}"
+
+
+def resolve_user_data_file(data_dir, username):
+    """Return the existing portfolio file for username, preferring the sharded copy.
+
+    Falls back to the sharded path when neither exists.
+    """
+    sharded = user_data_file(data_dir, username)
+    if sharded.exists():
+        return sharded
+    legacy = legacy_user_data_file(data_dir, username)
+    return legacy if legacy.exists() else sharded
+
+
+def prepare_user_data_file(data_dir, username):
+    """Create the bucket for username and return the sharded path to write to"""
+    path = user_data_file(data_dir, username)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def drop_legacy_user_data_file(data_dir, username):
+    """Remove the flat-layout copy once the sharded file has been written"""
+    try:
+        os.remove(legacy_user_data_file(data_dir, username))
+    except OSError:
+        pass
+
+
+def index_path(data_dir):
+    return Path(data_dir) / SHARD_DIR / INDEX_FILE
+
+
+def append_to_index(data_dir, username):
+    """Record a new username in the index"""
+    path = index_path(data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"{username}\n")
+
+
+def write_index(data_dir, usernames):
+    """Atomically replace the index with the given usernames (sorted, de-duplicated)"""
+    path = index_path(data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".index-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for username in sorted(set(usernames)):
+                f.write(f"{username}\n")
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def iter_usernames(data_dir):
+    """Yield indexed usernames without loading users.json; nothing if there is no index"""
+    seen = set()
+    try:
+        f = open(index_path(data_dir), encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            username = line.rstrip("\n")
+            if username and username not in seen:
+                seen.add(username)
+                yield username
+
+
+def iter_legacy_user_files(data_dir):
+    """Yield (username, path) for portfolio files still in the flat layout"""
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(DATA_FILE_SUFFIX) and entry.is_file():
+                yield entry.name[:-len(DATA_FILE_SUFFIX)], Path(entry.path)
+
+
+def migrate_user_file(data_dir, username, legacy_path):
+    """Move one flat-layout file into its bucket without clobbering a newer sharded copy.
+
+    Returns "moved" or "superseded" (a sharded file already existed).
+    """
+    target = prepare_user_data_file(data_dir, username)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".migrate-")
+    try:
+        with os.fdopen(fd, "wb") as out, open(legacy_path, "rb") as src:
+            out.write(src.read())
+        try:
+            # link() fails if the app wrote the sharded file meanwhile; that copy wins
+            os.link(tmp, target)
+            status = "moved"
+        except FileExistsError:
+            status = "superseded"
+        except OSError:
+            # filesystem without hard links
+            status = "superseded" if target.exists() else "moved"
+            if status == "moved":
+                os.replace(tmp, target)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    try:
+        os.remove(legacy_path)
+    except OSError:
+        pass
+    return status
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock on the lock file at path, across processes"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,392 @@
+"""
+Theme compiler: a portfolio's theme as an HTML stylesheet and ReportLab styles
+
+compile_theme() normalizes theme.colors and theme.template, derives the full
+palette (tints and shades of the chosen colors, readable text on them) and
+renders the resume CSS and ReportLab style set once. Compiled themes are
+cached by theme hash, so every user with the same colors and template shares
+one entry, and a theme switch compiles once instead of on every render.
+"""
+import hashlib
+import re
+from functools import lru_cache
+
+from utils import serialization
+
+
+# Colors a theme may set; missing or invalid values fall back to these
+DEFAULT_THEME_COLORS = {
+    "primary": "#6366f1",
+    "secondary": "#8b5cf6",
+    "accent": "#06b6d4",
+    "textDark": "#1e293b",
+    "textLight": "#64748b",
+    "textBody": "#475569",
+    "textMuted": "#888888",
+    "border": "#e2e8f0",
+    "bgWhite": "#ffffff",
+}
+
+# Template -> typography; the header layout per template lives in the HTML renderer
+THEME_TEMPLATES = {
+    "modern": {
+        "font_family": "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif",
+        "line_height": 1.6,
+        "pdf_fonts": ("Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique"),
+    },
+    "classic": {
+        "font_family": "Georgia, 'Times New Roman', Times, serif",
+        "line_height": 1.6,
+        "pdf_fonts": ("Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic"),
+    },
+    "compact": {
+        "font_family": "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif",
+        "line_height": 1.4,
+        "pdf_fonts": ("Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique"),
+    },
+}
+DEFAULT_TEMPLATE = "modern"
+
+_HEX_RE = re.compile(r"#?([0-9a-fA-F]{6}|[0-9a-fA-F]{3})")
+
+RESUME_CSS = """
+* {{
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}}
+
+@page {{
+    size: A4;
+    margin: 0.5in;
+}}
+
+body {{
+    font-family: {font_family};
+    color: {text_dark};
+    line-height: {line_height};
+    background-color: {background};
+    margin: 0;
+    padding: 0.4in;
+    width: 100%;
+}}
+
+.resume-container {{
+    width: 100%;
+    background: {background};
+    padding: 0;
+    margin: 0;
+    box-shadow: none;
+}}
+
+.header {{
+    text-align: center;
+    border-bottom: 3px solid {primary};
+    padding-bottom: 15px;
+    margin-bottom: 20px;
+}}
+
+.name {{
+    font-size: 32px;
+    font-weight: bold;
+    color: {primary_dark};
+    margin-bottom: 5px;
+}}
+
+.title {{
+    font-size: 16px;
+    color: {text_light};
+    margin-bottom: 8px;
+}}
+
+.contact-info {{
+    font-size: 12px;
+    color: {text_body};
+    margin-bottom: 5px;
+}}
+
+.profile-photo {{
+    width: 100px;
+    height: 100px;
+    border-radius: 50%;
+    object-fit: cover;
+    border: 3px solid {primary};
+    margin: 10px auto;
+    display: block;
+}}
+
+.section {{
+    margin-bottom: 20px;
+    page-break-inside: avoid;
+    break-inside: avoid;
+}}
+
+.section-title {{
+    font-size: 14px;
+    font-weight: bold;
+    color: {on_primary};
+    background-color: {primary};
+    padding: 8px 12px;
+    margin-bottom: 12px;
+    border-left: 4px solid {secondary};
+}}
+
+.item {{
+    margin-bottom: 12px;
+    padding-left: 10px;
+    border-left: 2px solid {border};
+}}
+
+.item-title {{
+    font-weight: bold;
+    color: {text_dark};
+    font-size: 13px;
+}}
+
+.item-subtitle {{
+    font-size: 11px;
+    color: {text_light};
+    font-style: italic;
+    margin-top: 2px;
+}}
+
+.item-description {{
+    font-size: 12px;
+    color: {text_body};
+    margin-top: 5px;
+}}
+
+.item-description li {{
+    margin-left: 20px;
+    margin-top: 3px;
+}}
+
+.skills-container {{
+    display: flex;
+    flex-wrap: wrap;
+    gap: 8px;
+}}
+
+.skill-badge {{
+    background-color: {primary_tint};
+    color: {primary_dark};
+    padding: 6px 12px;
+    border-radius: 20px;
+    font-size: 12px;
+    font-weight: 500;
+    display: inline-block;
+}}
+
+.skill-category {{
+    margin-bottom: 10px;
+}}
+
+.skill-category-title {{
+    font-weight: bold;
+    color: {primary_dark};
+    font-size: 12px;
+    margin-bottom: 5px;
+}}
+
+.social-links {{
+    display: flex;
+    flex-wrap: wrap;
+    gap: 15px;
+    margin-top: 10px;
+}}
+
+.social-link {{
+    display: flex;
+    align-items: center;
+    gap: 5px;
+    font-size: 12px;
+    color: {primary_dark};
+    text-decoration: none;
+    padding: 5px 10px;
+    border-radius: 5px;
+    transition: all 0.3s ease;
+}}
+
+.social-link:hover {{
+    background-color: {primary_tint};
+    color: {accent};
+    text-decoration: underline;
+}}
+
+.social-icon {{
+    font-size: 16px;
+}}
+
+.summary {{
+    font-size: 12px;
+    color: {text_body};
+    line-height: 1.5;
+    margin-top: 10px;
+}}
+
+.footer {{
+    text-align: center;
+    font-size: 10px;
+    color: {text_muted};
+    margin-top: 30px;
+    border-top: 1px solid {border};
+    padding-top: 10px;
+}}
+"""
+
+
+def normalize_color(value, default):
+    """Return value as #rrggbb, or default when it is not a hex color (keeps CSS injection out)"""
+    match = _HEX_RE.fullmatch(value.strip()) if isinstance(value, str) else None
+    if not match:
+        return default
+    digits = match.group(1).lower()
+    if len(digits) == 3:
+        digits = "".join(c * 2 for c in digits)
+    return "#" + digits
+
+
+def normalize_theme(theme):
+    """Return (template, colors) with every color validated and defaults filled in"""
+    theme = theme if isinstance(theme, dict) else {}
+    colors = theme.get("colors") if isinstance(theme.get("colors"), dict) else {}
+    template = theme.get("template")
+    if template not in THEME_TEMPLATES:
+        template = DEFAULT_TEMPLATE
+    return template, {name: normalize_color(colors.get(name), default) for name, default in DEFAULT_THEME_COLORS.items()}
+
+
+def theme_hash(theme):
+    """Short stable hash of a theme's normalized template and colors"""
+    return _theme_hash(*normalize_theme(theme))
+
+
+def _theme_hash(template, colors):
+    return hashlib.sha256(serialization.dumps_canonical([template, colors])).hexdigest()[:16]
+
+
+def _rgb(color):
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def mix(color, other, amount):
+    """Blend amount (0-1) of other into color"""
+    return "#" + "".join(
+        f"{round(a + (b - a) * amount):02x}" for a, b in zip(_rgb(color), _rgb(other))
+    )
+
+
+def _luminance(color):
+    def channel(value):
+        value /= 255
+        return value / 12.92 if value <= 0.03928 else ((value + 0.055) / 1.055) ** 2.4
+    r, g, b = (channel(v) for v in _rgb(color))
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def derive_palette(colors):
+    """Full palette for the CSS and PDF roles from normalized theme colors"""
+    primary, background = colors["primary"], colors["bgWhite"]
+    return {
+        "primary": primary,
+        "primary_dark": mix(primary, "#000000", 0.15),
+        "primary_tint": mix(primary, background, 0.85),
+        "secondary": colors["secondary"],
+        "accent": colors["accent"],
+        # text on primary backgrounds: white unless the primary color is light
+        "on_primary": "#ffffff" if _luminance(primary) < 0.4 else colors["textDark"],
+        "text_dark": colors["textDark"],
+        "text_light": colors["textLight"],
+        "text_body": colors["textBody"],
+        "text_muted": colors["textMuted"],
+        "border": colors["border"],
+        "background": background,
+    }
+
+
+class CompiledTheme:
+    """Resume stylesheet and ReportLab styles for one normalized theme"""
+
+    def __init__(self, template, colors):
+        self.template = template
+        self.colors = colors
+        self.hash = _theme_hash(template, colors)
+        self.palette = derive_palette(colors)
+        typography = THEME_TEMPLATES[template]
+        self.pdf_fonts = typography["pdf_fonts"]
+        self.css = RESUME_CSS.format(
+            font_family=typography["font_family"], line_height=typography["line_height"], **self.palette
+        )
+        self._base_styles = self._build_styles(1.0, 1.0)
+
+    def reportlab_styles(self, font_scale=1.0, spacing_scale=1.0):
+        """ReportLab paragraph styles by role, with font sizes and spacing scaled.
+
+        The unscaled set is built once per theme; styles are never mutated by
+        rendering, so it is shared by every document using the theme.
+        """
+        if font_scale == 1.0 and spacing_scale == 1.0:
+            return self._base_styles
+        return self._build_styles(font_scale, spacing_scale)
+
+    def _build_styles(self, font_scale, spacing_scale):
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+        color = {name: colors.HexColor(value) for name, value in self.palette.items()}
+        regular, bold, italic, bold_italic = self.pdf_fonts
+        sample = getSampleStyleSheet()
+
+        def style(name, parent, font_size, space_after=None, space_before=None, leading=None, **kwargs):
+            parent_style = sample[parent]
+            return ParagraphStyle(
+                name,
+                parent=parent_style,
+                fontSize=font_size * font_scale,
+                leading=(leading or parent_style.leading) * font_scale,
+                spaceAfter=(parent_style.spaceAfter if space_after is None else space_after) * spacing_scale,
+                spaceBefore=(parent_style.spaceBefore if space_before is None else space_before) * spacing_scale,
+                **kwargs
+            )
+
+        return {
+            # Title
+            "title": style('CustomTitle', 'Heading1', 32, space_after=4, textColor=color["primary_dark"],
+                           alignment=TA_CENTER, fontName=bold),
+            # Subtitle
+            "subtitle": style('Subtitle', 'Normal', 14, space_after=2, textColor=color["text_light"],
+                              alignment=TA_CENTER, fontName=bold_italic),
+            # Contact
+            "contact": style('Contact', 'Normal', 9, space_after=8, textColor=color["text_dark"],
+                             alignment=TA_CENTER, fontName=regular),
+            # Section heading
+            "section_heading": style('SectionHeading', 'Heading2', 13, space_after=10, space_before=8,
+                                     textColor=color["on_primary"], fontName=bold, backColor=color["primary"],
+                                     leftIndent=8, rightIndent=8, topPadding=6, bottomPadding=6),
+            # Item heading
+            "item_heading": style('ItemHeading', 'Heading3', 11, space_after=2, space_before=6,
+                                  textColor=color["primary_dark"], fontName=bold),
+            # Item subheading (date/company)
+            "item_sub": style('ItemSub', 'Normal', 9, space_after=4, textColor=color["text_light"],
+                              fontName=italic),
+            # Normal text
+            "normal": style('Normal', 'Normal', 9, space_after=3, leading=11, textColor=color["text_dark"],
+                            fontName=regular),
+            # Skills badge
+            "skills": style('Skills', 'Normal', 9, space_after=6, textColor=color["primary"], fontName=bold),
+            # Footer
+            "footer": style('Footer', 'Normal', 8, textColor=color["text_muted"], alignment=TA_CENTER,
+                            fontName=regular),
+        }
+
+
+@lru_cache(maxsize=256)
+def _compile(template, colors_items):
+    return CompiledTheme(template, dict(colors_items))
+
+
+def compile_theme(theme):
+    """Return the shared CompiledTheme for a portfolio's theme dict (None for the defaults)"""
+    template, colors = normalize_theme(theme)
+    return _compile(template, tuple(colors.items()))
@@ -0,0 +1,77 @@
+"""
+Measure requests per second of the public portfolio endpoint
+
+Starts the server in-process on a temporary data directory seeded with
+example_portfolio.json and hammers it with keep-alive clients.
+
+Usage:
+    python benchmarks/public_server_benchmark.py [--clients 8] [--seconds 5] [--revalidate]
+"""
+import argparse
+import http.client
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add app to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "app"))
+
+from utils.public_server import make_public_server
+from utils.storage import prepare_user_data_file
+
+
+def client(port, deadline, revalidate, counts, index):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"Accept-Encoding": "gzip"}
+    etag = None
+    done = 0
+    while time.perf_counter() < deadline:
+        if revalidate and etag:
+            headers["If-None-Match"] = etag
+        conn.request("GET", "/demo", headers=headers)
+        response = conn.getresponse()
+        response.read()
+        etag = response.getheader("ETag")
+        done += 1
+    counts[index] = done
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--revalidate", action="store_true", help="send If-None-Match (304 path)")
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp())
+    try:
+        shutil.copy(ROOT / "example_portfolio.json", prepare_user_data_file(data_dir, "demo"))
+        server = make_public_server(str(data_dir), "127.0.0.1", 0)
+        port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        counts = [0] * args.clients
+        deadline = time.perf_counter() + args.seconds
+        threads = [threading.Thread(target=client, args=(port, deadline, args.revalidate, counts, i))
+                   for i in range(args.clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        server.shutdown()
+
+        total = sum(counts)
+        mode = "304 revalidation" if args.revalidate else "200 full body (gzip)"
+        print(f"{total} requests in {args.seconds:.1f}s with {args.clients} clients, {mode}: "
+              f"{total / args.seconds:,.0f} req/s")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark JSON serializer backends on large synthetic portfolios
+
+Usage:
+    python benchmarks/serialization_benchmark.py [--items 500] [--repeat 20]
+"""
+import argparse
+import copy
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from utils import serialization
+
+
+def build_portfolio(base, items):
+    """Grow every list section of the example portfolio to `items` entries"""
+    portfolio = copy.deepcopy(base)
+    for section, field in (("experience", "items"), ("projects", "items"),
+                           ("education", "items"), ("certificates", "items"),
+                           ("skills", "categories")):
+        seed = portfolio[section][field]
+        portfolio[section][field] = [copy.deepcopy(seed[i % len(seed)]) for i in range(items)]
+    return portfolio
+
+
+def time_call(fn, repeat):
+    """Return the best wall time of `repeat` calls, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=500, help="entries per section")
+    parser.add_argument("--repeat", type=int, default=20, help="timing repetitions")
+    args = parser.parse_args()
+
+    base = json.loads((Path(__file__).resolve().parent.parent / "example_portfolio.json").read_text())
+    portfolio = build_portfolio(base, args.items)
+
+    rows = [("stdlib json.dumps(indent=2)",
+             lambda: json.dumps(portfolio, indent=2),
+             len(json.dumps(portfolio, indent=2).encode("utf-8")))]
+    for name in serialization.BACKENDS:
+        backend = serialization.set_backend(name)
+        compact = backend.dumps_compact(portfolio)
+        rows.append((f"{name} compact", lambda b=backend: b.dumps_compact(portfolio), len(compact)))
+        rows.append((f"{name} pretty", lambda b=backend: b.dumps_pretty(portfolio),
+                     len(backend.dumps_pretty(portfolio))))
+        rows.append((f"{name} loads", lambda b=backend, c=compact: b.loads(c), len(compact)))
+
+    print(f"Portfolio with {args.items} entries per section, best of {args.repeat}")
+    print(f"{'variant':<32}{'ms':>10}{'bytes':>12}")
+    for label, fn, size in rows:
+        print(f"{label:<32}{time_call(fn, args.repeat):>10.2f}{size:>12,}")
+
+
+if __name__ == "__main__":
+    main()
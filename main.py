@@ -2,721 +2,59 @@
 Modular Streamlit Portfolio Builder App
 """
 import streamlit as st
-import json
+import html
+import os
 from pathlib import Path
 import sys
-from io import BytesIO
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
 # Add app to path
 sys.path.insert(0, str(Path(__file__).parent / "app"))
 
 from utils.auth import AuthManager
 from utils.portfolio import PortfolioManager
+from utils import serialization
+from utils.analytics import get_portfolio_analytics
+from utils.assets import asset_url, media_src, media_url, read_asset_bytes, start_asset_server
+from utils.export_cache import export_cache, export_hash
+from utils.importer import parse_portfolio_upload, summarize_portfolio
+from utils.item_ids import ensure_item_ids
+from utils.merge import merge_portfolios, summarize_changes
+from utils.publish import publish_portfolio
+from utils.revisions import RevisionUnavailable
+from utils.rendering import generate_portfolio_html, html_to_pdf_weasyprint, safe_link_url
+from utils.skills import skill_categories
+from utils.themes import compile_theme
 from components.portfolio_editors import (
     personal_info_editor, experience_editor, skills_editor,
     projects_editor, education_editor, certificates_editor,
-    social_links_editor, theme_editor
+    social_links_editor, theme_editor, section_fragment,
+    preserve_page_state, reset_editor_state
 )
 
 
-def html_to_pdf_weasyprint(html_string):
-    """Convert HTML string to PDF using WeasyPrint"""
-    try:
-        from weasyprint import HTML, CSS
-        from io import BytesIO
-        
-        pdf_buffer = BytesIO()
-        HTML(string=html_string).write_pdf(pdf_buffer)
-        pdf_buffer.seek(0)
-        return pdf_buffer.getvalue()
-    except Exception as e:
-        st.error(f"Error converting HTML to PDF: {str(e)}")
-        return None
-
-
-def generate_portfolio_html(portfolio_config):
-    """Generate full HTML resume from portfolio configuration"""
-    try:
-        import html as html_lib
-        
-        def escape_html(text):
-            """Escape special HTML characters and newlines"""
-            if not text:
-                return ""
-            text = str(text)
-            text = html_lib.escape(text)
-            text = text.replace('\n', '<br>')
-            text = text.replace('\r', '')
-            return text
-        
-        personal_info = portfolio_config.get("personalInfo", {})
-        modules = portfolio_config.get("modules", [])
-
-        # Prepare profile image (embed as data URI so the HTML preview displays correctly)
-        profile_img_tag = ""
-        try:
-            profile_path = personal_info.get('profileImage')
-            if profile_path:
-                import base64, mimetypes, pathlib
-                p = pathlib.Path(profile_path)
-                if p.is_file():
-                    mime, _ = mimetypes.guess_type(str(p))
-                    if not mime:
-                        mime = 'image/png'
-                    with open(p, 'rb') as imgf:
-                        b = base64.b64encode(imgf.read()).decode('utf-8')
-                    profile_img_tag = f'<img src="data:{mime};base64,{b}" class="profile-photo" alt="Profile photo"/>'
-        except Exception:
-            # non-fatal: if embedding fails, leave empty and continue
-            profile_img_tag = ""
-        
-        # Platform icon mapping
-        platform_icons = {
-            "linkedin": "💼",
-            "github": "🐙",
-            "instagram": "📸",
-            "twitter": "𝕏",
-            "x": "𝕏",
-            "facebook": "👍",
-            "youtube": "▶️",
-            "portfolio": "🌐",
-            "email": "✉️",
-            "website": "🌍",
-            "telegram": "✈️",
-            "discord": "🎮",
-            "reddit": "👽",
-        }
-        
-        # Choose template
-        template_key = portfolio_config.get('theme', {}).get('template', 'modern')
-
-        # Build header HTML depending on template
-        if template_key == 'classic':
-            # Two-column header: image left, name/title right
-            header_html = (
-                '<div class="header" style="display:flex;align-items:center;gap:20px;">'
-                f'<div style="flex:0 0 120px;">{profile_img_tag}</div>'
-                '<div style="flex:1;text-align:left;">'
-                f'<div class="name">{escape_html(personal_info.get("name", "Your Name"))}</div>'
-                f'<div class="title">{escape_html(personal_info.get("title", "Professional"))}</div>'
-                f'<div class="contact-info">{escape_html(" | ".join([personal_info.get("email", ""), personal_info.get("phone", "")]).strip(" |"))}</div>'
-                '</div></div>'
-            )
-        elif template_key == 'compact':
-            # Compact: small photo inline, smaller fonts
-            header_html = (
-                '<div class="header" style="text-align:left;padding-bottom:8px;">'
-                f'<div style="float:left;margin-right:12px;width:72px;">{profile_img_tag}</div>'
-                f'<div class="name" style="font-size:22px;">{escape_html(personal_info.get("name", "Your Name"))}</div>'
-                f'<div class="title" style="font-size:12px;color:#64748b;">{escape_html(personal_info.get("title", "Professional"))}</div>'
-                '<div style="clear:both;"></div></div>'
-            )
-        else:
-            # Modern (default): centered image, name, title
-            header_html = (
-                '<div class="header">'
-                f'{profile_img_tag}'
-                f'<div class="name">{escape_html(personal_info.get("name", "Your Name"))}</div>'
-                f'<div class="title">{escape_html(personal_info.get("title", "Professional"))}</div>'
-                f'<div class="contact-info">{escape_html(" | ".join([personal_info.get("email", ""), personal_info.get("phone", "")]).strip(" |"))}</div>'
-                '</div>'
-            )
-
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Portfolio Resume</title>
-            <style>
-                * {{
-                    margin: 0;
-                    padding: 0;
-                    box-sizing: border-box;
-                }}
-                
-                @page {{
-                    size: A4;
-                    margin: 0.5in;
-                }}
-                
-                body {{
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                    color: #1e293b;
-                    line-height: 1.6;
-                    background-color: white;
-                    margin: 0;
-                    padding: 0.4in;
-                    width: 100%;
-                }}
-                
-                .resume-container {{
-                    width: 100%;
-                    background: white;
-                    padding: 0;
-                    margin: 0;
-                    box-shadow: none;
-                }}
-                
-                .header {{
-                    text-align: center;
-                    border-bottom: 3px solid #4f46e5;
-                    padding-bottom: 15px;
-                    margin-bottom: 20px;
-                }}
-                
-                .name {{
-                    font-size: 32px;
-                    font-weight: bold;
-                    color: #4f46e5;
-                    margin-bottom: 5px;
-                }}
-                
-                .title {{
-                    font-size: 16px;
-                    color: #64748b;
-                    margin-bottom: 8px;
-                }}
-                
-                .contact-info {{
-                    font-size: 12px;
-                    color: #475569;
-                    margin-bottom: 5px;
-                }}
-                
-                .profile-photo {{
-                    width: 100px;
-                    height: 100px;
-                    border-radius: 50%;
-                    object-fit: cover;
-                    border: 3px solid #4f46e5;
-                    margin: 10px auto;
-                    display: block;
-                }}
-                
-                .section {{
-                    margin-bottom: 20px;
-                    page-break-inside: avoid;
-                    break-inside: avoid;
-                }}
-                
-                .section-title {{
-                    font-size: 14px;
-                    font-weight: bold;
-                    color: white;
-                    background-color: #4f46e5;
-                    padding: 8px 12px;
-                    margin-bottom: 12px;
-                    border-left: 4px solid #6366f1;
-                }}
-                
-                .item {{
-                    margin-bottom: 12px;
-                    padding-left: 10px;
-                    border-left: 2px solid #e2e8f0;
-                }}
-                
-                .item-title {{
-                    font-weight: bold;
-                    color: #1e293b;
-                    font-size: 13px;
-                }}
-                
-                .item-subtitle {{
-                    font-size: 11px;
-                    color: #64748b;
-                    font-style: italic;
-                    margin-top: 2px;
-                }}
-                
-                .item-description {{
-                    font-size: 12px;
-                    color: #475569;
-                    margin-top: 5px;
-                }}
-                
-                .item-description li {{
-                    margin-left: 20px;
-                    margin-top: 3px;
-                }}
-                
-                .skills-container {{
-                    display: flex;
-                    flex-wrap: wrap;
-                    gap: 8px;
-                }}
-                
-                .skill-badge {{
-                    background-color: #e0e7ff;
-                    color: #4f46e5;
-                    padding: 6px 12px;
-                    border-radius: 20px;
-                    font-size: 12px;
-                    font-weight: 500;
-                    display: inline-block;
-                }}
-                
-                .skill-category {{
-                    margin-bottom: 10px;
-                }}
-                
-                .skill-category-title {{
-                    font-weight: bold;
-                    color: #4f46e5;
-                    font-size: 12px;
-                    margin-bottom: 5px;
-                }}
-                
-                .social-links {{
-                    display: flex;
-                    flex-wrap: wrap;
-                    gap: 15px;
-                    margin-top: 10px;
-                }}
-                
-                .social-link {{
-                    display: flex;
-                    align-items: center;
-                    gap: 5px;
-                    font-size: 12px;
-                    color: #4f46e5;
-                    text-decoration: none;
-                    padding: 5px 10px;
-                    border-radius: 5px;
-                    transition: all 0.3s ease;
-                }}
-                
-                .social-link:hover {{
-                    background-color: #e0e7ff;
-                    color: #2d3a9f;
-                    text-decoration: underline;
-                }}
-                
-                .social-icon {{
-                    font-size: 16px;
-                }}
-                
-                .summary {{
-                    font-size: 12px;
-                    color: #475569;
-                    line-height: 1.5;
-                    margin-top: 10px;
-                }}
-                
-                .footer {{
-                    text-align: center;
-                    font-size: 10px;
-                    color: #888;
-                    margin-top: 30px;
-                    border-top: 1px solid #e2e8f0;
-                    padding-top: 10px;
-                }}
-            </style>
-        </head>
-        <body>
-                <div class="resume-container">
-                    <!-- Header -->
-                    {header_html}
-        """.format(
-            header_html=header_html
-        )
-        
-        # Summary Section
-        if personal_info.get('summary') or personal_info.get('about'):
-            summary = personal_info.get('summary') or personal_info.get('about')
-            html += '<div class="section"><div class="summary">' + escape_html(summary) + '</div></div>'
-        
-        # Experience
-        if "experience" in modules:
-            experience = portfolio_config.get("experience", {})
-            if experience.get("items"):
-                html += '<div class="section">'
-                html += '<div class="section-title">EXPERIENCE</div>'
-                for exp in experience.get("items", []):
-                    html += '<div class="item"><div class="item-title">' + escape_html(exp.get('title', 'N/A')) + ' @ ' + escape_html(exp.get('company', 'N/A')) + '</div>'
-                    html += '<div class="item-subtitle">' + escape_html(exp.get('period', 'N/A')) + '</div>'
-                    html += '<div class="item-description"><ul>'
-                    for desc in exp.get("description", []):
-                        html += '<li>' + escape_html(desc) + '</li>'
-                    html += '</ul></div></div>'
-                html += '</div>'
-        
-        # Skills
-        if "skills" in modules:
-            skills = portfolio_config.get("skills", {})
-            if skills.get("categories"):
-                html += '<div class="section">'
-                html += '<div class="section-title">SKILLS</div>'
-                for category in skills.get("categories", []):
-                    cat_title = category.get('title', 'Skills')
-                    items = category.get('items', '')
-                    html += '<div class="skill-category"><div class="skill-category-title">' + escape_html(cat_title) + '</div><div class="skills-container">'
-                    if items:
-                        for skill in items.split(','):
-                            skill = skill.strip()
-                            if skill:
-                                html += '<span class="skill-badge">' + escape_html(skill) + '</span>'
-                    html += '</div></div>'
-                html += '</div>'
-        
-        # Projects
-        if "projects" in modules:
-            projects = portfolio_config.get("projects", {})
-            if projects.get("items"):
-                html += '<div class="section"><div class="section-title">PROJECTS</div>'
-                for project in projects.get("items", []):
-                    html += '<div class="item"><div class="item-title">' + escape_html(project.get('title', 'N/A')) + '</div>'
-                    if project.get('url'):
-                        html += '<div class="item-subtitle">' + escape_html(project.get("url")) + '</div>'
-                    if project.get('description'):
-                        html += '<div class="item-description">' + escape_html(project.get("description")) + '</div>'
-                    html += '</div>'
-                html += '</div>'
-        
-        # Education
-        if "education" in modules:
-            education = portfolio_config.get("education", {})
-            if education.get("items"):
-                html += '<div class="section"><div class="section-title">EDUCATION</div>'
-                for edu in education.get("items", []):
-                    html += '<div class="item"><div class="item-title">' + escape_html(edu.get('title', 'N/A')) + '</div>'
-                    html += '<div class="item-subtitle">' + escape_html(edu.get('period', 'N/A')) + '</div>'
-                    if edu.get('description'):
-                        html += '<div class="item-description">' + escape_html(edu.get("description")) + '</div>'
-                    html += '</div>'
-                html += '</div>'
-        
-        # Certificates
-        if "certificates" in modules:
-            certificates = portfolio_config.get("certificates", {})
-            if certificates.get("items"):
-                html += '<div class="section"><div class="section-title">CERTIFICATES</div>'
-                for cert in certificates.get("items", []):
-                    html += '<div class="item"><div class="item-title">' + escape_html(cert.get('title', 'N/A')) + '</div>'
-                    html += '<div class="item-subtitle">Issuer: ' + escape_html(cert.get('issuer', 'N/A')) + '</div>'
-                    if cert.get('date'):
-                        html += '<div class="item-subtitle">Date: ' + escape_html(cert.get("date")) + '</div>'
-                    html += '</div>'
-                html += '</div>'
-        
-        # Social Links
-        if portfolio_config.get("socialLinks"):
-            html += '<div class="section">'
-            html += '<div class="section-title">CONNECT</div>'
-            html += '<div class="social-links">'
-            for link in portfolio_config.get("socialLinks", []):
-                name = link.get('name', '').lower()
-                url = link.get('url', '#').strip()
-                if not url or url == '#':
-                    url = '#'
-                icon = platform_icons.get(name, '🔗')
-                html += '<a href="' + url + '" target="_blank" class="social-link"><span class="social-icon">' + icon + '</span> ' + escape_html(link.get("name")) + '</a>'
-            html += '</div></div>'
-        
-        # Footer
-        html += '<div class="footer">Generated with Streamlit Portfolio Builder</div>'
-        html += '</div></body></html>'
-        
-        return html
-    except Exception as e:
-        import traceback
-        error_msg = f"Error generating HTML: {str(e)}\n\n{traceback.format_exc()}"
-        st.error(error_msg)
-        return None
-
-
-def generate_portfolio_pdf(portfolio_config):
-    """Generate visually rich PDF from portfolio configuration with colors, icons, and styling"""
-    try:
-        from io import BytesIO
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-        from reportlab.lib import colors
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-        
-        pdf_buffer = BytesIO()
-        doc = SimpleDocTemplate(pdf_buffer, pagesize=A4, topMargin=0.4*inch, bottomMargin=0.4*inch)
-        story = []
-        
-        # Define color scheme
-        primary_color = colors.HexColor('#4f46e5')  # Indigo
-        secondary_color = colors.HexColor('#6366f1')  # Light indigo
-        text_dark = colors.HexColor('#1e293b')  # Dark slate
-        text_light = colors.HexColor('#64748b')  # Light slate
-        accent_color = colors.HexColor('#ec4899')  # Pink accent
-        
-        # Styles
-        styles = getSampleStyleSheet()
-        
-        # Title style
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=32,
-            textColor=primary_color,
-            spaceAfter=4,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        # Subtitle style
-        subtitle_style = ParagraphStyle(
-            'Subtitle',
-            parent=styles['Normal'],
-            fontSize=14,
-            textColor=text_light,
-            spaceAfter=2,
-            alignment=TA_CENTER,
-            fontName='Helvetica-BoldOblique'
-        )
-        
-        # Contact style
-        contact_style = ParagraphStyle(
-            'Contact',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=text_dark,
-            spaceAfter=8,
-            alignment=TA_CENTER,
-            fontName='Helvetica'
-        )
-        
-        # Section heading
-        section_heading_style = ParagraphStyle(
-            'SectionHeading',
-            parent=styles['Heading2'],
-            fontSize=13,
-            textColor=colors.white,
-            spaceAfter=10,
-            spaceBefore=8,
-            fontName='Helvetica-Bold',
-            backColor=primary_color,
-            leftIndent=8,
-            rightIndent=8,
-            topPadding=6,
-            bottomPadding=6
-        )
-        
-        # Item heading
-        item_heading_style = ParagraphStyle(
-            'ItemHeading',
-            parent=styles['Heading3'],
-            fontSize=11,
-            textColor=primary_color,
-            spaceAfter=2,
-            spaceBefore=6,
-            fontName='Helvetica-Bold'
-        )
-        
-        # Item subheading (date/company)
-        item_sub_style = ParagraphStyle(
-            'ItemSub',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=text_light,
-            spaceAfter=4,
-            fontName='Helvetica-Oblique'
-        )
-        
-        # Normal text
-        normal_style = ParagraphStyle(
-            'Normal',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=text_dark,
-            spaceAfter=3,
-            leading=11
-        )
-        
-        # Skills badge style
-        skills_style = ParagraphStyle(
-            'Skills',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=secondary_color,
-            spaceAfter=6,
-            fontName='Helvetica-Bold'
-        )
-        
-        # Personal Info Section
-        personal_info = portfolio_config.get("personalInfo", {})
-        name = personal_info.get('name', 'Your Name')
-        title = personal_info.get('title', 'Professional')
-        
-        story.append(Paragraph(name, title_style))
-        story.append(Paragraph(title, subtitle_style))
-        
-        # Contact Information
-        contact_parts = []
-        if personal_info.get('email'):
-            contact_parts.append(f"✉ {personal_info.get('email')}")
-        if personal_info.get('phone'):
-            contact_parts.append(f"☎ {personal_info.get('phone')}")
-        if contact_parts:
-            story.append(Paragraph(" | ".join(contact_parts), contact_style))
-        
-        story.append(Spacer(1, 0.15*inch))
-        
-        # Summary section
-        if personal_info.get('summary') or personal_info.get('about'):
-            summary_text = ""
-            if personal_info.get('summary'):
-                summary_text = personal_info.get('summary')
-            elif personal_info.get('about'):
-                summary_text = personal_info.get('about')
-            
-            story.append(Paragraph(summary_text, normal_style))
-            story.append(Spacer(1, 0.15*inch))
-        
-        # Experience Section
-        modules = portfolio_config.get("modules", [])
-        if "experience" in modules:
-            experience = portfolio_config.get("experience", {})
-            if experience.get("items"):
-                story.append(Paragraph("EXPERIENCE", section_heading_style))
-                story.append(Spacer(1, 0.08*inch))
-                
-                for exp in experience.get("items", []):
-                    # Job title and company
-                    job_text = f"{exp.get('title', 'N/A')} @ {exp.get('company', 'N/A')}"
-                    story.append(Paragraph(job_text, item_heading_style))
-                    story.append(Paragraph(exp.get('period', 'N/A'), item_sub_style))
-                    
-                    # Description
-                    for desc in exp.get("description", []):
-                        story.append(Paragraph(f"• {desc}", normal_style))
-                    story.append(Spacer(1, 0.08*inch))
-        
-        # Skills Section
-        if "skills" in modules:
-            skills = portfolio_config.get("skills", {})
-            if skills.get("categories"):
-                story.append(Paragraph("SKILLS", section_heading_style))
-                story.append(Spacer(1, 0.08*inch))
-                
-                for category in skills.get("categories", []):
-                    cat_title = category.get('title', 'Skills')
-                    items = category.get('items', '')
-                    
-                    story.append(Paragraph(f"<b>{cat_title}</b>", item_heading_style))
-                    
-                    if items:
-                        skills_list = ", ".join([s.strip() for s in items.split(',') if s.strip()])
-                        story.append(Paragraph(skills_list, skills_style))
-                    story.append(Spacer(1, 0.06*inch))
-        
-        # Projects Section
-        if "projects" in modules:
-            projects = portfolio_config.get("projects", {})
-            if projects.get("items"):
-                story.append(Paragraph("PROJECTS", section_heading_style))
-                story.append(Spacer(1, 0.08*inch))
-                
-                for project in projects.get("items", []):
-                    proj_title = project.get('title', 'N/A')
-                    story.append(Paragraph(f"<b>{proj_title}</b>", item_heading_style))
-                    
-                    if project.get('url'):
-                        story.append(Paragraph(f"<i>{project.get('url')}</i>", item_sub_style))
-                    
-                    if project.get('description'):
-                        story.append(Paragraph(project.get('description'), normal_style))
-                    story.append(Spacer(1, 0.08*inch))
-        
-        # Education Section
-        if "education" in modules:
-            education = portfolio_config.get("education", {})
-            if education.get("items"):
-                story.append(Paragraph("EDUCATION", section_heading_style))
-                story.append(Spacer(1, 0.08*inch))
-                
-                for edu in education.get("items", []):
-                    story.append(Paragraph(edu.get('title', 'N/A'), item_heading_style))
-                    story.append(Paragraph(edu.get('period', 'N/A'), item_sub_style))
-                    
-                    if edu.get('description'):
-                        story.append(Paragraph(edu.get('description'), normal_style))
-                    story.append(Spacer(1, 0.08*inch))
-        
-        # Certificates Section
-        if "certificates" in modules:
-            certificates = portfolio_config.get("certificates", {})
-            if certificates.get("items"):
-                story.append(Paragraph("CERTIFICATES", section_heading_style))
-                story.append(Spacer(1, 0.08*inch))
-                
-                for cert in certificates.get("items", []):
-                    story.append(Paragraph(cert.get('title', 'N/A'), item_heading_style))
-                    story.append(Paragraph(f"<b>Issuer:</b> {cert.get('issuer', 'N/A')}", normal_style))
-                    
-                    if cert.get('date'):
-                        story.append(Paragraph(f"<b>Date:</b> {cert.get('date')}", normal_style))
-                    story.append(Spacer(1, 0.08*inch))
-        
-        # Social Links Section
-        if portfolio_config.get("socialLinks"):
-            story.append(Paragraph("CONNECT", section_heading_style))
-            story.append(Spacer(1, 0.08*inch))
-            
-            for link in portfolio_config.get("socialLinks", []):
-                name = link.get('name', '')
-                url = link.get('url', '')
-                story.append(Paragraph(f"<b>{name}</b>: {url}", normal_style))
-            story.append(Spacer(1, 0.15*inch))
-        
-        # Footer
-        story.append(Spacer(1, 0.1*inch))
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.HexColor('#aaaaaa'),
-            alignment=TA_CENTER
-        )
-        story.append(Paragraph("Generated with Streamlit Portfolio Builder", footer_style))
-        
-        # Build PDF
-        doc.build(story)
-        pdf_buffer.seek(0)
-        return pdf_buffer.getvalue()
-    except Exception as e:
-        st.error(f"Error generating PDF: {str(e)}")
-        return None
-
-
-def merge_and_validate_portfolio(existing, new_portfolio):
-    """Merge an uploaded portfolio JSON with sensible defaults and perform light validation.
+def merge_and_validate_portfolio(existing, new_portfolio, remove_missing=False):
+    """Merge an uploaded portfolio JSON into the existing one and perform light validation.
 
-    Returns (merged_portfolio, warnings)
+    Only the items and fields that differ are applied (see utils.merge).
+    Returns (merged_portfolio, warnings, changes)
     """
     warnings = []
+    changes = []
     try:
         # Ensure we always have a base structure
-        username = existing.get('personalInfo', {}).get('name') if existing else None
-        email = None
-        if isinstance(new_portfolio, dict):
-            email = new_portfolio.get('personalInfo', {}).get('email') if new_portfolio.get('personalInfo') else None
+        base = existing
+        if not base:
+            email = None
+            if isinstance(new_portfolio, dict):
+                email = new_portfolio.get('personalInfo', {}).get('email') if new_portfolio.get('personalInfo') else None
+            base = PortfolioManager.create_default_portfolio('user', email or '')
 
-        default = PortfolioManager.create_default_portfolio(username or 'user', email or '')
-
-        # Start with default then overlay uploaded data
-        merged = default
-
-        # Overlay keys from uploaded JSON (shallow merge is intentional)
-        for key, val in (new_portfolio or {}).items():
-            merged[key] = val
+        merged, changes = merge_portfolios(base, new_portfolio or {}, remove_missing=remove_missing)
+        merged = dict(merged)
+        ensure_item_ids(merged)
 
         # Ensure modules contains at least the required personal_info
-        modules = merged.get('modules', []) or []
+        modules = list(merged.get('modules', []) or [])
         if 'personal_info' not in modules:
             modules.insert(0, 'personal_info')
         merged['modules'] = modules
@@ -739,9 +77,9 @@ def merge_and_validate_portfolio(existing, new_portfolio):
             if not ok:
                 warnings.append(msg)
 
-        return merged, warnings
+        return merged, warnings, changes
     except Exception as e:
-        return existing or {}, [f"Failed to merge uploaded portfolio: {e}"]
+        return existing or {}, [f"Failed to merge uploaded portfolio: {e}"], []
 
 
 # Page configuration
@@ -752,6 +90,15 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Users who see the cross-portfolio analytics panel (comma-separated usernames)
+ADMIN_USERS = {u.strip() for u in os.environ.get("PORTFOLIO_ADMINS", "").split(",") if u.strip()}
+
+# Number of reverse proxies in front of the app that append to X-Forwarded-For
+TRUSTED_PROXIES = int(os.environ.get("PORTFOLIO_TRUSTED_PROXIES", "0") or 0)
+
+# Serve uploaded files over HTTP when PORTFOLIO_ASSET_PORT is set (no-op otherwise)
+start_asset_server("data")
+
 # Initialize session state
 if "auth_manager" not in st.session_state:
     st.session_state.auth_manager = AuthManager("data")
@@ -765,6 +112,48 @@ if "current_user" not in st.session_state:
 if "portfolio_config" not in st.session_state:
     st.session_state.portfolio_config = None
 
+# Resume a login session from the signed token kept in the URL (survives browser refresh).
+# Tokens are single-use, so the URL gets a fresh one and copies of the old URL stop working.
+if not st.session_state.user_logged_in and "session" in st.query_params:
+    resumed_user, resumed_portfolio, new_token = st.session_state.auth_manager.resume_session(
+        st.query_params["session"]
+    )
+    if resumed_user is not None:
+        st.session_state.user_logged_in = True
+        st.session_state.current_user = resumed_user
+        st.session_state.portfolio_config = resumed_portfolio
+        st.query_params["session"] = new_token
+    else:
+        del st.query_params["session"]
+
+
+def client_ip():
+    """Best-effort client IP for login throttling (None when unavailable).
+
+    Behind PORTFOLIO_TRUSTED_PROXIES reverse proxies, the address is taken from
+    X-Forwarded-For as the last proxy saw it; entries further left are
+    client-supplied and ignored.
+    """
+    try:
+        if TRUSTED_PROXIES:
+            forwarded = [part.strip() for part in (st.context.headers.get("X-Forwarded-For") or "").split(",")]
+            forwarded = [part for part in forwarded if part]
+            return forwarded[-TRUSTED_PROXIES] if len(forwarded) >= TRUSTED_PROXIES else None
+        return st.context.ip_address
+    except Exception:
+        return None
+
+
+def logout():
+    """End the login session and return to the login page"""
+    if "session" in st.query_params:
+        st.session_state.auth_manager.end_session(st.query_params["session"])
+        del st.query_params["session"]
+    st.session_state.user_logged_in = False
+    st.session_state.current_user = None
+    st.session_state.portfolio_config = None
+    st.rerun()
+
 
 def login_page():
     """Display login/signup page"""
@@ -784,12 +173,16 @@ def login_page():
             
             if st.button("Login", use_container_width=True, type="primary"):
                 auth_manager = st.session_state.auth_manager
-                success, message = auth_manager.authenticate(login_username, login_password)
+                success, message = auth_manager.authenticate(
+                    login_username, login_password, client_ip=client_ip()
+                )
                 
                 if success:
                     st.session_state.user_logged_in = True
                     st.session_state.current_user = login_username
+                    st.query_params["session"] = auth_manager.create_session(login_username)
                     portfolio = auth_manager.get_user_portfolio(login_username)
+                    reset_editor_state()
                     st.session_state.portfolio_config = portfolio
                     st.success("Login successful! Redirecting...")
                     st.rerun()
@@ -812,21 +205,46 @@ def login_page():
                 else:
                     auth_manager = st.session_state.auth_manager
                     success, message = auth_manager.register_user(
-                        signup_username, signup_password, signup_email
+                        signup_username, signup_password, signup_email, client_ip=client_ip()
                     )
                     
                     if success:
                         st.success(message)
                         portfolio = auth_manager.get_user_portfolio(signup_username)
+                        reset_editor_state()
                         st.session_state.portfolio_config = portfolio
                         st.session_state.user_logged_in = True
                         st.session_state.current_user = signup_username
+                        st.query_params["session"] = auth_manager.create_session(signup_username)
                         st.info("Account created! Redirecting to your portfolio...")
                         st.rerun()
                     else:
                         st.error(message)
 
 
+# Section editors keyed by module
+SECTION_EDITORS = {
+    "personal_info": personal_info_editor,
+    "experience": experience_editor,
+    "skills": skills_editor,
+    "projects": projects_editor,
+    "education": education_editor,
+    "certificates": certificates_editor,
+    "social_links": social_links_editor,
+    "theme": theme_editor,
+}
+
+
+def render_section_editor(module_key):
+    """Run one section editor against the session portfolio"""
+    editor = SECTION_EDITORS[module_key]
+    st.session_state.portfolio_config = editor(st.session_state.portfolio_config)
+
+
+# Fragment variant: a widget change reruns only this section's editor, not the whole script
+render_section_fragment = section_fragment(render_section_editor)
+
+
 def portfolio_editor_page():
     """Display portfolio editor page"""
     # Sidebar
@@ -862,28 +280,71 @@ def portfolio_editor_page():
         
         st.session_state.portfolio_config["modules"] = current_modules
         
+        st.checkbox(
+            "⚡ Rerun only the edited section",
+            value=True,
+            key="batch_section_edits",
+            help="Edits re-execute just the section being edited instead of every editor tab"
+        )
+        st.checkbox(
+            "🧭 Render only the active section",
+            value=True,
+            key="active_section_only",
+            help="Run only the selected editor instead of every tab on each rerun"
+        )
+        
         st.markdown("---")
         
         # Import JSON uploader - allows user to upload a portfolio JSON and load it into the editor
         st.subheader("Import / Export")
         uploaded_file = st.file_uploader("Upload portfolio JSON", type=["json"], key="upload_portfolio_json")
         if uploaded_file is not None:
-            try:
-                # st.file_uploader returns a BytesIO-like object; parse JSON
-                uploaded_json = json.load(uploaded_file)
+            # Parse each upload once; reruns reuse the cached result instead of re-reading the file
+            upload_id = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+            cached_upload = st.session_state.get("uploaded_portfolio")
+            if not cached_upload or cached_upload[0] != upload_id:
+                uploaded_json, upload_error = parse_portfolio_upload(uploaded_file)
+                cached_upload = (upload_id, uploaded_json, upload_error)
+                st.session_state.uploaded_portfolio = cached_upload
+            _, uploaded_json, upload_error = cached_upload
+
+            if upload_error:
+                st.error(upload_error)
+            else:
                 st.markdown("**Preview of uploaded JSON**")
-                st.json(uploaded_json)
-
-                if st.button("Load uploaded JSON into Editor", use_container_width=True, key="load_uploaded_json"):
-                    merged, warnings = merge_and_validate_portfolio(st.session_state.portfolio_config or {}, uploaded_json)
+                summary = summarize_portfolio(uploaded_json)
+                if summary.get("name"):
+                    st.caption(f"Name: {summary['name']}")
+                st.table({
+                    "Section": [k for k in summary if k != "name"],
+                    "Entries": [v for k, v in summary.items() if k != "name"],
+                })
+
+                remove_missing = st.checkbox(
+                    "Remove items missing from the upload",
+                    value=False,
+                    key="import_remove_missing",
+                    help="Off: the upload only adds and updates items. On: list sections in the upload replace yours."
+                )
+                merged, warnings, changes = merge_and_validate_portfolio(
+                    st.session_state.portfolio_config or {}, uploaded_json, remove_missing=remove_missing
+                )
+                counts = summarize_changes(changes)
+                st.markdown("**Changes to apply**")
+                st.caption(", ".join(f"{n} {kind}" for kind, n in counts.items()) or "No changes")
+                visible_changes = [c for c in changes if c["change"] not in ("unchanged", "kept")]
+                if visible_changes:
+                    st.dataframe(visible_changes, use_container_width=True, hide_index=True)
+
+                if st.button("Load uploaded JSON into Editor", use_container_width=True, key="load_uploaded_json",
+                             disabled=not visible_changes):
+                    reset_editor_state()
                     st.session_state.portfolio_config = merged
                     if warnings:
                         for w in warnings:
                             st.warning(w)
                     st.success("Uploaded portfolio loaded into editor")
                     st.rerun()
-            except Exception as e:
-                st.error(f"Failed to parse uploaded JSON: {e}")
 
         if st.button("💾 Save Portfolio", use_container_width=True, type="primary"):
             auth_manager = st.session_state.auth_manager
@@ -896,16 +357,53 @@ def portfolio_editor_page():
                 st.success("Portfolio saved successfully!")
             else:
                 st.error("Failed to save portfolio")
-        
+
+        with st.expander("🕘 Revision History"):
+            auth_manager = st.session_state.auth_manager
+            revisions = auth_manager.list_portfolio_revisions(st.session_state.current_user)
+            if revisions:
+                rev_labels = {r["rev"]: f"#{r['rev']} — {(r['ts'] or '')[:19].replace('T', ' ')}" for r in revisions}
+                selected_rev = st.selectbox(
+                    "Saved revisions",
+                    options=list(reversed(list(rev_labels))),
+                    format_func=lambda r: rev_labels[r],
+                    key="revision_select"
+                )
+                if st.button("Load revision into Editor", use_container_width=True, key="load_revision"):
+                    try:
+                        restored = auth_manager.get_portfolio_revision(st.session_state.current_user, selected_rev)
+                    except RevisionUnavailable:
+                        restored = None
+                    if restored is not None:
+                        reset_editor_state()
+                        st.session_state.portfolio_config = restored
+                        st.success(f"Revision #{selected_rev} loaded into editor")
+                        st.rerun()
+                    else:
+                        st.error("Revision is no longer available")
+            else:
+                st.caption("No saved revisions yet")
+
+        if st.session_state.current_user in ADMIN_USERS:
+            with st.expander("📊 Portfolio Analytics"):
+                analytics = get_portfolio_analytics("data")
+                analytics.refresh()
+                st.caption(f"{analytics.portfolio_count()} portfolios")
+                st.markdown("**Top skills**")
+                st.dataframe(analytics.skill_frequencies(10), use_container_width=True)
+                st.markdown("**Section fill rates**")
+                st.dataframe(analytics.section_fill_rates(), use_container_width=True)
+                st.markdown("**Items per section**")
+                st.dataframe(analytics.average_item_counts(), use_container_width=True)
+                st.markdown("**Templates**")
+                st.dataframe(analytics.template_usage(), use_container_width=True)
+
         if st.button("🔗 View Public Portfolio", use_container_width=True):
             st.session_state.show_preview = True
             st.rerun()
         
         if st.button("🚪 Logout", use_container_width=True):
-            st.session_state.user_logged_in = False
-            st.session_state.current_user = None
-            st.session_state.portfolio_config = None
-            st.rerun()
+            logout()
     
     # Main content
     st.markdown("# 🎨 Edit Your Portfolio")
@@ -942,49 +440,35 @@ def portfolio_editor_page():
     tab_names.append("🎨 Theme")
     tab_objects.append("theme")
     
-    tabs = st.tabs(tab_names)
+    batch_edits = st.session_state.get("batch_section_edits", True)
     
-    for tab, module_key in zip(tabs, tab_objects):
-        with tab:
-            if module_key == "personal_info":
-                st.session_state.portfolio_config = personal_info_editor(
-                    st.session_state.portfolio_config
-                )
-            
-            elif module_key == "experience":
-                st.session_state.portfolio_config = experience_editor(
-                    st.session_state.portfolio_config
-                )
-            
-            elif module_key == "skills":
-                st.session_state.portfolio_config = skills_editor(
-                    st.session_state.portfolio_config
-                )
-            
-            elif module_key == "projects":
-                st.session_state.portfolio_config = projects_editor(
-                    st.session_state.portfolio_config
-                )
-            
-            elif module_key == "education":
-                st.session_state.portfolio_config = education_editor(
-                    st.session_state.portfolio_config
-                )
-            
-            elif module_key == "certificates":
-                st.session_state.portfolio_config = certificates_editor(
-                    st.session_state.portfolio_config
-                )
-            
-            elif module_key == "social_links":
-                st.session_state.portfolio_config = social_links_editor(
-                    st.session_state.portfolio_config
-                )
-            
-            elif module_key == "theme":
-                st.session_state.portfolio_config = theme_editor(
-                    st.session_state.portfolio_config
-                )
+    if st.session_state.get("active_section_only", True):
+        # Only the selected section's editor runs; other sections are rebuilt from
+        # portfolio_config when revisited, and their page positions are kept alive
+        if st.session_state.get("active_section") not in tab_objects:
+            st.session_state.active_section = tab_objects[0]
+        tab_labels = dict(zip(tab_objects, tab_names))
+        active_section = st.radio(
+            "Section",
+            options=tab_objects,
+            format_func=lambda k: tab_labels[k],
+            horizontal=True,
+            key="active_section",
+            label_visibility="collapsed"
+        )
+        preserve_page_state()
+        if batch_edits:
+            render_section_fragment(active_section)
+        else:
+            render_section_editor(active_section)
+    else:
+        tabs = st.tabs(tab_names)
+        for tab, module_key in zip(tabs, tab_objects):
+            with tab:
+                if batch_edits:
+                    render_section_fragment(module_key)
+                else:
+                    render_section_editor(module_key)
 
 
 def portfolio_preview_page():
@@ -1001,10 +485,19 @@ def portfolio_preview_page():
         
         st.subheader("Downloads")
         
+        # Export payloads are cached per portfolio content and referenced files; reruns reuse them
+        portfolio = st.session_state.portfolio_config
+        content_hash = export_hash(portfolio)
+        html_resume = export_cache.get_or_build(
+            portfolio, "html", lambda: generate_portfolio_html(portfolio), content_hash
+        )
+        
         col1, col2 = st.columns(2)
         
         with col1:
-            json_str = json.dumps(st.session_state.portfolio_config, indent=2)
+            json_str = export_cache.get_or_build(
+                portfolio, "json", lambda: serialization.dumps_pretty(portfolio), content_hash
+            )
             st.download_button(
                 label="Download JSON",
                 data=json_str,
@@ -1014,33 +507,61 @@ def portfolio_preview_page():
             )
         
         with col2:
-            # Generate HTML and convert to PDF
-            html_resume = generate_portfolio_html(st.session_state.portfolio_config)
+            # Convert the cached HTML to PDF
             if html_resume:
-                pdf_data = html_to_pdf_weasyprint(html_resume)
-                if pdf_data:
-                    st.download_button(
-                        label="Download PDF",
-                        data=pdf_data,
-                        file_name=f"{st.session_state.current_user}_resume.pdf",
-                        mime="application/pdf",
-                        use_container_width=True
-                    )
+                # The PDF is rendered straight to a spool file and handed over as a file handle
+                pdf_file = export_cache.open_or_build_file(
+                    portfolio, "pdf",
+                    lambda path: html_to_pdf_weasyprint(html_resume, target=path),
+                    ".pdf", content_hash
+                )
+                if pdf_file:
+                    with pdf_file:
+                        st.download_button(
+                            label="Download PDF",
+                            data=pdf_file,
+                            file_name=f"{st.session_state.current_user}_resume.pdf",
+                            mime="application/pdf",
+                            use_container_width=True
+                        )
+        
+        if html_resume:
+            st.download_button(
+                label="Download HTML",
+                data=html_resume,
+                file_name=f"{st.session_state.current_user}_resume.html",
+                mime="text/html",
+                use_container_width=True
+            )
+        
+        st.divider()
+        
+        st.subheader("Publish")
+        if st.button("🌐 Publish Static Site", use_container_width=True):
+            out_dir = Path("published") / st.session_state.current_user
+            try:
+                result = publish_portfolio(portfolio, out_dir)
+                st.success(
+                    f"Published to {out_dir}: {len(result['written'])} written, "
+                    f"{len(result['unchanged'])} unchanged, {len(result['removed'])} removed"
+                )
+            except Exception as e:
+                st.error(f"Failed to publish site: {e}")
         
         st.divider()
         
         if st.button("Logout", use_container_width=True):
-            st.session_state.user_logged_in = False
-            st.session_state.current_user = None
-            st.session_state.portfolio_config = None
-            st.rerun()
+            logout()
     
     # Display HTML resume in A4 format
     st.markdown("# Your Resume (A4 Format)")
     st.markdown("---")
     
     portfolio = st.session_state.portfolio_config
-    html_resume = generate_portfolio_html(portfolio)
+    # The on-page preview references images by URL when they are served; downloads stay self-contained
+    html_resume = export_cache.get_or_build(
+        portfolio, "html_linked", lambda: generate_portfolio_html(portfolio, image_resolver=media_url), content_hash
+    )
     
     if html_resume:
         # Display using Streamlit's HTML component
@@ -1060,7 +581,7 @@ def portfolio_preview_page():
         profile_image = personal_info.get('profileImage')
         if profile_image:
             try:
-                st.image(profile_image, width=150)
+                st.image(media_src(profile_image), width=150)
             except Exception:
                 st.warning("Could not load profile image")
 
@@ -1104,22 +625,22 @@ def portfolio_preview_page():
         skills = portfolio.get("skills", {})
         if skills.get("categories"):
             st.markdown(f"## 🛠️ {skills.get('sectionTitle', 'Skills')}")
+            palette = compile_theme(portfolio.get("theme")).palette
+            badge_bg, badge_fg = palette["primary_tint"], palette["primary_dark"]
             
-            for category in skills.get("categories", []):
+            for category, skills_list in skill_categories(portfolio):
                 icon = category.get('icon', '🔧')
                 title = category.get('title', 'N/A')
-                items = category.get('items', '')
                 
                 # Display with icon and title
                 st.markdown(f"### {icon} {title}")
                 
                 # Display skills as rounded badge boxes
-                if items:
-                    skills_list = [skill.strip() for skill in items.split(',')]
+                if skills_list:
                     # Create HTML for badge-style skills
                     badges_html = " ".join([
-                        f'<span style="display: inline-block; background-color: #e0e7ff; color: #4f46e5; padding: 4px 12px; border-radius: 20px; font-size: 13px; margin: 4px 4px; font-weight: 500;">{skill}</span>'
-                        for skill in skills_list if skill
+                        f'<span style="display: inline-block; background-color: {badge_bg}; color: {badge_fg}; padding: 4px 12px; border-radius: 20px; font-size: 13px; margin: 4px 4px; font-weight: 500;">{html.escape(skill)}</span>'
+                        for skill in skills_list
                     ])
                     st.markdown(badges_html, unsafe_allow_html=True)
             
@@ -1163,7 +684,7 @@ def portfolio_preview_page():
                         # Display certificate image if available
                         if cert.get("image"):
                             try:
-                                st.image(cert.get("image"), width=150, caption="Certificate Badge")
+                                st.image(media_src(cert.get("image")), width=150, caption="Certificate Badge")
                             except:
                                 st.info("📋 Certificate image")
                         else:
@@ -1177,19 +698,34 @@ def portfolio_preview_page():
                         if cert.get("date"):
                             st.write(f"**Date:** 📅 {cert.get('date')}")
                         
-                        # PDF download if available
+                        # PDF download if available; bytes are only read when requested
                         if cert.get("pdf"):
-                            try:
-                                with open(cert.get("pdf"), "rb") as pdf_file:
+                            pdf_path = cert.get("pdf")
+                            pdf_url = asset_url(pdf_path)
+                            if pdf_url:
+                                st.link_button(
+                                    "📥 Download Certificate PDF",
+                                    pdf_url,
+                                    use_container_width=True
+                                )
+                            elif st.session_state.get(f"cert_pdf_requested_{pdf_path}"):
+                                try:
                                     st.download_button(
                                         label="📥 Download Certificate PDF",
-                                        data=pdf_file,
+                                        data=read_asset_bytes(pdf_path),
                                         file_name=f"{cert.get('title', 'certificate')}.pdf",
                                         mime="application/pdf",
                                         use_container_width=True
                                     )
-                            except FileNotFoundError:
-                                st.warning("PDF file not found")
+                                except FileNotFoundError:
+                                    st.warning("PDF file not found")
+                            elif st.button(
+                                "📄 Prepare Certificate PDF",
+                                key=f"cert_pdf_prepare_{pdf_path}",
+                                use_container_width=True
+                            ):
+                                st.session_state[f"cert_pdf_requested_{pdf_path}"] = True
+                                st.rerun()
             
             st.markdown("---")
     
@@ -1223,9 +759,9 @@ def portfolio_preview_page():
             url = (link.get('url') or '#').strip()
             # Get icon based on platform name
             icon = platform_icons.get(name, "🔗")
-            # Visible text should be the URL (escaped for HTML). For href we keep the original url but safely escape quotes.
+            # Visible text is the URL as entered; the href only allows http(s)/mailto links
             visible = _html.escape(url)
-            href = url.replace('"', '%22')
+            href = _html.escape(safe_link_url(url))
             social_links_html += f'<div style="margin:6px 0; text-align:center;"><span style="margin-right:8px;">{icon}</span>: <a href="{href}" target="_blank" rel="noopener noreferrer">{visible}</a></div>'
 
         if social_links_html:
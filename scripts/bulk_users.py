@@ -0,0 +1,59 @@
+"""
+Bulk-import users from CSV/JSONL, or export every user's portfolio as JSONL
+
+Usage:
+    python scripts/bulk_users.py import users.csv [--data-dir data] [--skip-existing]
+    python scripts/bulk_users.py export portfolios.jsonl [--data-dir data] [--include-credentials]
+
+Import columns: username, email, password or password_hash, and optionally
+portfolio (JSON) or portfolio_file (path relative to the input file). The batch
+is validated first and written with a single users.json and index write;
+portfolios go to the per-user files only. Export streams users.json and the
+portfolio files one user at a time, and writes "-" to stdout.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from utils.auth import AuthManager
+from utils.bulk_users import iter_user_exports, read_user_records, write_jsonl
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="input .csv/.jsonl for import, output .jsonl (or -) for export")
+    parser.add_argument("--data-dir", default="data", help="AuthManager data directory")
+    parser.add_argument("--skip-existing", action="store_true", help="import: skip usernames that exist")
+    parser.add_argument("--include-credentials", action="store_true",
+                        help="export: include password hashes (re-importable)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "import":
+        auth_manager = AuthManager(args.data_dir)
+        try:
+            records = list(read_user_records(args.path))
+        except (OSError, ValueError) as e:
+            sys.exit(f"Could not read {args.path}: {e}")
+        success, message = auth_manager.bulk_register_users(records, skip_existing=args.skip_existing)
+        print(f"{message} in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+        if not success:
+            sys.exit(1)
+        return
+
+    records = iter_user_exports(args.data_dir, include_credentials=args.include_credentials)
+    if args.path == "-":
+        count = write_jsonl(records, sys.stdout.buffer)
+    else:
+        with open(args.path, "wb") as f:
+            count = write_jsonl(records, f)
+    print(f"Exported {count} user(s) in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Export a user's portfolio to several formats at once
+
+Usage:
+    python scripts/export_portfolio.py <username> [--formats html,pdf_reportlab,json,markdown]
+                                       [--data-dir data] [--out exports/<username>]
+                                       [--max-pages N] [--optimize] [--image-dpi 150]
+                                       [--jpeg-quality 85]
+
+Writes one file per format plus manifest.json (sizes and timings). --max-pages
+fits the ReportLab PDF into N pages by shrinking spacing, then font size.
+--optimize shrinks both PDFs (downsampled images, subset fonts, recompressed
+streams) and prints their sizes before and after.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from utils import serialization
+from utils.auth import AuthManager
+from utils.export_api import EXPORT_FORMATS, export_portfolio_sync
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("username")
+    parser.add_argument("--formats", default=",".join(EXPORT_FORMATS),
+                        help=f"comma-separated subset of: {', '.join(EXPORT_FORMATS)}")
+    parser.add_argument("--data-dir", default="data", help="AuthManager data directory")
+    parser.add_argument("--out", help="output directory (default: exports/<username>)")
+    parser.add_argument("--max-pages", type=int, help="page budget for the pdf_reportlab format")
+    parser.add_argument("--optimize", action="store_true", help="optimize PDF output size")
+    parser.add_argument("--image-dpi", type=int, help="with --optimize: embedded image resolution")
+    parser.add_argument("--jpeg-quality", type=int, help="with --optimize: JPEG re-encoding quality")
+    args = parser.parse_args()
+
+    portfolio = AuthManager(args.data_dir).get_user_portfolio(args.username)
+    if portfolio is None:
+        sys.exit(f"Unknown user: {args.username}")
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    out_dir = Path(args.out or Path("exports") / args.username)
+    pdf_options = {"max_pages": args.max_pages} if args.max_pages else None
+    pdf_optimize = None
+    if args.optimize:
+        pdf_optimize = {"image_dpi": args.image_dpi, "jpeg_quality": args.jpeg_quality}
+        pdf_optimize = {key: value for key, value in pdf_optimize.items() if value} or True
+    _, manifest = export_portfolio_sync(portfolio, formats, out_dir=out_dir, pdf_options=pdf_options,
+                                        pdf_optimize=pdf_optimize)
+    (out_dir / "manifest.json").write_bytes(serialization.dumps_pretty(manifest))
+
+    for fmt, entry in manifest["formats"].items():
+        status = entry["error"] or f"{entry['size']:,} bytes"
+        if entry.get("optimization"):
+            status += f" (was {entry['optimization']['before']:,})"
+        print(f"{fmt:<16}{entry['seconds']:>8.3f}s  {status}")
+    print(f"{'total':<16}{manifest['total_seconds']:>8.3f}s  -> {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Move per-user portfolio files from the flat data/ layout into hashed shards
+
+Usage:
+    python scripts/migrate_data_layout.py [--data-dir data] [--dry-run]
+
+Safe to run while the app is serving: readers fall back to the flat file until
+it is moved, and a sharded file written by the app meanwhile is never
+overwritten. Also rebuilds data/portfolios/index.txt from users.json. Re-running
+is harmless.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from utils import serialization
+from utils.storage import iter_legacy_user_files, iter_usernames, migrate_user_file, write_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default="data", help="AuthManager data directory")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would move")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    users_file = data_dir / "users.json"
+    users = serialization.load_file(users_file) if users_file.exists() else {}
+
+    counts = {"moved": 0, "superseded": 0, "skipped": 0}
+    for username, legacy_path in iter_legacy_user_files(data_dir):
+        if username not in users:
+            # not an account file; leave it alone
+            counts["skipped"] += 1
+            continue
+        if args.dry_run:
+            counts["moved"] += 1
+            continue
+        counts[migrate_user_file(data_dir, username, legacy_path)] += 1
+
+    if not args.dry_run:
+        # keep usernames appended by signups that happened during the run
+        write_index(data_dir, list(users) + list(iter_usernames(data_dir)))
+
+    prefix = "Would move" if args.dry_run else "Moved"
+    print(f"{prefix} {counts['moved']} file(s); {counts['superseded']} already sharded, "
+          f"{counts['skipped']} skipped; {len(users)} user(s) indexed")
+
+
+if __name__ == "__main__":
+    main()
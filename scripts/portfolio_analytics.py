@@ -0,0 +1,43 @@
+"""
+Print analytics across all portfolios (skills, section fill rates, item counts, templates)
+
+Usage:
+    python scripts/portfolio_analytics.py [--data-dir data] [--top 20]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from utils.analytics import PortfolioAnalytics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default="data", help="AuthManager data directory")
+    parser.add_argument("--top", type=int, default=20, help="rows in the skill and company tables")
+    args = parser.parse_args()
+
+    analytics = PortfolioAnalytics(args.data_dir)
+    started = time.perf_counter()
+    analytics.refresh(force=True)
+    print(f"{analytics.portfolio_count()} portfolio(s) loaded in {time.perf_counter() - started:.2f}s\n")
+
+    reports = [
+        ("Top skills", analytics.skill_frequencies(args.top)),
+        ("Section fill rates", analytics.section_fill_rates()),
+        ("Items per section", analytics.average_item_counts()),
+        ("Template usage", analytics.template_usage()),
+        ("Top companies", analytics.top_companies(args.top)),
+    ]
+    for title, frame in reports:
+        print(f"== {title} ==")
+        print(frame.to_string() if not frame.empty else "(no data)")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Run the read-only public portfolio endpoint
+
+Usage:
+    python scripts/public_server.py [--data-dir data] [--host 0.0.0.0] [--port 8503]
+
+Portfolios are then available at http://<host>:<port>/<username>
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from utils.public_server import make_public_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default="data", help="AuthManager data directory")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8503)
+    args = parser.parse_args()
+
+    server = make_public_server(args.data_dir, args.host, args.port)
+    print(f"Serving portfolios from {args.data_dir} on http://{args.host}:{args.port}/<username>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Publish a user's portfolio as a static site
+
+Usage:
+    python scripts/publish_site.py <username> [--data-dir data] [--out published/<username>]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from utils.auth import AuthManager
+from utils.publish import publish_portfolio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("username")
+    parser.add_argument("--data-dir", default="data", help="AuthManager data directory")
+    parser.add_argument("--out", help="output directory (default: published/<username>)")
+    args = parser.parse_args()
+
+    portfolio = AuthManager(args.data_dir).get_user_portfolio(args.username)
+    if portfolio is None:
+        sys.exit(f"Unknown user: {args.username}")
+
+    out_dir = args.out or str(Path("published") / args.username)
+    result = publish_portfolio(portfolio, out_dir)
+    print(f"Published to {out_dir}: {len(result['written'])} written, "
+          f"{len(result['unchanged'])} unchanged, {len(result['removed'])} removed")
+
+
+if __name__ == "__main__":
+    main()
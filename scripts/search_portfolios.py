@@ -0,0 +1,55 @@
+"""
+Search portfolios by skill, title, company or certificate
+
+Usage:
+    python scripts/search_portfolios.py "python company:acme issuer:aws" [--limit 20] [--data-dir data]
+    python scripts/search_portfolios.py --rebuild [--data-dir data]
+
+Bare terms match any field; skill:, title:, company:, cert:, issuer: and text:
+restrict a term to one field and make it required. The index is kept up to
+date on every save; --rebuild re-indexes all existing portfolios (needed once
+for data saved before the index existed).
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from utils.auth import AuthManager
+from utils.bulk_users import iter_user_exports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("query", nargs="?", default="")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--data-dir", default="data", help="AuthManager data directory")
+    parser.add_argument("--rebuild", action="store_true", help="re-index every portfolio")
+    args = parser.parse_args()
+
+    auth_manager = AuthManager(args.data_dir)
+    if args.rebuild:
+        started = time.perf_counter()
+        auth_manager.search_index.rebuild(
+            (record["username"], record["portfolio"]) for record in iter_user_exports(args.data_dir)
+        )
+        print(f"Indexed {len(auth_manager.search_index)} portfolio(s) "
+              f"in {time.perf_counter() - started:.2f}s")
+        if not args.query:
+            return
+    elif not args.query:
+        parser.error("a query or --rebuild is required")
+
+    started = time.perf_counter()
+    results = auth_manager.search_portfolios(args.query, limit=args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    for username, score in results:
+        print(f"{score:>8.3f}  {username}")
+    print(f"{len(results)} result(s) in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Tests for the portfolio revision log
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from utils.revisions import RevisionStore, RevisionUnavailable  # noqa: E402
+
+
+def portfolio(n):
+    return {"personalInfo": {"name": f"User {n}", "summary": "x" * 200},
+            "skills": {"items": list(range(n % 4))}}
+
+
+def test_first_save_is_listed(tmp_path):
+    store = RevisionStore(tmp_path)
+    assert store.record("u", portfolio(1)) == 1
+    assert [r["rev"] for r in store.list_revisions("u")] == [1]
+    assert store.get_revision("u", 1) == portfolio(1)
+
+
+def test_unchanged_portfolio_is_not_recorded(tmp_path):
+    store = RevisionStore(tmp_path)
+    store.record("u", portfolio(1))
+    assert store.record("u", portfolio(1)) is None
+    assert len(store.list_revisions("u")) == 1
+
+
+def test_record_list_get_across_saves(tmp_path):
+    store = RevisionStore(tmp_path, snapshot_interval=3)
+    assert [store.record("u", portfolio(n)) for n in range(1, 8)] == list(range(1, 8))
+    assert [r["rev"] for r in store.list_revisions("u")] == list(range(1, 8))
+    for n in range(1, 8):
+        assert store.get_revision("u", n) == portfolio(n)
+    # a fresh store reads the same history back from disk
+    reopened = RevisionStore(tmp_path, snapshot_interval=3)
+    assert [r["rev"] for r in reopened.list_revisions("u")] == list(range(1, 8))
+    assert reopened.get_revision("u", 7) == portfolio(7)
+    assert reopened.record("u", portfolio(8)) == 8
+
+
+def test_two_stores_share_one_log(tmp_path):
+    first, second = RevisionStore(tmp_path), RevisionStore(tmp_path)
+    assert first.record("u", portfolio(1)) == 1
+    assert second.record("u", portfolio(2)) == 2
+    assert first.record("u", portfolio(3)) == 3
+    assert [r["rev"] for r in second.list_revisions("u")] == [1, 2, 3]
+    assert second.get_revision("u", 3) == portfolio(3)
+
+
+def test_compaction_keeps_newest_revisions(tmp_path):
+    store = RevisionStore(tmp_path, snapshot_interval=3, max_revisions=4)
+    for n in range(1, 12):
+        store.record("u", portfolio(n))
+    store.compact("u")
+    revs = [r["rev"] for r in store.list_revisions("u")]
+    assert revs == [8, 9, 10, 11]
+    assert store.list_revisions("u")[0]["snapshot"]
+    for n in revs:
+        assert store.get_revision("u", n) == portfolio(n)
+    assert store.get_revision("u", 1) is None
+    assert store.record("u", portfolio(12)) == 12
+
+
+def test_missing_snapshot_raises(tmp_path):
+    store = RevisionStore(tmp_path, snapshot_interval=5)
+    store.record("u", portfolio(1))
+    store.record("u", portfolio(2))
+    log_file = store._log_file("u")
+    lines = log_file.read_bytes().splitlines(keepends=True)
+    assert b'"delta"' in lines[1]
+    log_file.write_bytes(b"".join(lines[1:]))  # drop the snapshot
+    with pytest.raises(RevisionUnavailable):
+        RevisionStore(tmp_path).get_revision("u", 2)
+
+
+def test_logs_are_bucketed_and_flat_logs_adopted(tmp_path):
+    store = RevisionStore(tmp_path)
+    store.record("u", portfolio(1))
+    assert not (tmp_path / "u.jsonl").exists()
+    assert store._log_file("u").parent.parent.parent == tmp_path
+
+    # a log written by the old flat layout is moved into its bucket on first use
+    store._log_file("u").rename(tmp_path / "u.jsonl")
+    reopened = RevisionStore(tmp_path)
+    assert [r["rev"] for r in reopened.list_revisions("u")] == [1]
+    assert reopened.record("u", portfolio(2)) == 2
+    assert not (tmp_path / "u.jsonl").exists()